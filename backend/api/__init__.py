@@ -1,3 +1,3 @@
-from . import items, mentions
+from . import items, mentions, tags
 
-__all__ = ["items", "mentions"]
+__all__ = ["items", "mentions", "tags"]
@@ -0,0 +1,58 @@
+"""HTTP validators and cache headers for read endpoints.
+
+ETags are derived from ``data_version`` and a time bucket, never from the response
+body, so a matching ``If-None-Match`` is answered with 304 before any database work.
+The time bucket makes validators expire with the freshness-dependent scores, on the
+same schedule as the ranking cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+
+from fastapi import HTTPException, Request, Response
+
+from backend.services.cache import RANKING_CACHE_TTL_SECONDS, data_version
+
+TTL_SECONDS = int(RANKING_CACHE_TTL_SECONDS)
+# Browsers revalidate every time (a cheap 304); shared caches may serve for one TTL
+CACHE_CONTROL = f"public, max-age=0, s-maxage={TTL_SECONDS}, stale-while-revalidate={TTL_SECONDS}"
+
+# Without a database file, the version is this process's write counter alone, which
+# other workers can't compare against; keep their validators apart.
+_PROCESS_TOKEN = os.urandom(8).hex()
+
+
+def current_etag(now: float | None = None) -> str:
+    bucket = int((time.time() if now is None else now) // TTL_SECONDS)
+    parts = [*map(str, data_version.current()), str(bucket)]
+    if not data_version.sees_other_processes:
+        parts.append(_PROCESS_TOKEN)
+    digest = hashlib.blake2b(":".join(parts).encode(), digest_size=12).hexdigest()
+    # Weak: compressed and identity encodings of a response share the validator
+    return f'W/"{digest}"'
+
+
+def cache_validators(request: Request, response: Response) -> None:
+    """Dependency for cacheable GET routes; declare it before the database session.
+
+    Raises a 304 when the client's ``If-None-Match`` is current, and otherwise adds
+    ``ETag`` and ``Cache-Control`` to the response.
+    """
+    etag = current_etag()
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/ prefixes are ignored
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
@@ -1,102 +1,352 @@
 from __future__ import annotations
 
-from typing import Literal
+from collections import defaultdict
+from datetime import UTC, datetime
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, or_, select
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import ColumnElement, Row, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from backend.database import get_db
-from backend.models import Item, Mention
-from backend.schemas.item import ItemResponse, MentionSummary
+from backend.api.caching import cache_validators
+from backend.api.serialization import ItemJSONResponse, item_json_response
+from backend.database import get_async_read_db
+from backend.models import Item, ItemTag, Mention, Source
+from backend.models.source import resolve_display_type
+from backend.schemas.item import ItemResponse
+from backend.services import search
+from backend.services.cache import ranking_cache
+from backend.services.events import item_events
+from backend.services.pagination import InvalidCursor, SortKey, decode_cursor, encode_cursor
+from backend.services.scoring import engagement_expression, mention_engagement, scores_at
 from backend.utils.summary import deserialize_list
 
 router = APIRouter(prefix="/items", tags=["items"])
 
 
-SORT_OPTIONS = {"new": Item.score_new.desc(), "buzz": Item.score_buzz.desc()}
+# Buzz decays with time, so it is ordered by the time-independent rank key instead of
+# the score_buzz snapshot taken at write time; "new" lists the most recently seen items
+# first rather than the score_new snapshot, which freshness moves after the write. Ties
+# are broken by id so keyset cursors are stable; (key, id) composite indexes back both
+# orders. Rows without a key (e.g. rank_buzz before its backfill) are listed last, on
+# every backend.
+SORT_KEYS = {"new": Item.last_seen_at, "buzz": Item.rank_buzz}
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
-@router.get("/", response_model=list[ItemResponse])
-def list_items(
+# Listing pages carry only the most engaged mentions; GET /items/{id} returns all
+MENTIONS_PER_ITEM = 10
+
+ITEM_COLUMNS = (
+    Item.id,
+    Item.url,
+    Item.normalized_url,
+    Item.title,
+    Item.summary,
+    Item.summary_points_json,
+    Item.tags_json,
+    Item.language,
+    Item.summary_status,
+    Item.score_raw,
+    Item.published_at,
+    Item.last_seen_at,
+    Item.source_type,
+    Item.cluster_id,
+    Item.created_at,
+    Item.updated_at,
+)
+
+RankedResponse = tuple[dict[str, Any], tuple[SortKey | None, int] | None]
+
+
+@router.get("/", response_model=list[ItemResponse], dependencies=[Depends(cache_validators)])
+async def list_items(
+    response: Response,
     sort: Literal["new", "buzz"] = Query("new"),
     tag: str | None = Query(None),
     q: str | None = Query(None),
     source_type: str | None = Query(None),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-) -> list[ItemResponse]:
-    order_by = SORT_OPTIONS.get(sort, Item.score_new.desc())
+    cursor: str | None = Query(None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+    collapse: bool = Query(False, description="One entry per near-duplicate story, with the story's combined mentions"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> ItemJSONResponse:
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort)
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        if _is_relevance_ranked(q, sort):
+            raise HTTPException(status_code=400, detail="Cursors are not supported for relevance-ranked search")
+        ranked = await _query_items(db, sort, tag, q, source_type, limit, 0, after, collapse)
+    elif q or not ranking_cache.covers(offset, limit):
+        ranked = await _query_items(db, sort, tag, q, source_type, limit, offset, collapse=collapse)
+    else:
+        # Front pages are served from the top-N ranking kept per (sort, source_type, tag, collapse)
+        key = (sort, source_type, tag, collapse)
+        cached = ranking_cache.get(key, offset, limit)
+        if cached is None:
+            version = ranking_cache.data_version.current()
+            ranking = await _query_items(db, sort, tag, None, source_type, ranking_cache.depth, 0, collapse=collapse)
+            ranking_cache.put(key, ranking, version)
+            cached = ranking[offset : offset + limit]
+        ranked = cached
+    if len(ranked) == limit and ranked[-1][1] is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, *ranked[-1][1])
+    return item_json_response([item_response for item_response, _ in ranked], response)
+
+
+def _is_relevance_ranked(q: str | None, sort: str) -> bool:
+    return bool(q) and sort == "buzz" and search.match_expression(q) is not None
+
+
+async def _query_items(
+    db: AsyncSession,
+    sort: str,
+    tag: str | None,
+    q: str | None,
+    source_type: str | None,
+    limit: int,
+    offset: int,
+    after: tuple[SortKey | None, int | None] | None = None,
+    collapse: bool = False,
+) -> list[RankedResponse]:
+    """Run the listing query, pairing each response with its keyset position.
+
+    The position is ``None`` when results are ordered by search relevance. With
+    ``collapse`` each near-duplicate cluster is listed once, at the position of its
+    highest-ranked item.
+    """
+    sort_key = SORT_KEYS[sort]
     stmt = (
-        select(Item)
-        .options(joinedload(Item.mentions).joinedload(Mention.source))
-        .order_by(order_by)
+        select(*ITEM_COLUMNS, sort_key.label("sort_key"))
+        .order_by(sort_key.desc().nulls_last(), Item.id.desc())
         .limit(limit)
         .offset(offset)
     )
+    if after is not None:
+        stmt = stmt.where(_after_position(sort_key, *after))
     if tag:
-        stmt = stmt.where(Item.tags_json.is_not(None)).where(Item.tags_json.contains(f'"{tag}"'))
+        stmt = stmt.join(ItemTag, and_(ItemTag.item_id == Item.id, ItemTag.tag == tag))
+    keyset = True
+    use_fts = db.get_bind().dialect.name == "sqlite"
     if q:
-        like = f"%{q}%"
-        stmt = stmt.where(
-            or_(
-                and_(Item.title.is_not(None), Item.title.ilike(like)),
-                and_(Item.summary.is_not(None), Item.summary.ilike(like)),
+        searched = None
+        if use_fts:
+            searched = search.apply_search(stmt, q, Item.id, Item.rank_buzz if sort == "buzz" else None)
+        if searched is not None:
+            stmt = searched
+            keyset = sort != "buzz"
+        else:
+            # Terms too short for the trigram index fall back to a scan
+            like = f"%{q}%"
+            stmt = stmt.where(
+                or_(
+                    and_(Item.title.is_not(None), Item.title.ilike(like)),
+                    and_(Item.summary.is_not(None), Item.summary.ilike(like)),
+                )
             )
-        )
     if source_type:
         stmt = stmt.where(Item.source_type == source_type)
-    items = db.scalars(stmt).unique().all()
-    return [_item_to_response(item) for item in items]
+    if collapse:
+        stmt = stmt.where(~_outranked_in_cluster(sort_key, tag, q, source_type, use_fts))
+    rows = (await db.execute(stmt)).all()
+    now = datetime.now(UTC)
+    if collapse:
+        responses = await _cluster_responses(db, rows, now)
+    else:
+        mentions = await _load_mentions(db, [row.id for row in rows], per_item=MENTIONS_PER_ITEM)
+        responses = [_item_row_to_response(row, mentions.get(row.id, []), now) for row in rows]
+    ranked = [(response, (row.sort_key, row.id) if keyset else None) for row, response in zip(rows, responses)]
+    if after is not None and after[0] is not None and len(ranked) < limit:
+        # The seek stops at the last keyed row; rows without a key come after it
+        ranked += await _query_items(db, sort, tag, q, source_type, limit - len(ranked), 0, (None, None), collapse)
+    return ranked
 
 
-@router.get("/{item_id}", response_model=ItemResponse)
-def get_item(item_id: int, db: Session = Depends(get_db)) -> ItemResponse:
-    stmt = (
-        select(Item)
-        .where(Item.id == item_id)
-        .options(joinedload(Item.mentions).joinedload(Mention.source))
+def _after_position(sort_key: ColumnElement, key: SortKey | None, item_id: int | None) -> ColumnElement[bool]:
+    """Keyed rows after ``(key, item_id)`` in (key DESC, id DESC) order, or unkeyed ones when ``key`` is None.
+
+    Keyed and unkeyed rows are separate seeks because an ``IS NULL`` branch in the
+    same ``OR`` keeps SQLite from using the (key, id) index as a range.
+    """
+    if key is None:
+        if item_id is None:
+            return sort_key.is_(None)
+        return and_(sort_key.is_(None), Item.id < item_id)
+    return or_(sort_key < key, and_(sort_key == key, Item.id < item_id))
+
+
+def _outranked_in_cluster(
+    sort_key: ColumnElement, tag: str | None, q: str | None, source_type: str | None, use_fts: bool
+) -> ColumnElement[bool]:
+    """True for items with a member of their cluster ahead of them in (key DESC, id DESC) order.
+
+    Only members passing the listing's filters count, so a cluster is listed by its
+    best matching item.
+    """
+    other = aliased(Item)
+    other_key = getattr(other, sort_key.key)
+    same_key = or_(other_key == sort_key, and_(other_key.is_(None), sort_key.is_(None)))
+    ahead = select(other.id).where(
+        other.cluster_id == Item.cluster_id,
+        or_(
+            other_key > sort_key,
+            and_(other_key.is_not(None), sort_key.is_(None)),
+            and_(same_key, other.id > Item.id),
+        ),
     )
-    item = db.scalars(stmt).first()
-    if not item:
+    if tag:
+        ahead = ahead.where(other.id.in_(select(ItemTag.item_id).where(ItemTag.tag == tag)))
+    if q:
+        match = search.match_expression(q) if use_fts else None
+        if match is not None:
+            ahead = ahead.where(other.id.in_(select(search.match_subquery(match).c.item_id)))
+        else:
+            like = f"%{q}%"
+            ahead = ahead.where(or_(other.title.ilike(like), other.summary.ilike(like)))
+    if source_type:
+        ahead = ahead.where(other.source_type == source_type)
+    return ahead.exists()
+
+
+async def _cluster_responses(db: AsyncSession, rows: list[Row], now: datetime) -> list[dict[str, Any]]:
+    """Responses for collapsed listings: each row stands for its whole cluster.
+
+    Mentions are the most engaged across the cluster's items. Scores stay the
+    representative's own, since the listing is ordered by its key; a summed score
+    would rank clusters differently from how they are displayed.
+    """
+    cluster_ids = {row.cluster_id for row in rows if row.cluster_id is not None}
+    members: dict[int, list[Row]] = defaultdict(list)
+    if cluster_ids:
+        stmt = select(Item.id, Item.cluster_id).where(Item.cluster_id.in_(cluster_ids))
+        for member in await db.execute(stmt):
+            members[member.cluster_id].append(member)
+    item_ids = [row.id for row in rows if row.cluster_id is None]
+    item_ids += [member.id for cluster in members.values() for member in cluster]
+    mentions = await _load_mentions(db, item_ids, per_item=MENTIONS_PER_ITEM)
+
+    responses = []
+    for row in rows:
+        cluster = members.get(row.cluster_id, []) if row.cluster_id is not None else []
+        if not cluster:
+            responses.append(_item_row_to_response(row, mentions.get(row.id, []), now))
+            continue
+        merged = sorted(
+            (mention for member in cluster for mention in mentions.get(member.id, [])),
+            key=lambda m: (-mention_engagement(m["like_count"], m["repost_count"], m["reply_count"]), m["id"]),
+        )
+        response = _item_row_to_response(row, merged[:MENTIONS_PER_ITEM], now)
+        response["cluster_size"] = len(cluster)
+        responses.append(response)
+    return responses
+
+
+@router.get("/stream")
+async def stream_items(last_event_id: int | None = Header(None)) -> StreamingResponse:
+    """Server-sent ``item``, ``score`` and ``summary`` events as items change.
+
+    A ``reset`` event means events were missed and the client should reload its list.
+    """
+    return StreamingResponse(
+        item_events.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{item_id}", response_model=ItemResponse, dependencies=[Depends(cache_validators)])
+async def get_item(
+    item_id: int, response: Response, db: AsyncSession = Depends(get_async_read_db)
+) -> ItemJSONResponse:
+    row = (await db.execute(select(*ITEM_COLUMNS).where(Item.id == item_id))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Item not found")
-    return _item_to_response(item)
-
-
-def _item_to_response(item: Item) -> ItemResponse:
-    mentions = []
-    for mention in item.mentions:
-        source = mention.source
-        mentions.append(
-            MentionSummary(
-                id=mention.id,
-                source_name=source.name if source else "",
-                source_handle=source.handle if source else None,
-                source_type=source.display_type if source else "unknown",
-                post_url=mention.post_url,
-                embed_html=mention.embed_html,
-                like_count=mention.like_count,
-                repost_count=mention.repost_count,
-                reply_count=mention.reply_count,
-            )
+    mentions = await _load_mentions(db, [item_id], per_item=None)
+    return item_json_response(_item_row_to_response(row, mentions.get(item_id, []), datetime.now(UTC)), response)
+
+
+async def _load_mentions(
+    db: AsyncSession, item_ids: list[int], per_item: int | None
+) -> dict[int, list[dict[str, Any]]]:
+    """Fetch mention summaries for ``item_ids`` in one query, most engaged first.
+
+    With ``per_item`` only that many mentions are kept per item, using a window
+    function so viral items don't inflate the result set.
+    """
+    if not item_ids:
+        return {}
+    position = func.row_number().over(
+        partition_by=Mention.item_id, order_by=(engagement_expression().desc(), Mention.id)
+    )
+    ranked = (
+        select(
+            Mention.id,
+            Mention.item_id,
+            Mention.post_url,
+            Mention.embed_html,
+            Mention.like_count,
+            Mention.repost_count,
+            Mention.reply_count,
+            Source.name.label("source_name"),
+            Source.handle.label("source_handle"),
+            Source.type.label("source_type"),
+            Source.metadata_json.label("source_metadata_json"),
+            position.label("position"),
         )
-    return ItemResponse(
-        id=item.id,
-        url=item.url,
-        normalized_url=item.normalized_url,
-        title=item.title,
-        summary=item.summary,
-        summary_points=deserialize_list(item.summary_points_json),
-        tags=deserialize_list(item.tags_json),
-        language=item.language,
-        score_new=item.score_new,
-        score_buzz=item.score_buzz,
-        score_raw=item.score_raw,
-        published_at=item.published_at,
-        last_seen_at=item.last_seen_at,
-        source_type=item.source_type,
-        mentions=mentions,
-        created_at=item.created_at,
-        updated_at=item.updated_at,
+        .outerjoin(Source, Source.id == Mention.source_id)
+        .where(Mention.item_id.in_(item_ids))
+        .subquery()
     )
+    stmt = select(ranked).order_by(ranked.c.item_id, ranked.c.position)
+    if per_item is not None:
+        stmt = stmt.where(ranked.c.position <= per_item)
+    mentions: dict[int, list[dict[str, Any]]] = {}
+    for row in await db.execute(stmt):
+        has_source = row.source_name is not None
+        mentions.setdefault(row.item_id, []).append(
+            {
+                "id": row.id,
+                "source_name": row.source_name if has_source else "",
+                "source_handle": row.source_handle,
+                "source_type": resolve_display_type(row.source_type, row.source_metadata_json)
+                if has_source
+                else "unknown",
+                "post_url": row.post_url,
+                "embed_html": row.embed_html,
+                "like_count": row.like_count,
+                "repost_count": row.repost_count,
+                "reply_count": row.reply_count,
+            }
+        )
+    return mentions
+
+
+def _item_row_to_response(row: Row, mentions: list[dict[str, Any]], now: datetime) -> dict[str, Any]:
+    score_new, score_buzz = scores_at(row.score_raw, row.last_seen_at, now)
+    return {
+        "id": row.id,
+        "url": row.url,
+        "normalized_url": row.normalized_url,
+        "title": row.title,
+        "summary": row.summary,
+        "summary_points": deserialize_list(row.summary_points_json),
+        "tags": deserialize_list(row.tags_json),
+        "language": row.language,
+        "summary_status": row.summary_status,
+        "score_new": score_new,
+        "score_buzz": score_buzz,
+        "score_raw": row.score_raw,
+        "published_at": row.published_at,
+        "last_seen_at": row.last_seen_at,
+        "source_type": row.source_type,
+        "cluster_id": row.cluster_id,
+        "cluster_size": 1,
+        "mentions": mentions,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
@@ -1,102 +1,117 @@
 from __future__ import annotations
 
-from datetime import UTC, datetime
+import json
+from typing import Any
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import and_, select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.database import get_db
-from backend.models import Item, Mention, Source
-from backend.schemas.mention import MentionCreate, MentionResponse
-from backend.services.scoring import compute_item_scores
-from backend.utils.url import normalize_url
+from backend.database import get_async_db
+from backend.schemas.mention import BulkMentionResponse, BulkMentionResult, MentionCreate, MentionResponse
+from backend.services.cache import data_version
+from backend.services.canonical import url_resolver
+from backend.services.mentions import (
+    MENTION_CREATED,
+    MENTION_FAILED,
+    MENTION_UPDATED,
+    upsert_mentions,
+)
 
 router = APIRouter(prefix="/mentions", tags=["mentions"])
 
+MAX_BULK_MENTIONS = 5000
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
 
 @router.post("/", response_model=MentionResponse)
-def create_mention(payload: MentionCreate, db: Session = Depends(get_db)) -> MentionResponse:
-    normalized = normalize_url(str(payload.item_url))
-    stmt = select(Item).where(Item.normalized_url == normalized)
-    item = db.scalars(stmt).first()
-    if item is None:
-        item = Item(
-            url=str(payload.item_url),
-            normalized_url=normalized,
-            title=None,
-            last_seen_at=datetime.now(UTC),
-            source_type=payload.source_type,
-        )
-        db.add(item)
-        db.flush()
-
-    source_stmt = select(Source).where(Source.name == payload.source_name)
-    source = db.scalars(source_stmt).first()
-    if source is None:
-        source = Source(
-            name=payload.source_name,
-            handle=payload.source_handle,
-            type=payload.source_type,
-            url=str(payload.source_url) if payload.source_url else None,
-        )
-        db.add(source)
-        db.flush()
+async def create_mention(payload: MentionCreate, db: AsyncSession = Depends(get_async_db)) -> MentionResponse:
+    canonical_urls = await url_resolver.aresolve_many([str(payload.item_url)], session=db)
+    outcome = (await db.run_sync(upsert_mentions, [payload], canonical_urls))[0]
+    if outcome.mention is None:
+        raise HTTPException(status_code=409, detail=outcome.detail)
+    await db.commit()
+    data_version.bump()
+    await db.refresh(outcome.mention)
+    return MentionResponse.model_validate(outcome.mention)
+
+
+@router.post("/bulk", response_model=BulkMentionResponse)
+async def create_mentions_bulk(request: Request, db: AsyncSession = Depends(get_async_db)) -> BulkMentionResponse:
+    """Upsert many mentions in one transaction.
+
+    The body is either a JSON array of ``MentionCreate`` objects or, with an NDJSON
+    content type, one object per line. Invalid rows are reported in ``results`` and
+    don't prevent the others from being stored.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_CONTENT_TYPES:
+        rows = await _read_ndjson(request)
     else:
-        if payload.source_handle and source.handle != payload.source_handle:
-            source.handle = payload.source_handle
-        if payload.source_url and source.url != str(payload.source_url):
-            source.url = str(payload.source_url)
-        if payload.source_type and source.type != payload.source_type:
-            source.type = payload.source_type
-        db.add(source)
-
-    lookup_conditions = [Mention.item_id == item.id, Mention.source_id == source.id]
-    if payload.external_id:
-        lookup_conditions.append(Mention.external_id == payload.external_id)
-    elif payload.post_url:
-        lookup_conditions.append(Mention.post_url == str(payload.post_url))
-    mention_stmt = select(Mention).where(and_(*lookup_conditions))
-    mention = db.scalars(mention_stmt).first()
-
-    if mention is None:
-        mention = Mention(
-            item=item,
-            source=source,
-            post_url=str(payload.post_url) if payload.post_url else None,
-            external_id=payload.external_id,
-            embed_html=payload.embed_html,
-            like_count=payload.like_count,
-            repost_count=payload.repost_count,
-            reply_count=payload.reply_count,
-            note=payload.note,
-            fetched_at=datetime.now(UTC),
+        try:
+            rows = json.loads(await request.body())
+        except json.JSONDecodeError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {exc}") from exc
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of mentions")
+    if len(rows) > MAX_BULK_MENTIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_MENTIONS} mentions per request")
+
+    results: dict[int, BulkMentionResult] = {}
+    valid: list[tuple[int, MentionCreate]] = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, MentionCreate.model_validate(row)))
+        except ValidationError as exc:
+            results[index] = BulkMentionResult(index=index, status=MENTION_FAILED, detail=str(exc))
+
+    payloads = [payload for _, payload in valid]
+    # Short links are followed before the write transaction takes the writer connection
+    canonical_urls = await url_resolver.aresolve_many((str(payload.item_url) for payload in payloads), session=db)
+    # The set-based upsert is shared with ingestion, so it runs on the session's sync facade
+    outcomes = await db.run_sync(upsert_mentions, payloads, canonical_urls)
+    await db.commit()
+    data_version.bump()
+    for outcome in outcomes:
+        index = valid[outcome.index][0]
+        mention = outcome.mention
+        results[index] = BulkMentionResult(
+            index=index,
+            status=outcome.status,
+            mention_id=mention.id if mention else None,
+            item_id=mention.item_id if mention else None,
+            detail=outcome.detail,
         )
-        db.add(mention)
-    else:
-        if payload.post_url:
-            mention.post_url = str(payload.post_url)
-        if payload.embed_html is not None:
-            mention.embed_html = payload.embed_html
-        if payload.external_id:
-            mention.external_id = payload.external_id
-        if payload.note is not None:
-            mention.note = payload.note
-        if payload.like_count is not None:
-            mention.like_count = payload.like_count
-        if payload.repost_count is not None:
-            mention.repost_count = payload.repost_count
-        if payload.reply_count is not None:
-            mention.reply_count = payload.reply_count
-        mention.fetched_at = datetime.now(UTC)
-
-    item.last_seen_at = datetime.now(UTC)
-    if payload.published_at and (item.published_at is None or item.published_at < payload.published_at):
-        item.published_at = payload.published_at
-    if payload.source_type and (not item.source_type or item.source_type == "unknown"):
-        item.source_type = payload.source_type
-    compute_item_scores(item)
-    db.add(item)
-    db.commit()
-    db.refresh(mention)
-    return MentionResponse.model_validate(mention)
+    ordered = [results[index] for index in sorted(results)]
+    return BulkMentionResponse(
+        created=sum(result.status == MENTION_CREATED for result in ordered),
+        updated=sum(result.status == MENTION_UPDATED for result in ordered),
+        failed=sum(result.status == MENTION_FAILED for result in ordered),
+        results=ordered,
+    )
+
+
+async def _read_ndjson(request: Request) -> list[Any]:
+    rows: list[Any] = []
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        rows.extend(_parse_ndjson_lines(lines, len(rows)))
+        if len(rows) > MAX_BULK_MENTIONS:
+            break
+    rows.extend(_parse_ndjson_lines([buffer], len(rows)))
+    return rows
+
+
+def _parse_ndjson_lines(lines: list[bytes], offset: int) -> list[Any]:
+    rows = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError as exc:
+            record = offset + len(rows) + 1
+            raise HTTPException(status_code=400, detail=f"Invalid JSON in record {record}: {exc}") from exc
+    return rows
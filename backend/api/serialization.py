@@ -0,0 +1,101 @@
+"""JSON encoding of item responses without a pydantic round trip.
+
+Returning dicts lets FastAPI validate them against ``response_model`` (parsing every
+URL as ``HttpUrl``) and then serialize the models again, which costs more than the
+listing query itself. ``ItemJSONResponse`` writes the same bytes directly: fields in
+schema order, URLs as ``HttpUrl`` renders them, datetimes as pydantic formats them,
+and the encoder settings of Starlette's ``JSONResponse``. ``tests/test_serialization.py``
+checks the output against the validated path.
+
+orjson is not used because it formats floats differently (``1e-5`` rather than
+``1e-05``), and decayed ``score_new`` values reach that range.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable
+
+from fastapi import Response
+from pydantic import HttpUrl, TypeAdapter
+
+from backend.schemas.item import ItemResponse, MentionSummary
+
+# Listings repeat the same URLs on every request
+URL_CACHE_SIZE = 65_536
+
+_http_url = TypeAdapter(HttpUrl)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _url(value: str) -> str:
+    return str(_http_url.validate_python(value))
+
+
+def _optional_url(value: str | None) -> str | None:
+    return None if value is None else _url(value)
+
+
+def _datetime(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+MENTION_FIELDS = tuple(MentionSummary.model_fields)
+_mention_values = itemgetter(*MENTION_FIELDS)
+
+
+def _mentions(mentions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    converted = []
+    for mention in mentions:
+        content = dict(zip(MENTION_FIELDS, _mention_values(mention)))
+        content["post_url"] = _optional_url(content["post_url"])
+        converted.append(content)
+    return converted
+
+
+# Fields that the schema coerces or formats; the rest are emitted as they are
+ITEM_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "url": _url,
+    "normalized_url": _url,
+    "score_new": float,
+    "score_buzz": float,
+    "score_raw": float,
+    "published_at": _datetime,
+    "last_seen_at": _datetime,
+    "mentions": _mentions,
+    "created_at": _datetime,
+    "updated_at": _datetime,
+}
+# Schema order, which is the order FastAPI's serialization emits
+ITEM_FIELDS = tuple(ItemResponse.model_fields)
+_item_values = itemgetter(*ITEM_FIELDS)
+
+
+def item_json(item: dict[str, Any]) -> dict[str, Any]:
+    """JSON-ready form of an item response dict, identical to ``ItemResponse`` output."""
+    content = dict(zip(ITEM_FIELDS, _item_values(item)))
+    for name, convert in ITEM_CONVERTERS.items():
+        content[name] = convert(content[name])
+    return content
+
+
+class ItemJSONResponse(Response):
+    """``JSONResponse`` for item dicts (or lists of them), skipping model validation."""
+
+    media_type = "application/json"
+
+    def render(self, content: dict[str, Any] | list[dict[str, Any]]) -> bytes:
+        data = [item_json(item) for item in content] if isinstance(content, list) else item_json(content)
+        encoded = json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+        return encoded.encode("utf-8")
+
+
+def item_json_response(content: dict[str, Any] | list[dict[str, Any]], response: Response) -> ItemJSONResponse:
+    """Encode ``content``, keeping headers set on the endpoint's injected ``response``."""
+    return ItemJSONResponse(content, headers=dict(response.headers))
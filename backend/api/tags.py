@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api.caching import cache_validators
+from backend.database import get_async_read_db
+from backend.models import TagCount
+from backend.schemas.tag import TagCountResponse
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+
+@router.get("/", response_model=list[TagCountResponse], dependencies=[Depends(cache_validators)])
+async def list_tags(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> list[TagCountResponse]:
+    stmt = (
+        select(TagCount)
+        .where(TagCount.count > 0)
+        .order_by(TagCount.count.desc(), TagCount.tag)
+        .limit(limit)
+    )
+    return [TagCountResponse.model_validate(row) for row in await db.scalars(stmt)]
@@ -1,14 +1,146 @@
 from __future__ import annotations
 
+import os
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, Engine, create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./data/app.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+DEFAULT_DATABASE_URL = "sqlite:///./data/app.db"
+SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL)
+
+# SQLite tuning, overridable through the environment
+SQLITE_CACHE_SIZE_KIB = int(os.environ.get("SQLITE_CACHE_SIZE_KIB", 64 * 1024))
+SQLITE_MMAP_SIZE_BYTES = int(os.environ.get("SQLITE_MMAP_SIZE_BYTES", 256 * 1024 * 1024))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+READ_POOL_SIZE = int(os.environ.get("DATABASE_READ_POOL_SIZE", 8))
+
+# asyncio drivers used for the async sessions, per backend
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def _sqlite_pragmas(read_only: bool) -> list[str]:
+    pragmas = [
+        f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA synchronous = NORMAL",
+        f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KIB}",
+        f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE_BYTES}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # WAL lets readers proceed while the writer commits; the mode persists in the file
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+    return pragmas
+
+
+def _install_pragmas(engine: Engine, read_only: bool) -> None:
+    pragmas = _sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection: Any, _record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _install_immediate_begin(engine: Engine) -> None:
+    """Start writer transactions with ``BEGIN IMMEDIATE``.
+
+    A deferred transaction that reads first and then writes fails at once with
+    ``SQLITE_BUSY`` when another connection committed in between, without waiting
+    on ``busy_timeout``. Taking the write lock up front makes contending writers
+    wait for each other instead.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection: Any, _record: Any) -> None:
+        # Stop the driver from issuing its own deferred BEGIN
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(connection: Connection) -> None:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def async_url(url: str | URL) -> URL:
+    """Return ``url`` with its driver swapped for the asyncio one (``aiosqlite``/``asyncpg``)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def sync_url(url: str | URL) -> URL:
+    """Return ``url`` with an asyncio driver replaced by the backend's default DBAPI."""
+    parsed = make_url(url)
+    if parsed.get_driver_name() in ASYNC_DRIVERS.values():
+        return parsed.set(drivername=parsed.get_backend_name())
+    return parsed
+
+
+def create_engines(
+    url: str | URL, *, asynchronous: bool = False
+) -> tuple[Engine, Engine] | tuple[AsyncEngine, AsyncEngine]:
+    """Return ``(writer, reader)`` engines for ``url``, as ``AsyncEngine`` with ``asynchronous``.
+
+    On a SQLite file the writer is a single pooled connection, so writes through one
+    writer engine queue up in the pool, and readers get their own pool of
+    ``query_only`` connections that WAL keeps unblocked during writes. The sync and
+    async writers (and other processes) are separate connections that still contend
+    for the database lock: writer transactions begin with ``BEGIN IMMEDIATE`` so they
+    wait up to ``SQLITE_BUSY_TIMEOUT_MS`` for each other instead of failing with
+    ``SQLITE_BUSY``. Other databases (and in-memory SQLite) share one engine for both roles.
+    """
+    parsed = async_url(url) if asynchronous else sync_url(url)
+    factory = create_async_engine if asynchronous else create_engine
+    if parsed.get_backend_name() != "sqlite":
+        engine = factory(parsed, pool_pre_ping=True)
+        return engine, engine
+    connect_args = {"check_same_thread": False}
+    if parsed.database in (None, "", ":memory:"):
+        engine = factory(parsed, connect_args=connect_args, poolclass=StaticPool)
+        return engine, engine
+    pool = AsyncAdaptedQueuePool if asynchronous else QueuePool
+    writer = factory(parsed, connect_args=connect_args, poolclass=pool, pool_size=1, max_overflow=0)
+    reader = factory(
+        parsed, connect_args=connect_args, poolclass=pool, pool_size=READ_POOL_SIZE, max_overflow=READ_POOL_SIZE
+    )
+    _install_pragmas(writer.sync_engine if asynchronous else writer, read_only=False)
+    _install_immediate_begin(writer.sync_engine if asynchronous else writer)
+    _install_pragmas(reader.sync_engine if asynchronous else reader, read_only=True)
+    return writer, reader
+
+
+def dialect_insert(bind: Session | Connection, table: Any) -> Any:
+    """``INSERT`` construct with ``ON CONFLICT`` support for the dialect behind ``bind``.
+
+    SQLite and PostgreSQL share the ``on_conflict_do_nothing``/``on_conflict_do_update``
+    and ``excluded`` API, so upserts built on this run unchanged on either backend.
+    """
+    dialect = bind.get_bind().dialect if isinstance(bind, Session) else bind.dialect
+    if dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+engine, read_engine = create_engines(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, expire_on_commit=False)
+
+async_engine, async_read_engine = create_engines(SQLALCHEMY_DATABASE_URL, asynchronous=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 
 @contextmanager
@@ -31,3 +163,29 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Session on the read-only pool for endpoints that never write."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engines() -> None:
+    """Close pooled async connections, which stay bound to the event loop that opened them."""
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
@@ -1,21 +1,78 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import logging
+import signal
 from pathlib import Path
 
+from backend.database import dispose_async_engines
 from backend.init_db import init_db
+from backend.services.summarizer import DEFAULT_FETCH_WORKERS, SummaryPipeline
+from backend.utils.article_cache import ArticleCache
+from backend.utils.http import http_client
 
-from .manager import IngestManager
+from .manager import DEFAULT_MAX_CONCURRENCY, DEFAULT_PER_HOST_LIMIT, IngestManager
+from .scheduler import IngestScheduler
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_async(manager: IngestManager, max_concurrency: int, per_host_limit: int) -> None:
+    try:
+        await manager.run_once_async(max_concurrency=max_concurrency, per_host_limit=per_host_limit)
+    finally:
+        await http_client.aclose()
+        await dispose_async_engines()
+
+
+async def _run_daemon(manager: IngestManager, max_concurrency: int, per_host_limit: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    logger.info("Ingestion daemon started; SIGINT/SIGTERM to stop")
+    try:
+        await IngestScheduler(manager, max_concurrency=max_concurrency, per_host_limit=per_host_limit).run(stop)
+    finally:
+        await http_client.aclose()
+        await dispose_async_engines()
+    logger.info("Ingestion daemon stopped")
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run ingestion cycle")
     parser.add_argument("--config", type=Path, default=Path("config/sources.yaml"))
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Fetch all feeds concurrently")
+    parser.add_argument(
+        "--daemon", action="store_true", help="Keep polling each feed on its own interval until interrupted"
+    )
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Max in-flight feed requests")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST_LIMIT, help="Max in-flight requests per host")
+    parser.add_argument("--summary-workers", type=int, default=DEFAULT_FETCH_WORKERS, help="Article fetch threads")
+    parser.add_argument(
+        "--parse-workers", type=int, default=None, help="Summary parsing processes (0 parses in the fetch threads)"
+    )
+    parser.add_argument("--no-article-cache", action="store_true", help="Always download articles for summaries")
     args = parser.parse_args()
 
     init_db()
-    manager = IngestManager(args.config)
-    manager.run_once()
+    cache = None if args.no_article_cache else ArticleCache()
+    with SummaryPipeline(
+        fetch_workers=args.summary_workers, parse_workers=args.parse_workers, cache=cache
+    ) as summarizer:
+        manager = IngestManager(args.config, summarizer=summarizer)
+        if args.daemon:
+            # The scheduler queues pending items itself, at start and then periodically
+            asyncio.run(_run_daemon(manager, args.concurrency, args.per_host))
+        else:
+            summarizer.submit_pending()
+            if args.use_async:
+                asyncio.run(_run_async(manager, args.concurrency, args.per_host))
+            else:
+                manager.run_once()
+    http_client.close()
+    logger.info("HTTP client stats: %s", http_client.metrics.snapshot())
 
 
 if __name__ == "__main__":
@@ -1,20 +1,56 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+from urllib.parse import urlparse
 
+import httpx
 import yaml
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
 
-from backend.database import session_scope
+from backend.database import AsyncReadSessionLocal, AsyncSessionLocal, dialect_insert, session_scope
 from backend.models import Item, Mention, Source
-from backend.services.scoring import compute_item_scores
-from backend.utils import summary as summary_utils
+from backend.services.cache import data_version
+from backend.services.canonical import url_resolver
+from backend.services.ranking import as_utc
+from backend.services.scoring import adjust_item_scores, apply_source_weight_change, mention_contribution
+from backend.services.summarizer import SUMMARY_PENDING, SummaryPipeline, share_cluster_summaries
 from backend.utils.url import normalize_url
 
-from .rss import RSSFetcher
+from .rss import RSSFetcher, RSSItem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 20
+DEFAULT_PER_HOST_LIMIT = 2
+
+
+class InvalidConfig(ValueError):
+    """``sources.yaml`` doesn't have the shape ingestion expects."""
+
+
+def validate_config(config: Any) -> dict[str, Any]:
+    """Check a parsed ``sources.yaml``: a mapping whose ``sources`` each have a ``name`` and ``type``."""
+    if config is None:
+        return {}
+    if not isinstance(config, dict):
+        raise InvalidConfig("top level must be a mapping")
+    sources = config.get("sources") or []
+    if not isinstance(sources, list):
+        raise InvalidConfig("'sources' must be a list")
+    for index, source in enumerate(sources):
+        if not isinstance(source, dict):
+            raise InvalidConfig(f"sources[{index}] must be a mapping")
+        if not isinstance(source.get("name"), str) or not source["name"]:
+            raise InvalidConfig(f"sources[{index}] needs a name")
+        if not source.get("type"):
+            raise InvalidConfig(f"source {source['name']!r} needs a type")
+    return config
 
 
 def _resolve_source_type(config: dict[str, Any]) -> str:
@@ -28,16 +64,46 @@ def _resolve_source_type(config: dict[str, Any]) -> str:
     )
 
 
+def _make_fetcher(config: dict[str, Any], source: Source | None) -> RSSFetcher:
+    if source is None:
+        return RSSFetcher(config["feed_url"])
+    return RSSFetcher(
+        config["feed_url"],
+        etag=source.feed_etag,
+        last_modified=source.feed_last_modified,
+        content_hash=source.feed_content_hash,
+        last_guid=source.feed_last_guid,
+        last_published_at=as_utc(source.feed_last_published_at) if source.feed_last_published_at else None,
+    )
+
+
+def _apply_canonical_urls(entries: list[RSSItem], canonical_urls: dict[str, str]) -> None:
+    """Point entries at their resolved URLs so short links join the article's item."""
+    for entry in entries:
+        canonical = canonical_urls.get(entry.url)
+        if canonical and canonical != normalize_url(entry.url):
+            entry.url = canonical
+
+
 class IngestManager:
-    def __init__(self, config_path: str | Path):
+    def __init__(self, config_path: str | Path, summarizer: SummaryPipeline | None = None):
         self.config_path = Path(config_path)
+        # New items are committed as pending; without a pipeline they wait for a later run
+        self.summarizer = summarizer
         if not self.config_path.exists():
             raise FileNotFoundError(f"Config not found: {self.config_path}")
+        self.reload_config()
+
+    def load_config(self) -> dict[str, Any]:
+        """Read and validate the config file without applying it; raises ``InvalidConfig``."""
         with self.config_path.open("r", encoding="utf-8") as f:
-            self.config = yaml.safe_load(f)
+            return validate_config(yaml.safe_load(f))
+
+    def reload_config(self) -> None:
+        self.config = self.load_config()
 
     def run_once(self) -> None:
-        sources = self.config.get("sources", [])
+        sources = self.config.get("sources") or []
         for source_config in sources:
             ingest_type = source_config["type"]
             if ingest_type == "rss":
@@ -46,81 +112,267 @@ class IngestManager:
                 # Placeholder for other source types
                 continue
 
+    async def run_once_async(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    ) -> None:
+        """Fetch every RSS source concurrently and store each feed as soon as it arrives.
+
+        Downloads go through the shared ``http_client`` pool and its per-host rate limits;
+        ``max_concurrency`` caps the number of in-flight requests overall and
+        ``per_host_limit`` caps them per feed host. Feeds are
+        parsed in a worker thread and written through an ``AsyncSession``, so the event
+        loop keeps fetching meanwhile.
+        """
+        rss_sources = [config for config in self.config.get("sources") or [] if config["type"] == "rss"]
+        if not rss_sources:
+            return
+        known_sources = await self._load_sources([config["name"] for config in rss_sources])
+        global_limit = asyncio.Semaphore(max_concurrency)
+        host_limits: dict[str, asyncio.Semaphore] = {}
+        tasks = [
+            asyncio.create_task(
+                self._fetch_feed(
+                    config,
+                    _make_fetcher(config, known_sources.get(config["name"])),
+                    global_limit,
+                    host_limits,
+                    per_host_limit,
+                )
+            )
+            for config in rss_sources
+        ]
+        for completed in asyncio.as_completed(tasks):
+            config, fetcher, content = await completed
+            if content is None:
+                continue
+            try:
+                await self._store_feed(config, fetcher, content)
+            except Exception:
+                # One feed failing to store shouldn't stop the others; its validators weren't saved, so it's retried
+                logger.exception("Failed to store %s", fetcher.feed_url)
+
+    async def _fetch_feed(
+        self,
+        config: dict[str, Any],
+        fetcher: RSSFetcher,
+        global_limit: asyncio.Semaphore,
+        host_limits: dict[str, asyncio.Semaphore],
+        per_host_limit: int,
+    ) -> tuple[dict[str, Any], RSSFetcher, bytes | None]:
+        host = urlparse(fetcher.feed_url).netloc
+        host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host_limit))
+        async with host_limit, global_limit:
+            try:
+                content = await fetcher.fetch_content()
+            except httpx.HTTPError as exc:
+                # A broken feed shouldn't stop the rest of the cycle
+                logger.warning("Failed to fetch %s: %s", fetcher.feed_url, exc)
+                content = None
+        return config, fetcher, content
+
+    async def poll_source(
+        self,
+        config: dict[str, Any],
+        global_limit: asyncio.Semaphore,
+        host_limits: dict[str, asyncio.Semaphore],
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    ) -> int | None:
+        """Fetch and store one RSS source; returns its new entry count, or ``None`` if the fetch failed."""
+        known = await self._load_sources([config["name"]])
+        fetcher = _make_fetcher(config, known.get(config["name"]))
+        _, fetcher, content = await self._fetch_feed(config, fetcher, global_limit, host_limits, per_host_limit)
+        if content is None:
+            return 0 if fetcher.not_modified else None
+        return await self._store_feed(config, fetcher, content)
+
+    async def _store_feed(self, config: dict[str, Any], fetcher: RSSFetcher, content: bytes) -> int:
+        entries = await asyncio.to_thread(lambda: list(fetcher.parse(content)))
+        async with AsyncSessionLocal() as session, session.begin():
+            # Resolutions are written in this transaction, after the network lookups
+            canonical_urls = await url_resolver.aresolve_many((entry.url for entry in entries), session=session)
+            _apply_canonical_urls(entries, canonical_urls)
+            source = await session.run_sync(self._upsert_source, config)
+            created = await session.run_sync(self._write_entries, source, fetcher, entries)
+        # Submitting blocks while the summary queue is full; keep that off the event loop
+        await asyncio.to_thread(self._after_store, created)
+        return len(entries)
+
+    async def _load_sources(self, names: list[str]) -> dict[str, Source]:
+        async with AsyncReadSessionLocal() as session:
+            sources = (await session.scalars(select(Source).where(Source.name.in_(names)))).all()
+        return {source.name: source for source in sources}
+
     def _get_or_create_source(self, config: dict[str, Any]) -> Source:
+        with session_scope() as session:
+            return self._upsert_source(session, config)
+
+    def _upsert_source(self, session: Session, config: dict[str, Any]) -> Source:
         name = config["name"]
         handle = config.get("handle")
-        with session_scope() as session:
-            stmt = select(Source).where(Source.name == name)
-            source = session.scalars(stmt).first()
-            display_type = _resolve_source_type(config)
-            metadata = config.get("metadata", {})
-            if source:
-                source.type = display_type
-                source.handle = handle
-                source.url = config.get("url")
-                source.weight = config.get("weight", 1.0)
-                source.metadata_json = json.dumps(metadata, ensure_ascii=False)
-                session.add(source)
-                session.flush()
-                return source
-            source = Source(
-                name=name,
-                handle=handle,
-                type=display_type,
-                url=config.get("url"),
-                weight=config.get("weight", 1.0),
-                metadata_json=json.dumps(metadata, ensure_ascii=False),
-            )
+        stmt = select(Source).where(Source.name == name)
+        source = session.scalars(stmt).first()
+        display_type = _resolve_source_type(config)
+        metadata = config.get("metadata", {})
+        if source:
+            source.type = display_type
+            source.handle = handle
+            source.url = config.get("url")
+            weight = config.get("weight", 1.0)
+            if source.weight != weight:
+                apply_source_weight_change(session, source.id, source.weight, weight)
+                source.weight = weight
+            source.metadata_json = json.dumps(metadata, ensure_ascii=False)
             session.add(source)
             session.flush()
             return source
+        source = Source(
+            name=name,
+            handle=handle,
+            type=display_type,
+            url=config.get("url"),
+            weight=config.get("weight", 1.0),
+            metadata_json=json.dumps(metadata, ensure_ascii=False),
+        )
+        session.add(source)
+        session.flush()
+        return source
 
     def _ingest_rss(self, config: dict[str, Any]) -> None:
-        fetcher = RSSFetcher(config["feed_url"])
         source = self._get_or_create_source(config)
-        for entry in fetcher.fetch():
-            self._upsert_item(entry.url, source, title=entry.title, published_at=entry.published_at)
+        fetcher = _make_fetcher(config, source)
+        try:
+            entries = fetcher.fetch()
+        except httpx.HTTPError as exc:
+            logger.warning("Failed to fetch %s: %s", fetcher.feed_url, exc)
+            return
+        if fetcher.not_modified:
+            return
+        self._store_entries(source, fetcher, entries)
 
-    def _upsert_item(self, url: str, source: Source, title: str | None = None, published_at: datetime | None = None) -> None:
-        normalized = normalize_url(url)
+    def _store_entries(self, source: Source, fetcher: RSSFetcher, entries: Iterable[RSSItem]) -> None:
+        entries = list(entries)
+        _apply_canonical_urls(entries, url_resolver.resolve_many(entry.url for entry in entries))
         with session_scope() as session:
-            stmt = select(Item).where(Item.normalized_url == normalized)
-            item = session.scalars(stmt).first()
-            if item is None:
-                item = Item(
-                    url=url,
-                    normalized_url=normalized,
-                    title=title,
-                    published_at=published_at,
-                    last_seen_at=datetime.now(UTC),
-                    source_type=source.type,
-                )
-                session.add(item)
-                session.flush()
-
-                try:
-                    summary = summary_utils.summarize_url(url)
-                    item.summary = summary.text
-                    item.summary_points_json = summary_utils.serialize_points(summary.bullet_points)
-                    item.tags_json = summary_utils.serialize_tags(summary.tags)
-                    item.language = summary.language
-                except Exception:
-                    # Summary failures shouldn't stop ingestion
-                    pass
-            else:
-                item.last_seen_at = datetime.now(UTC)
-                if published_at and (item.published_at is None or item.published_at < published_at):
-                    item.published_at = published_at
-                if title and not item.title:
-                    item.title = title
-                if not item.source_type:
-                    item.source_type = source.type
-            mention_stmt = select(Mention).where(Mention.item_id == item.id, Mention.source_id == source.id)
-            mention = session.scalars(mention_stmt).first()
-            if mention is None:
-                mention = Mention(item_id=item.id, source_id=source.id, source=source)
-                session.add(mention)
-                item.mentions.append(mention)
-            mention.fetched_at = datetime.now(UTC)
-            compute_item_scores(item)
-            session.add(item)
+            created = self._write_entries(session, source, fetcher, entries)
+        self._after_store(created)
+
+    def _write_entries(
+        self, session: Session, source: Source, fetcher: RSSFetcher, entries: Iterable[RSSItem]
+    ) -> list[tuple[int, str]]:
+        created = self.upsert_entries(session, source, entries)
+        # Syndicated copies of a story already being summarized don't need their own fetch
+        shared = share_cluster_summaries(session, [item_id for item_id, _ in created])
+        # Validators are saved in the same transaction so a failed store is retried in full
+        session.execute(
+            update(Source)
+            .where(Source.id == source.id)
+            .values(
+                feed_etag=fetcher.etag,
+                feed_last_modified=fetcher.last_modified,
+                feed_content_hash=fetcher.content_hash,
+                feed_last_guid=fetcher.last_guid,
+                feed_last_published_at=fetcher.last_published_at,
+            )
+        )
+        return [(item_id, url) for item_id, url in created if item_id not in shared]
+
+    def _after_store(self, created: list[tuple[int, str]]) -> None:
+        data_version.bump()
+        # Summarize only after the rows are committed so the write lock isn't held during the fetch
+        if self.summarizer is not None:
+            for item_id, url in created:
+                self.summarizer.submit(item_id, url)
+
+    def upsert_entries(self, session: Session, source: Source, entries: Iterable[RSSItem]) -> list[tuple[int, str]]:
+        """Upsert a whole feed's entries and their mentions with set-based statements.
+
+        Existing items are resolved with one ``IN`` query, missing ones are inserted with
+        ``INSERT ... ON CONFLICT (url) DO NOTHING`` (rows that hit the conflict are read
+        back and treated as existing) and items that gained a mention have its
+        contribution added to their running score. Returns ``(item_id, url)`` for the
+        created items.
+        """
+        now = datetime.now(UTC)
+        by_url: dict[str, RSSItem] = {}
+        for entry in entries:
+            by_url.setdefault(normalize_url(entry.url), entry)
+        if not by_url:
+            return []
+
+        items = {
+            item.normalized_url: item
+            for item in session.scalars(select(Item).where(Item.normalized_url.in_(by_url)))
+        }
+        new_rows = [
+            {
+                "url": entry.url,
+                "normalized_url": normalized,
+                "title": entry.title,
+                "published_at": entry.published_at,
+                "last_seen_at": now,
+                "source_type": source.type,
+                "summary_status": SUMMARY_PENDING,
+            }
+            for normalized, entry in by_url.items()
+            if normalized not in items
+        ]
+        created: list[tuple[int, str]] = []
+        if new_rows:
+            insert_stmt = (
+                dialect_insert(session, Item)
+                .values(new_rows)
+                .on_conflict_do_nothing(index_elements=[Item.url])
+                .returning(Item.id, Item.url)
+            )
+            created = [(row.id, row.url) for row in session.execute(insert_stmt)]
+            # A URL already stored under another normalized_url (e.g. from older
+            # normalization rules) is that item; it still gets the mention
+            inserted = {url for _, url in created}
+            conflicting = {row["url"]: row["normalized_url"] for row in new_rows if row["url"] not in inserted}
+            if conflicting:
+                for item in session.scalars(select(Item).where(Item.url.in_(conflicting))):
+                    items[conflicting[item.url]] = item
+
+        for normalized, item in items.items():
+            entry = by_url[normalized]
+            item.last_seen_at = now
+            if entry.published_at and (item.published_at is None or item.published_at < entry.published_at):
+                item.published_at = entry.published_at
+            if entry.title and not item.title:
+                item.title = entry.title
+            if not item.source_type:
+                item.source_type = source.type
+
+        item_ids = [item.id for item in items.values()] + [item_id for item_id, _ in created]
+        if not item_ids:
+            return created
+        mentioned = set(
+            session.scalars(
+                select(Mention.item_id).where(Mention.source_id == source.id, Mention.item_id.in_(item_ids))
+            )
+        )
+        if mentioned:
+            session.execute(
+                update(Mention)
+                .where(Mention.source_id == source.id, Mention.item_id.in_(mentioned))
+                .values(fetched_at=now, updated_at=now)
+            )
+        changed_ids = [item_id for item_id in item_ids if item_id not in mentioned]
+        if changed_ids:
+            session.execute(
+                insert(Mention),
+                [
+                    {"item_id": item_id, "source_id": source.id, "fetched_at": now}
+                    for item_id in changed_ids
+                ],
+            )
+
+        # Items whose mentions didn't change keep their raw score; only freshness moves
+        adjust_item_scores(session, [item for item in items.values() if item.id in mentioned], 0.0)
+        if changed_ids:
+            # A new feed mention has no engagement counts, so it adds exactly one unit of weight
+            contribution = mention_contribution(None, None, None, source.weight)
+            adjust_item_scores(session, session.scalars(select(Item).where(Item.id.in_(changed_ids))), contribution)
+        return created
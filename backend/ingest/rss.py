@@ -1,38 +1,218 @@
 from __future__ import annotations
 
+import hashlib
+import logging
 from datetime import datetime
-from typing import Iterable
+from io import BytesIO
+from typing import Iterable, Iterator
 
 import feedparser
+import httpx
 from dateutil import parser as date_parser, tz
+from lxml import etree
 
+from backend.utils.http import USER_AGENT, http_client
 from backend.utils.url import normalize_url
 
+logger = logging.getLogger(__name__)
+
+FEED_TIMEOUT_SECONDS = 30
+MAX_FEED_BYTES = 10 * 1024 * 1024
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+RSS1 = "{http://purl.org/rss/1.0/}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+ENTRY_TAGS = ("item", f"{ATOM}entry", f"{RSS1}item")
+
 
 class RSSItem:
-    def __init__(self, title: str, url: str, published_at: datetime | None):
+    def __init__(self, title: str, url: str, published_at: datetime | None, guid: str | None = None):
         self.title = title
         self.url = url
         self.published_at = published_at
+        self.guid = guid or url
 
 
 class RSSFetcher:
-    def __init__(self, feed_url: str):
+    """Fetches a feed conditionally using the validators from the previous fetch.
+
+    ``etag``/``last_modified`` are sent as ``If-None-Match``/``If-Modified-Since`` and
+    ``content_hash`` catches servers that ignore them. After a fetch the attributes hold
+    the validators to persist, and ``not_modified`` tells whether parsing was skipped.
+
+    ``last_guid``/``last_published_at`` are the high-water mark: the newest entry
+    ingested from this feed. Feeds list newest entries first, so parsing stops at the
+    marked entry and the rest of the document is never parsed; everything above it is
+    new whatever its date, so backdated or reordered entries aren't dropped. When
+    more than ``limit`` entries are new, the ones right above the mark are taken and
+    the validators are cleared so the next fetch parses the rest. The mark is
+    advanced past the entries returned and should be persisted with them.
+    """
+
+    def __init__(
+        self,
+        feed_url: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        content_hash: str | None = None,
+        last_guid: str | None = None,
+        last_published_at: datetime | None = None,
+    ):
         self.feed_url = feed_url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.last_guid = last_guid
+        self.last_published_at = last_published_at
+        self.not_modified = False
+
+    def request_headers(self) -> dict[str, str]:
+        headers = {"User-Agent": USER_AGENT}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
 
     def fetch(self, limit: int = 50) -> Iterable[RSSItem]:
-        feed = feedparser.parse(self.feed_url)
-        for entry in feed.entries[:limit]:
-            link = entry.get("link")
-            if not link:
-                continue
-            title = entry.get("title", "")
-            published_at = None
-            if entry.get("published"):
-                try:
-                    published_at = date_parser.parse(entry.published)
-                    if published_at and published_at.tzinfo is None:
-                        published_at = published_at.replace(tzinfo=tz.UTC)
-                except (ValueError, TypeError):
-                    published_at = None
-            yield RSSItem(title=title, url=normalize_url(link), published_at=published_at)
+        response = http_client.get(
+            self.feed_url, headers=self.request_headers(), timeout=FEED_TIMEOUT_SECONDS, max_bytes=MAX_FEED_BYTES
+        )
+        content = self._accept(response)
+        if content is None:
+            return iter(())
+        return self.parse(content, limit)
+
+    async def fetch_content(self) -> bytes | None:
+        """Download the raw feed document, or return ``None`` if it hasn't changed."""
+        response = await http_client.aget(
+            self.feed_url, headers=self.request_headers(), timeout=FEED_TIMEOUT_SECONDS, max_bytes=MAX_FEED_BYTES
+        )
+        return self._accept(response)
+
+    def parse(self, content: bytes, limit: int = 50) -> Iterator[RSSItem]:
+        """Yield the entries newer than the high-water mark from a downloaded feed, at most ``limit``."""
+        known_guid, known_published = self.last_guid, self.last_published_at
+        new: list[RSSItem] = []
+        reached = False
+        for item in _iter_feed(content):
+            if item.guid == known_guid:
+                reached = True
+                break
+            new.append(item)
+            if known_guid is None and len(new) >= limit:
+                # A feed seen for the first time starts from its newest entries
+                break
+        if not reached and known_published is not None:
+            # The marked entry has left the feed, so only its date tells old from new
+            new = [item for item in new if item.published_at is None or item.published_at >= known_published]
+        if len(new) > limit:
+            new = new[-limit:]
+            self.etag = self.last_modified = self.content_hash = None
+        if new:
+            self.last_guid = new[0].guid
+        for item in new:
+            if item.published_at is not None and (
+                self.last_published_at is None or item.published_at > self.last_published_at
+            ):
+                self.last_published_at = item.published_at
+        return iter(new)
+
+    def _accept(self, response: httpx.Response) -> bytes | None:
+        if response.status_code == 304:
+            self.not_modified = True
+            return None
+        response.raise_for_status()
+        content = response.content
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash == self.content_hash:
+            self.not_modified = True
+            return None
+        self.content_hash = content_hash
+        self.not_modified = False
+        return content
+
+
+def _iter_feed(content: bytes) -> Iterator[RSSItem]:
+    """Entries in document order, streamed with lxml; feedparser takes over on malformed XML."""
+    yielded: set[str] = set()
+    try:
+        for item in _stream_entries(content):
+            yielded.add(item.guid)
+            yield item
+    except etree.XMLSyntaxError as exc:
+        logger.debug("Falling back to feedparser: %s", exc)
+        for item in _feedparser_entries(content):
+            if item.guid not in yielded:
+                yield item
+
+
+def _stream_entries(content: bytes) -> Iterator[RSSItem]:
+    events = etree.iterparse(
+        BytesIO(content), events=("end",), tag=ENTRY_TAGS, resolve_entities=False, no_network=True
+    )
+    for _, element in events:
+        item = _entry_from_element(element)
+        # Drop parsed entries so memory stays flat however long the feed is
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+        if item is not None:
+            yield item
+
+
+def _entry_from_element(element: etree._Element) -> RSSItem | None:
+    if element.tag == f"{ATOM}entry":
+        link = None
+        for candidate in element.iterfind(f"{ATOM}link"):
+            if candidate.get("rel", "alternate") == "alternate" and candidate.get("href"):
+                link = candidate.get("href")
+                break
+        title = element.findtext(f"{ATOM}title")
+        guid = element.findtext(f"{ATOM}id")
+        published = element.findtext(f"{ATOM}published") or element.findtext(f"{ATOM}updated")
+    else:
+        namespace = RSS1 if element.tag == f"{RSS1}item" else ""
+        link = element.findtext(f"{namespace}link")
+        title = element.findtext(f"{namespace}title")
+        guid = element.findtext("guid")
+        published = element.findtext("pubDate") or element.findtext(f"{DC}date")
+    link = link.strip() if link else None
+    if not link:
+        return None
+    return RSSItem(
+        title=(title or "").strip(),
+        url=normalize_url(link),
+        published_at=_parse_date(published),
+        guid=guid.strip() if guid and guid.strip() else None,
+    )
+
+
+def _feedparser_entries(content: bytes) -> Iterator[RSSItem]:
+    for entry in feedparser.parse(content).entries:
+        link = entry.get("link")
+        if not link:
+            continue
+        yield RSSItem(
+            title=entry.get("title", ""),
+            url=normalize_url(link),
+            published_at=_parse_date(entry.get("published") or entry.get("updated")),
+            guid=entry.get("id"),
+        )
+
+
+def _parse_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        published_at = date_parser.parse(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if published_at.tzinfo is None:
+        return published_at.replace(tzinfo=tz.UTC)
+    # SQLite drops the offset when storing, so keep everything in UTC
+    return published_at.astimezone(tz.UTC)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import yaml
+
+from .manager import DEFAULT_MAX_CONCURRENCY, DEFAULT_PER_HOST_LIMIT, IngestManager, InvalidConfig
+
+logger = logging.getLogger(__name__)
+
+# Per-source defaults; ``interval``, ``min_interval`` and ``max_interval`` in sources.yaml override them
+DEFAULT_INTERVAL_SECONDS = 300.0
+MIN_INTERVAL_SECONDS = 30.0
+MAX_INTERVAL_SECONDS = 3600.0
+# Interval multipliers after a poll with new entries, without them, and after a failure
+SPEEDUP_FACTOR = 0.5
+SLOWDOWN_FACTOR = 1.5
+FAILURE_FACTOR = 2.0
+JITTER_RATIO = 0.1
+CONFIG_CHECK_SECONDS = 5.0
+# How often items left pending by other writers (e.g. POST /mentions) are queued for summaries
+PENDING_SWEEP_SECONDS = 60.0
+
+
+@dataclass
+class SourceState:
+    config: dict[str, Any]
+    interval: float
+    min_interval: float
+    max_interval: float
+    polls: int = 0
+    failures: int = 0
+    # Bumped whenever the source is rescheduled so stale heap entries are skipped
+    generation: int = 0
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+
+def next_interval(state: SourceState, new_entries: int | None) -> float:
+    """Adapt a source's polling interval to what its last poll found.
+
+    Feeds that keep producing entries converge on ``min_interval``, quiet ones back
+    off towards ``max_interval``, and failures back off faster.
+    """
+    if new_entries is None:
+        factor = FAILURE_FACTOR
+    elif new_entries > 0:
+        factor = SPEEDUP_FACTOR
+    else:
+        factor = SLOWDOWN_FACTOR
+    return min(state.max_interval, max(state.min_interval, state.interval * factor))
+
+
+def _jittered(seconds: float) -> float:
+    return seconds * random.uniform(1 - JITTER_RATIO, 1 + JITTER_RATIO)
+
+
+class IngestScheduler:
+    """Polls every RSS source on its own adaptive interval until ``stop`` is set.
+
+    Due sources come off a heap keyed by their next run time and are polled
+    concurrently under the manager's global and per-host limits. ``sources.yaml`` is
+    reloaded when it changes on disk: new sources are scheduled, removed ones are
+    dropped and edited ones keep their learned interval unless their interval
+    settings changed. Every ``PENDING_SWEEP_SECONDS`` the manager's summarizer
+    queues items still pending, such as ones created through the mentions API.
+    Stopping waits for in-flight polls to finish.
+    """
+
+    def __init__(
+        self,
+        manager: IngestManager,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.manager = manager
+        self.per_host_limit = per_host_limit
+        self.clock = clock
+        self.sources: dict[str, SourceState] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        self._in_flight: set[asyncio.Task] = set()
+        self._config_mtime: int | None = None
+        self._next_sweep = 0.0
+        self._sweep: asyncio.Task | None = None
+        # Set when a poll reschedules its source so the loop recomputes its sleep
+        self._wakeup = asyncio.Event()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        self._config_mtime = self._read_mtime()
+        self._apply_config(initial=True)
+        stopped = asyncio.create_task(stop.wait())
+        while not stop.is_set():
+            self._check_config()
+            now = self.clock()
+            self._sweep_pending(now)
+            while self._heap and self._heap[0][0] <= now:
+                _, generation, name = heapq.heappop(self._heap)
+                state = self.sources.get(name)
+                if state is None or state.generation != generation or state.task is not None:
+                    continue
+                state.task = asyncio.create_task(self._poll(name, state))
+                self._in_flight.add(state.task)
+                state.task.add_done_callback(self._in_flight.discard)
+            wait = CONFIG_CHECK_SECONDS
+            if self.manager.summarizer is not None:
+                wait = min(wait, max(self._next_sweep - now, 0.0))
+            if self._heap:
+                wait = min(wait, max(self._heap[0][0] - now, 0.0))
+            self._wakeup.clear()
+            woken = asyncio.create_task(self._wakeup.wait())
+            await asyncio.wait({stopped, woken}, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            woken.cancel()
+        if self._in_flight:
+            logger.info("Waiting for %d in-flight poll(s)", len(self._in_flight))
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _poll(self, name: str, state: SourceState) -> None:
+        try:
+            new_entries = await self.manager.poll_source(
+                state.config, self._global_limit, self._host_limits, self.per_host_limit
+            )
+        except Exception:
+            logger.exception("Polling %s failed", name)
+            new_entries = None
+        finally:
+            state.task = None
+        state.polls += 1
+        state.failures = state.failures + 1 if new_entries is None else 0
+        state.interval = next_interval(state, new_entries)
+        if self.sources.get(name) is state:
+            self._schedule(name, state, state.interval)
+        logger.debug("Polled %s: %s new entries, next in %.0fs", name, new_entries, state.interval)
+
+    def _sweep_pending(self, now: float) -> None:
+        summarizer = self.manager.summarizer
+        if summarizer is None or now < self._next_sweep or (self._sweep is not None and not self._sweep.done()):
+            return
+        self._next_sweep = now + PENDING_SWEEP_SECONDS
+        self._sweep = asyncio.create_task(self._submit_pending())
+        self._in_flight.add(self._sweep)
+        self._sweep.add_done_callback(self._in_flight.discard)
+
+    async def _submit_pending(self) -> None:
+        try:
+            # Submitting blocks while the summary queue is full; keep that off the event loop
+            queued = await asyncio.to_thread(self.manager.summarizer.submit_pending)
+        except Exception:
+            logger.exception("Queueing pending summaries failed")
+            return
+        if queued:
+            logger.info("Queued %d pending item(s) for summaries", queued)
+
+    def _schedule(self, name: str, state: SourceState, delay: float) -> None:
+        state.generation += 1
+        heapq.heappush(self._heap, (self.clock() + _jittered(delay), state.generation, name))
+        self._wakeup.set()
+
+    def _read_mtime(self) -> int | None:
+        try:
+            return self.manager.config_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _check_config(self) -> None:
+        mtime = self._read_mtime()
+        if mtime is None or mtime == self._config_mtime:
+            return
+        self._config_mtime = mtime
+        try:
+            config = self.manager.load_config()
+            _rss_sources(config)
+        except (OSError, yaml.YAMLError, InvalidConfig) as exc:
+            # Keep polling with the last good config while the file is being edited
+            logger.warning("Ignoring invalid config %s: %s", self.manager.config_path, exc)
+            return
+        # Only swapped in once validated, so a bad edit can't take the daemon down
+        self.manager.config = config
+        logger.info("Reloaded %s", self.manager.config_path)
+        self._apply_config(initial=False)
+
+    def _apply_config(self, initial: bool) -> None:
+        configs = _rss_sources(self.manager.config)
+        for name in set(self.sources) - set(configs):
+            # An in-flight poll finishes but isn't rescheduled
+            del self.sources[name]
+        for name, config in configs.items():
+            settings = _interval_settings(config)
+            state = self.sources.get(name)
+            if state is not None:
+                previous = _interval_settings(state.config)
+                state.config = config
+                if settings != previous:
+                    state.interval, state.min_interval, state.max_interval = settings
+                    if state.task is None:
+                        self._schedule(name, state, state.interval)
+                continue
+            state = SourceState(config, *settings)
+            self.sources[name] = state
+            # Spread the first polls out instead of hitting every feed at once
+            self._schedule(name, state, random.uniform(0, min(state.interval, MIN_INTERVAL_SECONDS)) if initial else 0)
+
+
+def _rss_sources(config: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """RSS source configs by name; raises ``InvalidConfig`` when interval settings aren't numbers."""
+    sources = {source["name"]: source for source in config.get("sources") or [] if source["type"] == "rss"}
+    for name, source in sources.items():
+        try:
+            _interval_settings(source)
+        except (TypeError, ValueError) as exc:
+            raise InvalidConfig(f"source {name!r} has an invalid interval: {exc}") from exc
+    return sources
+
+
+def _interval_settings(config: dict[str, Any]) -> tuple[float, float, float]:
+    minimum = float(config.get("min_interval", MIN_INTERVAL_SECONDS))
+    maximum = float(config.get("max_interval", MAX_INTERVAL_SECONDS))
+    interval = float(config.get("interval", DEFAULT_INTERVAL_SECONDS))
+    return min(max(interval, minimum), maximum), minimum, maximum
@@ -1,11 +1,59 @@
 from __future__ import annotations
 
+from sqlalchemy import Connection, inspect, text
+
 from backend.database import engine
 from backend.models import Base
+from backend.services.ranking import backfill_rank_keys
+from backend.services.scoring import FRESHNESS_HALF_LIFE_MINUTES
+from backend.services.search import ensure_search_index
+from backend.services.tags import backfill_item_tags
+
+
+def _add_missing_columns(connection: Connection) -> None:
+    """Bring tables created by older versions up to date with the models.
+
+    ``create_all`` only creates missing tables, so columns and indexes added to an
+    existing model are applied here with plain ``ALTER TABLE ... ADD COLUMN``.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+# Indexes dropped from the models; create_all never removes them from existing files
+OBSOLETE_INDEXES = (
+    # Single-column rank_buzz index, superseded by ix_items_rank_buzz_id
+    "ix_items_rank_buzz",
+    # sort=new ordered by score_new before it moved to last_seen_at
+    "ix_items_score_new_id",
+)
+
+
+def _drop_obsolete_indexes(connection: Connection) -> None:
+    for name in OBSOLETE_INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
 
 
 def init_db() -> None:
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        had_item_tags = inspect(connection).has_table("item_tags")
+        _add_missing_columns(connection)
+        _drop_obsolete_indexes(connection)
+        Base.metadata.create_all(bind=connection)
+        if not had_item_tags:
+            backfill_item_tags(connection)
+        backfill_rank_keys(connection, FRESHNESS_HALF_LIFE_MINUTES)
+        ensure_search_index(connection)
 
 
 if __name__ == "__main__":
@@ -3,8 +3,11 @@ from __future__ import annotations
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.api import items, mentions
+from backend.api import items, mentions, tags
+from backend.database import dispose_async_engines
 from backend.init_db import init_db
+from backend.services.events import item_events
+from backend.utils.compression import CompressionMiddleware
 
 app = FastAPI(title="AI Matome API", version="0.1.0")
 
@@ -14,12 +17,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[items.NEXT_CURSOR_HEADER],
 )
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(items.router)
 app.include_router(mentions.router)
+app.include_router(tags.router)
 
 
 @app.on_event("startup")
 def on_startup() -> None:
     init_db()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await item_events.close()
+    await dispose_async_engines()
@@ -1,6 +1,9 @@
 from .base import Base
+from .cluster import ItemSignature, SignatureBand
 from .item import Item
 from .mention import Mention
 from .source import Source
+from .tag import ItemTag, TagCount
+from .url_resolution import UrlResolution
 
-__all__ = ["Base", "Item", "Mention", "Source"]
+__all__ = ["Base", "Item", "ItemSignature", "ItemTag", "Mention", "SignatureBand", "Source", "TagCount", "UrlResolution"]
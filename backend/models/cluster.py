@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, ForeignKey, Index, LargeBinary, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class ItemSignature(Base):
+    """MinHash signature of an item's title or extracted text; see ``backend.services.clustering``."""
+
+    __tablename__ = "item_signatures"
+
+    item_id: Mapped[int] = mapped_column(ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(10), primary_key=True)
+    signature: Mapped[bytes] = mapped_column(LargeBinary)
+
+
+class SignatureBand(Base):
+    """LSH index over ``item_signatures``: one row per band bucket a signature hashes into."""
+
+    __tablename__ = "signature_bands"
+    __table_args__ = (Index("ix_signature_bands_item_id", "item_id"),)
+
+    kind: Mapped[str] = mapped_column(String(10), primary_key=True)
+    band: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    item_id: Mapped[int] = mapped_column(ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
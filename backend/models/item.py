@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Integer, String, Text
+from sqlalchemy import DateTime, Float, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, TimestampMixin
@@ -10,6 +10,13 @@ from .base import Base, TimestampMixin
 
 class Item(Base, TimestampMixin):
     __tablename__ = "items"
+    # Keyset pagination walks these in (key DESC, id DESC) order
+    __table_args__ = (
+        Index("ix_items_last_seen_at_id", "last_seen_at", "id"),
+        Index("ix_items_rank_buzz_id", "rank_buzz", "id"),
+        # The change feed behind /items/stream reads items by last update
+        Index("ix_items_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     url: Mapped[str] = mapped_column(String(500), unique=True, index=True)
@@ -19,11 +26,18 @@ class Item(Base, TimestampMixin):
     summary_points_json: Mapped[str | None] = mapped_column(Text)
     tags_json: Mapped[str | None] = mapped_column(String)
     language: Mapped[str | None] = mapped_column(String(20))
+    summary_status: Mapped[str | None] = mapped_column(String(20), index=True)
     source_type: Mapped[str | None] = mapped_column(String(50))
     score_raw: Mapped[float] = mapped_column(Float, default=0.0)
     score_buzz: Mapped[float] = mapped_column(Float, default=0.0)
     score_new: Mapped[float] = mapped_column(Float, default=0.0)
+    # log2(score_raw) + last_seen_at / half-life; see backend.services.ranking
+    rank_buzz: Mapped[float | None] = mapped_column(Float)
     last_seen_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Smallest item id of the near-duplicate story this one belongs to; NULL while it has no duplicates
+    cluster_id: Mapped[int | None] = mapped_column(Integer, index=True)
+    # Item whose article a copied summary came from; NULL when summarized from its own article
+    summary_source_id: Mapped[int | None] = mapped_column(Integer)
 
     mentions: Mapped[list["Mention"]] = relationship(back_populates="item", cascade="all, delete-orphan")
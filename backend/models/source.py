@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime
 from typing import Any
 
-from sqlalchemy import Integer, String
+from sqlalchemy import DateTime, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, TimestampMixin
@@ -19,19 +20,34 @@ class Source(Base, TimestampMixin):
     url: Mapped[str | None] = mapped_column(String(500))
     weight: Mapped[float] = mapped_column(default=1.0)
     metadata_json: Mapped[str | None] = mapped_column(String)
+    feed_etag: Mapped[str | None] = mapped_column(String(255))
+    feed_last_modified: Mapped[str | None] = mapped_column(String(64))
+    feed_content_hash: Mapped[str | None] = mapped_column(String(64))
+    # Newest entry ingested from the feed; parsing stops once it is reached
+    feed_last_guid: Mapped[str | None] = mapped_column(String(500))
+    feed_last_published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
 
     mentions: Mapped[list["Mention"]] = relationship(back_populates="source")
 
     @property
     def metadata_dict(self) -> dict[str, Any]:
-        if not self.metadata_json:
-            return {}
-        try:
-            return json.loads(self.metadata_json)
-        except json.JSONDecodeError:
-            return {}
+        return _load_metadata(self.metadata_json)
 
     @property
     def display_type(self) -> str:
-        metadata = self.metadata_dict
-        return metadata.get("platform") or metadata.get("source_type") or self.type
+        return resolve_display_type(self.type, self.metadata_json)
+
+
+def _load_metadata(metadata_json: str | None) -> dict[str, Any]:
+    if not metadata_json:
+        return {}
+    try:
+        return json.loads(metadata_json)
+    except json.JSONDecodeError:
+        return {}
+
+
+def resolve_display_type(source_type: str, metadata_json: str | None) -> str:
+    """``Source.display_type`` for callers holding plain column values."""
+    metadata = _load_metadata(metadata_json)
+    return metadata.get("platform") or metadata.get("source_type") or source_type
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class UrlResolution(Base):
+    """Where a normalized URL ends up after redirects or its page's ``rel=canonical``."""
+
+    __tablename__ = "url_resolutions"
+
+    url: Mapped[str] = mapped_column(String(500), primary_key=True)
+    resolved_url: Mapped[str] = mapped_column(String(500))
+    # "redirect", "canonical" or "failed" (kept briefly so dead links aren't retried on every sighting)
+    method: Mapped[str] = mapped_column(String(20))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
@@ -28,18 +28,22 @@ class ItemBase(BaseModel):
     summary_points: List[str] = Field(default_factory=list)
     tags: List[str] = Field(default_factory=list)
     language: Optional[str] = None
+    summary_status: Optional[str] = None
     score_new: float
     score_buzz: float
     score_raw: float
     published_at: Optional[datetime]
     last_seen_at: Optional[datetime]
     source_type: Optional[str] = None
+    cluster_id: Optional[int] = None
 
 
 class ItemResponse(ItemBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+    # Items merged into this entry by ``/items?collapse=true``
+    cluster_size: int = 1
     mentions: List[MentionSummary]
     created_at: datetime
     updated_at: datetime
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 
@@ -36,3 +36,18 @@ class MentionResponse(BaseModel):
     reply_count: Optional[int]
     created_at: datetime
     updated_at: datetime
+
+
+class BulkMentionResult(BaseModel):
+    index: int
+    status: str
+    mention_id: Optional[int] = None
+    item_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkMentionResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[BulkMentionResult]
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict
+
+
+class TagCountResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    tag: str
+    count: int
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+from backend.database import engine
+
+RANKING_CACHE_DEPTH = 100
+RANKING_CACHE_MAX_KEYS = 256
+RANKING_CACHE_TTL_SECONDS = 30.0
+
+
+class DataVersion:
+    """Cheap change detector for the item tables.
+
+    Writes made by this process call ``bump``; writes from other processes (the
+    ingestion job) are picked up through the modification time of the SQLite file and
+    its WAL, so checking the version never runs a query. Listeners added with
+    ``add_listener`` are called on every ``bump``, from the bumping thread.
+    """
+
+    def __init__(self, database_path: str | None):
+        self._paths = [database_path, f"{database_path}-wal"] if database_path else []
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def sees_other_processes(self) -> bool:
+        return bool(self._paths)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        self._listeners.append(listener)
+
+    def bump(self) -> None:
+        with self._lock:
+            self._counter += 1
+        for listener in self._listeners:
+            listener()
+
+    def current(self) -> tuple[int, ...]:
+        version = [self._counter]
+        for path in self._paths:
+            try:
+                version.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                version.append(0)
+        return tuple(version)
+
+
+@dataclass
+class _Entry:
+    version: tuple[int, ...]
+    expires_at: float
+    values: list[Any]
+
+
+class RankingCache:
+    """LRU cache of the top ``depth`` ranked responses per listing key.
+
+    Entries are dropped when the data version changes or after ``ttl`` seconds, the
+    latter bounding how stale the time-decayed scores in a cached response can get.
+    """
+
+    def __init__(
+        self,
+        data_version: DataVersion,
+        depth: int = RANKING_CACHE_DEPTH,
+        max_keys: int = RANKING_CACHE_MAX_KEYS,
+        ttl: float = RANKING_CACHE_TTL_SECONDS,
+    ):
+        self.data_version = data_version
+        self.depth = depth
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def covers(self, offset: int, limit: int) -> bool:
+        return offset + limit <= self.depth
+
+    def get(self, key: Hashable, offset: int, limit: int) -> list[Any] | None:
+        version = self.data_version.current()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version or entry.expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry.values[offset : offset + limit]
+
+    def put(self, key: Hashable, values: list[Any], version: tuple[int, ...]) -> None:
+        """Store ``values`` computed while ``version`` was current."""
+        with self._lock:
+            self._entries[key] = _Entry(version=version, expires_at=time.monotonic() + self.ttl, values=values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+data_version = DataVersion(engine.url.database if engine.url.get_backend_name() == "sqlite" else None)
+ranking_cache = RankingCache(data_version)
@@ -0,0 +1,348 @@
+"""Canonical URLs for incoming links.
+
+X mentions arrive as ``t.co`` links and feeds often use other shorteners, so the
+same article would otherwise be stored under several ``normalized_url`` values.
+``UrlResolver`` maps a URL to where it really points: shortener links are followed
+with ``HEAD`` requests, and pages fetched for summaries contribute their
+``<link rel="canonical">`` through ``record_canonical``. The page a short link
+lands on is also checked for ``rel=canonical``, so a ``t.co`` link to an AMP or
+tracking-tagged URL joins the article's item. Results live in the
+``url_resolutions`` table with an expiry and in an in-process LRU, so a repeated
+link costs a dictionary lookup. Lookups use the read-only pools; new resolutions
+are written through the caller's session when it passes one, so they join its
+transaction instead of taking a second writer connection, and only reach the LRU
+once that transaction commits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from datetime import UTC, datetime, timedelta
+from typing import Any, Callable, Iterable
+
+import httpx
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.database import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    dialect_insert,
+    session_scope,
+)
+from backend.models import UrlResolution
+from backend.utils.http import HttpClient, http_client
+from backend.utils.url import find_canonical_url, normalize_url
+
+logger = logging.getLogger(__name__)
+
+SHORTENER_HOSTS = frozenset(
+    {
+        "t.co",
+        "bit.ly",
+        "buff.ly",
+        "dlvr.it",
+        "goo.gl",
+        "ift.tt",
+        "lnkd.in",
+        "ow.ly",
+        "tinyurl.com",
+        "trib.al",
+        "amzn.to",
+        "youtu.be",
+    }
+)
+
+RESOLUTION_TTL = timedelta(days=30)
+# Failed resolutions are retried after this long instead of on every sighting
+FAILURE_TTL = timedelta(hours=1)
+LRU_SIZE = 10_000
+# Bounds how long another process's canonical discoveries stay invisible here
+LRU_TTL_SECONDS = 600.0
+RESOLVE_TIMEOUT_SECONDS = 10.0
+# Some shorteners answer HEAD with an error or a landing page; GET them but read little
+FALLBACK_MAX_BYTES = 64 * 1024
+DEFAULT_CONCURRENCY = 16
+
+METHOD_REDIRECT = "redirect"
+METHOD_CANONICAL = "canonical"
+METHOD_FAILED = "failed"
+
+# Session.info key for resolutions waiting on their transaction
+_PENDING_KEY = "url_resolver.pending"
+
+
+def is_shortener(url: str) -> bool:
+    return (httpx.URL(url).host or "").lower().removeprefix("www.") in SHORTENER_HOSTS
+
+
+class UrlResolver:
+    """Resolves URLs to their canonical, normalized form; safe to share between threads.
+
+    Only shortener hosts are resolved over the network. Other URLs resolve to a
+    recorded canonical URL when there is one and to their normalized self otherwise.
+    """
+
+    def __init__(
+        self,
+        client: HttpClient = http_client,
+        session_factory: Callable[[], AbstractContextManager[Session]] = session_scope,
+        read_session_factory: Callable[[], Session] = ReadSessionLocal,
+        async_session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        async_read_session_factory: Callable[[], AsyncSession] = AsyncReadSessionLocal,
+        lru_size: int = LRU_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client = client
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+        self.async_session_factory = async_session_factory
+        self.async_read_session_factory = async_read_session_factory
+        self.lru_size = lru_size
+        self.clock = clock
+        self._lru: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, url: str) -> str:
+        return self.resolve_many([url])[url]
+
+    def resolve_many(self, urls: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY) -> dict[str, str]:
+        """Map each of ``urls`` to its canonical URL, following unknown short links on a thread pool."""
+        urls = list(urls)
+        keys = {url: normalize_url(url) for url in urls}
+        known = self._cached(keys.values())
+        missing = [key for key in set(keys.values()) if key not in known]
+        if missing:
+            with self.read_session_factory() as session:
+                known.update(self._load(session, missing))
+            unresolved = [key for key in missing if key not in known]
+            if unresolved:
+                with ThreadPoolExecutor(max_workers=min(concurrency, len(unresolved))) as pool:
+                    followed = dict(zip(unresolved, pool.map(self._follow, unresolved)))
+                    with self.read_session_factory() as session:
+                        stored, unchecked = self._landing_pages(session, followed)
+                    pages = dict(zip(unchecked, pool.map(self._page_canonical, unchecked)))
+                with self.session_factory() as session:
+                    known.update(self._store(session, _with_canonical_pages(followed, stored, pages)))
+        return {url: known[key] for url, key in keys.items()}
+
+    async def aresolve_many(
+        self, urls: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY, session: AsyncSession | None = None
+    ) -> dict[str, str]:
+        """Async ``resolve_many``; short links are followed concurrently on the shared async pool.
+
+        New resolutions are written in ``session``'s transaction when given, and in
+        their own transaction on the async writer otherwise.
+        """
+        urls = list(urls)
+        keys = {url: normalize_url(url) for url in urls}
+        known = self._cached(keys.values())
+        missing = [key for key in set(keys.values()) if key not in known]
+        if missing:
+            async with self.async_read_session_factory() as read_session:
+                known.update(await read_session.run_sync(self._load, missing))
+            unresolved = [key for key in missing if key not in known]
+            if unresolved:
+                limit = asyncio.Semaphore(concurrency)
+
+                async def follow(key: str) -> tuple[str, str]:
+                    async with limit:
+                        return await self._afollow(key)
+
+                async def page_canonical(target: str) -> str | None:
+                    async with limit:
+                        return await self._apage_canonical(target)
+
+                followed = dict(zip(unresolved, await asyncio.gather(*(follow(key) for key in unresolved))))
+                async with self.async_read_session_factory() as read_session:
+                    stored, unchecked = await read_session.run_sync(self._landing_pages, followed)
+                pages = dict(zip(unchecked, await asyncio.gather(*(page_canonical(t) for t in unchecked))))
+                resolved = _with_canonical_pages(followed, stored, pages)
+                if session is not None:
+                    known.update(await session.run_sync(self._store, resolved))
+                else:
+                    async with self.async_session_factory() as own_session, own_session.begin():
+                        known.update(await own_session.run_sync(self._store, resolved))
+        return {url: known[key] for url, key in keys.items()}
+
+    def record_canonical(self, url: str, canonical: str) -> None:
+        """Remember that ``url``'s page declared ``canonical`` as its ``rel=canonical`` URL."""
+        key, canonical = normalize_url(url), normalize_url(canonical)
+        if key != canonical:
+            with self.session_factory() as session:
+                self._store(session, {key: (canonical, METHOD_CANONICAL)})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    def _cached(self, keys: Iterable[str]) -> dict[str, str]:
+        now = self.clock()
+        found: dict[str, str] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._lru.get(key)
+                if entry is None:
+                    continue
+                if entry[1] < now:
+                    del self._lru[key]
+                    continue
+                self._lru.move_to_end(key)
+                found[key] = entry[0]
+        return found
+
+    def _remember(self, resolved: dict[str, str]) -> None:
+        expires = self.clock() + LRU_TTL_SECONDS
+        with self._lock:
+            for key, value in resolved.items():
+                self._lru[key] = (value, expires)
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _load(self, session: Session, keys: list[str]) -> dict[str, str]:
+        """Stored resolutions for ``keys``; URLs that need no network resolve to themselves."""
+        found = _stored(session, keys)
+        found.update((key, key) for key in keys if key not in found and not is_shortener(key))
+        self._remember(found)
+        return found
+
+    def _store(self, session: Session, resolved: dict[str, tuple[str, str]]) -> dict[str, str]:
+        now = datetime.now(UTC)
+        rows = [
+            {
+                "url": key,
+                "resolved_url": target,
+                "method": method,
+                "expires_at": now + (FAILURE_TTL if method == METHOD_FAILED else RESOLUTION_TTL),
+            }
+            for key, (target, method) in resolved.items()
+        ]
+        insert = dialect_insert(session, UrlResolution).values(rows)
+        session.execute(
+            insert.on_conflict_do_update(
+                index_elements=[UrlResolution.url],
+                set_={
+                    "resolved_url": insert.excluded.resolved_url,
+                    "method": insert.excluded.method,
+                    "expires_at": insert.excluded.expires_at,
+                },
+            )
+        )
+        targets = {key: target for key, (target, _) in resolved.items()}
+        # A rolled back transaction must not leave resolutions in the LRU that were never stored
+        session.info.setdefault(_PENDING_KEY, []).append((self, targets))
+        return targets
+
+    def _landing_pages(
+        self, session: Session, followed: dict[str, tuple[str, str]]
+    ) -> tuple[dict[str, str], list[str]]:
+        """Stored canonical URLs of the pages short links landed on, and the pages not checked yet."""
+        targets = {target for target, method in followed.values() if method == METHOD_REDIRECT}
+        stored = _stored(session, list(targets)) if targets else {}
+        return stored, sorted(targets - stored.keys())
+
+    def _page_canonical(self, url: str) -> str | None:
+        """The page's ``rel=canonical`` URL (itself when it declares none), or ``None`` if it can't be read."""
+        try:
+            response = self.client.get(
+                url, timeout=RESOLVE_TIMEOUT_SECONDS, max_bytes=FALLBACK_MAX_BYTES, truncate=True
+            )
+        except httpx.HTTPError as exc:
+            logger.info("Could not read %s: %s", url, exc)
+            return None
+        return _declared_canonical(url, response)
+
+    async def _apage_canonical(self, url: str) -> str | None:
+        try:
+            response = await self.client.aget(
+                url, timeout=RESOLVE_TIMEOUT_SECONDS, max_bytes=FALLBACK_MAX_BYTES, truncate=True
+            )
+        except httpx.HTTPError as exc:
+            logger.info("Could not read %s: %s", url, exc)
+            return None
+        return _declared_canonical(url, response)
+
+    def _follow(self, key: str) -> tuple[str, str]:
+        try:
+            response = self.client.head(key, timeout=RESOLVE_TIMEOUT_SECONDS)
+            if _needs_get(response):
+                response = self.client.get(
+                    key, timeout=RESOLVE_TIMEOUT_SECONDS, max_bytes=FALLBACK_MAX_BYTES, truncate=True
+                )
+        except httpx.HTTPError as exc:
+            logger.info("Could not resolve %s: %s", key, exc)
+            return key, METHOD_FAILED
+        return _target(key, response)
+
+    async def _afollow(self, key: str) -> tuple[str, str]:
+        try:
+            response = await self.client.ahead(key, timeout=RESOLVE_TIMEOUT_SECONDS)
+            if _needs_get(response):
+                response = await self.client.aget(
+                    key, timeout=RESOLVE_TIMEOUT_SECONDS, max_bytes=FALLBACK_MAX_BYTES, truncate=True
+                )
+        except httpx.HTTPError as exc:
+            logger.info("Could not resolve %s: %s", key, exc)
+            return key, METHOD_FAILED
+        return _target(key, response)
+
+
+def _stored(session: Session, keys: list[str]) -> dict[str, str]:
+    rows = session.execute(
+        select(UrlResolution.url, UrlResolution.resolved_url).where(
+            UrlResolution.url.in_(keys), UrlResolution.expires_at > datetime.now(UTC)
+        )
+    ).all()
+    return {row.url: row.resolved_url for row in rows}
+
+
+def _declared_canonical(url: str, response: httpx.Response) -> str | None:
+    if response.status_code >= 400:
+        return None
+    return find_canonical_url(response.text, str(response.url)) or url
+
+
+def _with_canonical_pages(
+    followed: dict[str, tuple[str, str]], stored: dict[str, str], pages: dict[str, str | None]
+) -> dict[str, tuple[str, str]]:
+    """Point followed short links past their landing pages' ``rel=canonical`` and record those pages too."""
+    canonical = {**stored, **{page: target for page, target in pages.items() if target is not None}}
+    resolved = {key: (canonical.get(target, target), method) for key, (target, method) in followed.items()}
+    for page, target in pages.items():
+        if target is not None:
+            resolved[page] = (target, METHOD_CANONICAL)
+    return resolved
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed(session: Session) -> None:
+    for resolver, targets in session.info.pop(_PENDING_KEY, ()):
+        resolver._remember(targets)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_uncommitted(session: Session, transaction: Any) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _needs_get(response: httpx.Response) -> bool:
+    return response.status_code >= 400 or is_shortener(str(response.url))
+
+
+def _target(key: str, response: httpx.Response) -> tuple[str, str]:
+    if response.status_code >= 400 or is_shortener(str(response.url)):
+        return key, METHOD_FAILED
+    return normalize_url(str(response.url)), METHOD_REDIRECT
+
+
+url_resolver = UrlResolver()
@@ -0,0 +1,166 @@
+"""Near-duplicate story clustering.
+
+The same announcement is often syndicated under different URLs (vendor blog, news
+sites, reposts), so ``normalize_url`` can't merge them. Items get MinHash signatures
+of their title at ingestion and of their extracted text once summarized; a banded
+LSH index (``signature_bands``) finds candidates sharing at least one band, and
+candidates whose estimated Jaccard similarity reaches ``SIMILARITY_THRESHOLD`` put
+both items in one cluster (``Item.cluster_id``, the smallest id among its items).
+
+``backend.services.summarizer`` uses the clusters to summarize one article per story.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import delete, insert, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from backend.models import Item, ItemSignature, SignatureBand
+
+KIND_TITLE = "title"
+KIND_TEXT = "text"
+
+NUM_PERMUTATIONS = 64
+BAND_ROWS = 4
+NUM_BANDS = NUM_PERMUTATIONS // BAND_ROWS
+# 16 bands of 4 rows make pairs above ~0.5 similarity likely candidates; this filters them
+SIMILARITY_THRESHOLD = 0.6
+# Titles are short, so they use words and word pairs; text uses 3-word shingles
+TITLE_SHINGLES = (1, 2)
+TEXT_SHINGLES = (3,)
+MIN_FEATURES = 5
+MAX_TEXT_CHARS = 20_000
+# Only items this recent are matched, so recurring titles don't chain unrelated stories
+CLUSTER_WINDOW = timedelta(days=7)
+
+# Latin words stay whole while CJK text, which has no spaces, is split per character
+_TOKEN = re.compile(r"[0-9a-z]+|[^\W\d_a-z]")
+# Fixed seed: signatures are stored, so every process must use the same hash family
+_rng = np.random.default_rng(20240101)
+_MULTIPLIERS = _rng.integers(0, 2**64, size=NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**64, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def _hash64(value: bytes, signed: bool = False) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little", signed=signed)
+
+
+def shingles(text: str, sizes: tuple[int, ...]) -> set[str]:
+    tokens = _TOKEN.findall(text.lower())
+    return {" ".join(tokens[i : i + size]) for size in sizes for i in range(len(tokens) - size + 1)}
+
+
+def minhash(features: set[str]) -> np.ndarray | None:
+    """``NUM_PERMUTATIONS`` minimum hashes of ``features``, or ``None`` if there are too few to compare."""
+    if len(features) < MIN_FEATURES:
+        return None
+    hashes = np.fromiter((_hash64(feature.encode("utf-8")) for feature in features), np.uint64, len(features))
+    # Multiply-add hashing mod 2**64, keeping the high bits
+    permuted = hashes[:, None] * _MULTIPLIERS + _OFFSETS
+    return (permuted >> np.uint64(32)).astype(np.uint32).min(axis=0)
+
+
+def title_signature(title: str | None) -> np.ndarray | None:
+    return minhash(shingles(title, TITLE_SHINGLES)) if title else None
+
+
+def text_signature(text: str | None) -> np.ndarray | None:
+    return minhash(shingles(text[:MAX_TEXT_CHARS], TEXT_SHINGLES)) if text else None
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the feature sets behind two signatures."""
+    return float(np.mean(a == b))
+
+
+def title_containment(a: str | None, b: str | None) -> float:
+    """Exact share of the shorter title's shingles found in the other title.
+
+    Near 1.0 when one title is the other plus a site name or tag; unlike the MinHash
+    estimate it drops for titles that differ in a single key word.
+    """
+    first, second = shingles(a or "", TITLE_SHINGLES), shingles(b or "", TITLE_SHINGLES)
+    if not first or not second:
+        return 0.0
+    return len(first & second) / min(len(first), len(second))
+
+
+def band_buckets(signature: np.ndarray) -> list[tuple[int, int]]:
+    return [
+        (band, _hash64(signature[band * BAND_ROWS : (band + 1) * BAND_ROWS].tobytes(), signed=True))
+        for band in range(NUM_BANDS)
+    ]
+
+
+def find_duplicate(session: Session, item_id: int, kind: str, signature: np.ndarray) -> tuple[int, int | None] | None:
+    """Most similar recent item above the threshold, as ``(item_id, cluster_id)``."""
+    since = datetime.now(UTC) - CLUSTER_WINDOW
+    candidates = (
+        select(SignatureBand.item_id)
+        .where(
+            SignatureBand.kind == kind,
+            tuple_(SignatureBand.band, SignatureBand.bucket).in_(band_buckets(signature)),
+            SignatureBand.item_id != item_id,
+        )
+        .distinct()
+    )
+    rows = session.execute(
+        select(ItemSignature.item_id, ItemSignature.signature, Item.cluster_id)
+        .join(Item, Item.id == ItemSignature.item_id)
+        .where(ItemSignature.kind == kind, ItemSignature.item_id.in_(candidates), Item.created_at >= since)
+    ).all()
+    best, best_similarity = None, SIMILARITY_THRESHOLD
+    for row in rows:
+        score = similarity(signature, np.frombuffer(row.signature, dtype=np.uint32))
+        if score >= best_similarity:
+            best, best_similarity = (row.item_id, row.cluster_id), score
+    return best
+
+
+def index_signature(session: Session, item_id: int, kind: str, signature: np.ndarray) -> None:
+    session.execute(delete(ItemSignature).where(ItemSignature.item_id == item_id, ItemSignature.kind == kind))
+    session.execute(delete(SignatureBand).where(SignatureBand.item_id == item_id, SignatureBand.kind == kind))
+    session.execute(insert(ItemSignature).values(item_id=item_id, kind=kind, signature=signature.tobytes()))
+    session.execute(
+        insert(SignatureBand),
+        [
+            {"kind": kind, "band": band, "bucket": bucket, "item_id": item_id}
+            for band, bucket in band_buckets(signature)
+        ],
+    )
+
+
+def assign_cluster(session: Session, item_id: int, kind: str, signature: np.ndarray) -> int | None:
+    """Index ``signature`` and put the item in the cluster of its closest duplicate.
+
+    Returns the item's cluster id, or ``None`` while it has no duplicate. When the
+    item already belonged to another cluster the two are merged.
+    """
+    match = find_duplicate(session, item_id, kind, signature)
+    index_signature(session, item_id, kind, signature)
+    if match is None:
+        return session.scalar(select(Item.cluster_id).where(Item.id == item_id))
+    return join_clusters(session, item_id, match[0])
+
+
+def join_clusters(session: Session, item_id: int, other_id: int) -> int:
+    """Put two items, and everything already clustered with either, in one cluster; returns its id."""
+    current, other = (
+        session.scalar(select(Item.cluster_id).where(Item.id == item_id)),
+        session.scalar(select(Item.cluster_id).where(Item.id == other_id)),
+    )
+    clusters = [cluster for cluster in (current, other) if cluster is not None]
+    # Cluster ids are the smallest member id, which also holds after a merge
+    target = min(clusters + [item_id, other_id])
+    session.execute(
+        update(Item)
+        .where(or_(Item.id.in_([item_id, other_id]), Item.cluster_id.in_(clusters)))
+        .values(cluster_id=target)
+        .execution_options(synchronize_session=False)
+    )
+    return target
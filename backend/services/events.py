@@ -0,0 +1,299 @@
+"""Server-sent events for item changes, behind ``GET /items/stream``.
+
+One watcher per API process turns item writes into compact deltas and fans them
+out to every connected client, so open tabs patch their lists instead of each
+re-running the ranked listing query. Writers need no extra wiring: every write
+path already calls ``data_version.bump()``, which wakes the watcher, and writes
+from the ingestion process are noticed through the SQLite file's modification
+time (or by polling when the database is PostgreSQL).
+
+Each change is read with an indexed ``updated_at`` query and encoded once;
+subscribers receive the same bytes. ``updated_at`` is set when a row is flushed,
+not when it commits, so on PostgreSQL a transaction can commit a row behind the
+feed's position. Every read therefore re-scans ``CHANGE_GRACE_SECONDS`` behind it,
+and rows whose published state is unchanged produce no events.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict, deque
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, AsyncIterator
+
+from sqlalchemy import Row, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import AsyncReadSessionLocal
+from backend.models import Item
+from backend.services.cache import DataVersion, data_version
+from backend.services.scoring import scores_at
+from backend.services.summarizer import SUMMARY_DONE
+from backend.utils.summary import deserialize_list
+
+logger = logging.getLogger(__name__)
+
+EVENT_ITEM = "item"
+EVENT_SCORE = "score"
+EVENT_SUMMARY = "summary"
+# Tells a client it missed events and should reload its list
+EVENT_RESET = "reset"
+
+POLL_SECONDS = 1.0
+CHANGES_PER_QUERY = 500
+# How far behind the newest change a late-committing write may still land
+CHANGE_GRACE_SECONDS = 30.0
+KEEPALIVE_SECONDS = 15.0
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Events kept for clients reconnecting with Last-Event-ID
+REPLAY_EVENTS = 1000
+# Last published (score_raw, summary_status) per item, to tell what changed
+KNOWN_ITEMS = 50_000
+RECONNECT_MILLISECONDS = 3000
+
+CHANGE_COLUMNS = (
+    Item.id,
+    Item.url,
+    Item.title,
+    Item.source_type,
+    Item.summary,
+    Item.summary_points_json,
+    Item.tags_json,
+    Item.language,
+    Item.summary_status,
+    Item.score_raw,
+    Item.last_seen_at,
+    Item.published_at,
+    Item.cluster_id,
+    Item.created_at,
+    Item.updated_at,
+)
+
+
+def encode_event(event_id: int, event: str, data: dict[str, Any]) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class ItemEventBroker:
+    """In-process pub/sub of item deltas for server-sent event streams.
+
+    The watcher task starts with the first subscriber and only queries while there
+    are subscribers. A subscriber that falls ``SUBSCRIBER_QUEUE_SIZE`` events
+    behind has its backlog replaced by a ``reset`` event.
+    """
+
+    def __init__(self, version: DataVersion = data_version, session_factory=AsyncReadSessionLocal):
+        self.version = version
+        self.session_factory = session_factory
+        self._subscribers: set[asyncio.Queue[bytes]] = set()
+        self._replay: deque[tuple[int, bytes]] = deque(maxlen=REPLAY_EVENTS)
+        self._known: OrderedDict[int, tuple[float, str | None]] = OrderedDict()
+        self._sequence = 0
+        self._started = False
+        self._cursor: tuple[datetime, int] | None = None
+        self._seen_version: tuple[int, ...] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        version.add_listener(self.notify)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def notify(self) -> None:
+        """Wake the watcher; safe to call from any thread."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def stream(self, last_event_id: int | None = None) -> AsyncIterator[bytes]:
+        """Encoded events for one client, starting after ``last_event_id`` when it can be replayed."""
+        self._ensure_watcher()
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if last_event_id is not None:
+            oldest = self._replay[0][0] if self._replay else self._sequence + 1
+            if last_event_id > self._sequence or last_event_id + 1 < oldest:
+                queue.put_nowait(self._reset_event())
+            else:
+                for event_id, payload in self._replay:
+                    if event_id > last_event_id:
+                        queue.put_nowait(payload)
+        self._subscribers.add(queue)
+        try:
+            yield f"retry: {RECONNECT_MILLISECONDS}\n\n".encode()
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comments keep proxies from closing idle connections
+                    yield b": keepalive\n\n"
+        finally:
+            self._subscribers.discard(queue)
+
+    def publish(self, event: str, data: dict[str, Any]) -> None:
+        """Send one event to every subscriber; must run on the event loop."""
+        self._sequence += 1
+        payload = encode_event(self._sequence, event, data)
+        self._replay.append((self._sequence, payload))
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._reset_event())
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._loop = self._wakeup = None
+
+    def _reset_event(self) -> bytes:
+        return encode_event(self._sequence, EVENT_RESET, {})
+
+    def _ensure_watcher(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._watch())
+
+    async def _watch(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self._subscribers:
+                # Nobody missed anything; start from the present when someone connects
+                self._started = False
+                continue
+            version = self.version.current()
+            if version == self._seen_version and self.version.sees_other_processes:
+                continue
+            self._seen_version = version
+            try:
+                await self.publish_changes()
+            except Exception:
+                logger.exception("Reading item changes failed")
+
+    async def publish_changes(self) -> int:
+        """Publish events for items updated since the last call; returns how many were sent."""
+        async with self.session_factory() as session:
+            if not self._started:
+                self._started = True
+                self._known.clear()
+                latest = select(Item.updated_at, Item.id).order_by(Item.updated_at.desc(), Item.id.desc()).limit(1)
+                row = (await session.execute(latest)).first()
+                self._cursor = (row.updated_at, row.id) if row else None
+                if row is not None:
+                    # Rows the grace window revisits were already visible to clients
+                    async for rows in self._changed_rows(session, self._grace_start()):
+                        for row in rows:
+                            self._remember(row)
+                return 0
+            # Items created after this were created since the last call
+            created_after = self._grace_start()
+            sent = 0
+            async for rows in self._changed_rows(session, created_after):
+                now = datetime.now(UTC)
+                for row in rows:
+                    for event, data in self._events_for(row, created_after, now):
+                        self.publish(event, data)
+                        sent += 1
+                last = (rows[-1].updated_at, rows[-1].id)
+                if self._cursor is None or last > self._cursor:
+                    self._cursor = last
+            return sent
+
+    def _grace_start(self) -> datetime | None:
+        if self._cursor is None:
+            return None
+        return self._cursor[0] - timedelta(seconds=CHANGE_GRACE_SECONDS)
+
+    async def _changed_rows(self, session: AsyncSession, since: datetime | None) -> AsyncIterator[list[Row]]:
+        """Pages of rows updated at or after ``since``, by (updated_at, id)."""
+        position: tuple[datetime, int] | None = None
+        while True:
+            # Keyset over (updated_at, id), so bulk updates sharing one timestamp are paged through
+            stmt = select(*CHANGE_COLUMNS).order_by(Item.updated_at, Item.id).limit(CHANGES_PER_QUERY)
+            if position is not None:
+                updated_at, item_id = position
+                stmt = stmt.where(
+                    or_(Item.updated_at > updated_at, and_(Item.updated_at == updated_at, Item.id > item_id))
+                )
+            elif since is not None:
+                stmt = stmt.where(Item.updated_at >= since)
+            rows = (await session.execute(stmt)).all()
+            if rows:
+                yield rows
+                position = (rows[-1].updated_at, rows[-1].id)
+            if len(rows) < CHANGES_PER_QUERY:
+                return
+
+    def _remember(self, row: Row) -> tuple[float, str | None] | None:
+        """Record the state published for ``row``; returns the previous one."""
+        previous = self._known.pop(row.id, None)
+        self._known[row.id] = (row.score_raw, row.summary_status)
+        if len(self._known) > KNOWN_ITEMS:
+            self._known.popitem(last=False)
+        return previous
+
+    def _events_for(
+        self, row: Row, created_after: datetime | None, now: datetime
+    ) -> list[tuple[str, dict[str, Any]]]:
+        previous = self._remember(row)
+        score_new, score_buzz = scores_at(row.score_raw, row.last_seen_at, now)
+        scores = {"id": row.id, "score_new": score_new, "score_buzz": score_buzz, "score_raw": row.score_raw}
+        events: list[tuple[str, dict[str, Any]]] = []
+        if previous is None and (created_after is None or row.created_at > created_after):
+            events.append(
+                (
+                    EVENT_ITEM,
+                    {
+                        **scores,
+                        "url": row.url,
+                        "title": row.title,
+                        "source_type": row.source_type,
+                        "published_at": row.published_at,
+                        "summary_status": row.summary_status,
+                        "cluster_id": row.cluster_id,
+                    },
+                )
+            )
+        elif previous is None or previous[0] != row.score_raw:
+            events.append((EVENT_SCORE, scores))
+        if row.summary_status == SUMMARY_DONE and (previous is None or previous[1] != SUMMARY_DONE):
+            events.append(
+                (
+                    EVENT_SUMMARY,
+                    {
+                        "id": row.id,
+                        "summary": row.summary,
+                        "summary_points": deserialize_list(row.summary_points_json),
+                        "tags": deserialize_list(row.tags_json),
+                        "language": row.language,
+                    },
+                )
+            )
+        return events
+
+
+item_events = ItemEventBroker()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Iterable, Mapping, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.database import dialect_insert
+from backend.models import Item, Mention, Source
+from backend.schemas.mention import MentionCreate
+from backend.services.scoring import adjust_item_scores, mention_contribution
+from backend.services.summarizer import SUMMARY_PENDING
+from backend.utils.url import normalize_url
+
+MENTION_CREATED = "created"
+MENTION_UPDATED = "updated"
+MENTION_FAILED = "error"
+
+
+@dataclass
+class MentionOutcome:
+    index: int
+    status: str
+    mention: Mention | None = None
+    detail: str | None = None
+
+
+def upsert_mentions(
+    session: Session, payloads: Sequence[MentionCreate], canonical_urls: Mapping[str, str] | None = None
+) -> list[MentionOutcome]:
+    """Upsert mentions for ``payloads`` with set-based lookups; the caller commits.
+
+    Items and sources are resolved with one ``IN`` query each (creating missing ones in
+    bulk), existing mentions for the touched (item, source) pairs are loaded at once and
+    every touched item's score is adjusted a single time at the end.
+
+    ``canonical_urls`` maps item URLs to their resolved form (see
+    ``backend.services.canonical``), so short links land on the article's item.
+    """
+    if not payloads:
+        return []
+    now = datetime.now(UTC)
+    canonical_urls = canonical_urls or {}
+    normalized = [
+        canonical_urls.get(str(payload.item_url)) or normalize_url(str(payload.item_url)) for payload in payloads
+    ]
+    items = _resolve_items(session, payloads, normalized, now)
+    sources = _resolve_sources(session, payloads)
+    existing = _load_existing_mentions(session, items.values(), sources.values())
+
+    outcomes: list[MentionOutcome] = []
+    deltas: dict[int, float] = defaultdict(float)
+    for index, (payload, item_url) in enumerate(zip(payloads, normalized)):
+        item = items.get(item_url)
+        if item is None:
+            outcomes.append(MentionOutcome(index, MENTION_FAILED, detail="Item URL conflicts with an existing item"))
+            continue
+        source = sources[payload.source_name]
+        candidates = existing.setdefault((item.id, source.id), [])
+        mention = _match_mention(candidates, payload)
+        if mention is None:
+            mention = Mention(
+                item_id=item.id,
+                source_id=source.id,
+                post_url=str(payload.post_url) if payload.post_url else None,
+                external_id=payload.external_id,
+                embed_html=payload.embed_html,
+                like_count=payload.like_count,
+                repost_count=payload.repost_count,
+                reply_count=payload.reply_count,
+                note=payload.note,
+                fetched_at=now,
+            )
+            session.add(mention)
+            candidates.append(mention)
+            deltas[item.id] += _contribution(mention, source)
+            status = MENTION_CREATED
+        else:
+            before = _contribution(mention, source)
+            _update_mention(mention, payload, now)
+            deltas[item.id] += _contribution(mention, source) - before
+            status = MENTION_UPDATED
+
+        item.last_seen_at = now
+        if payload.published_at and (item.published_at is None or item.published_at < payload.published_at):
+            item.published_at = payload.published_at
+        if payload.source_type and (not item.source_type or item.source_type == "unknown"):
+            item.source_type = payload.source_type
+        outcomes.append(MentionOutcome(index, status, mention=mention))
+
+    # Scores move by the change in each mention's contribution, so viral items with
+    # thousands of mentions cost the same to update as fresh ones.
+    items_by_id = {item.id: item for item in items.values()}
+    by_delta: dict[float, list[Item]] = defaultdict(list)
+    for item_id, delta in deltas.items():
+        by_delta[delta].append(items_by_id[item_id])
+    for delta, changed in by_delta.items():
+        adjust_item_scores(session, changed, delta)
+    session.flush()
+    return outcomes
+
+
+def _contribution(mention: Mention, source: Source) -> float:
+    return mention_contribution(mention.like_count, mention.repost_count, mention.reply_count, source.weight)
+
+
+def _resolve_items(
+    session: Session, payloads: Sequence[MentionCreate], normalized: list[str], now: datetime
+) -> dict[str, Item]:
+    wanted = set(normalized)
+    items = {item.normalized_url: item for item in session.scalars(select(Item).where(Item.normalized_url.in_(wanted)))}
+    new_rows: dict[str, dict] = {}
+    for payload, item_url in zip(payloads, normalized):
+        if item_url in items or item_url in new_rows:
+            continue
+        url = str(payload.item_url)
+        new_rows[item_url] = {
+            # Resolved short links are stored under the article's URL
+            "url": url if normalize_url(url) == item_url else item_url,
+            "normalized_url": item_url,
+            "title": None,
+            "last_seen_at": now,
+            "source_type": payload.source_type,
+            "summary_status": SUMMARY_PENDING,
+        }
+    if new_rows:
+        session.execute(
+            dialect_insert(session, Item)
+            .values(list(new_rows.values()))
+            .on_conflict_do_nothing(index_elements=[Item.url])
+        )
+        # Read back by URL: a URL already stored under another normalized_url is that item
+        keys = {row["url"]: item_url for item_url, row in new_rows.items()}
+        created = session.scalars(select(Item).where(Item.url.in_(keys)))
+        items.update((keys[item.url], item) for item in created)
+    return items
+
+
+def _resolve_sources(session: Session, payloads: Sequence[MentionCreate]) -> dict[str, Source]:
+    names = {payload.source_name for payload in payloads}
+    sources = {source.name: source for source in session.scalars(select(Source).where(Source.name.in_(names)))}
+    for payload in payloads:
+        source = sources.get(payload.source_name)
+        if source is None:
+            source = Source(
+                name=payload.source_name,
+                handle=payload.source_handle,
+                type=payload.source_type,
+                url=str(payload.source_url) if payload.source_url else None,
+            )
+            session.add(source)
+            sources[source.name] = source
+            continue
+        if payload.source_handle and source.handle != payload.source_handle:
+            source.handle = payload.source_handle
+        if payload.source_url and source.url != str(payload.source_url):
+            source.url = str(payload.source_url)
+        if payload.source_type and source.type != payload.source_type:
+            source.type = payload.source_type
+    session.flush()
+    return sources
+
+
+def _load_existing_mentions(
+    session: Session, items: Iterable[Item], sources: Iterable[Source]
+) -> dict[tuple[int, int], list[Mention]]:
+    item_ids = [item.id for item in items]
+    source_ids = [source.id for source in sources]
+    existing: dict[tuple[int, int], list[Mention]] = {}
+    if not item_ids or not source_ids:
+        return existing
+    stmt = (
+        select(Mention)
+        .where(Mention.item_id.in_(item_ids), Mention.source_id.in_(source_ids))
+        .order_by(Mention.id)
+    )
+    for mention in session.scalars(stmt):
+        existing.setdefault((mention.item_id, mention.source_id), []).append(mention)
+    return existing
+
+
+def _match_mention(candidates: list[Mention], payload: MentionCreate) -> Mention | None:
+    # Same rules as a single lookup: external id first, then post URL, else any mention
+    for mention in candidates:
+        if payload.external_id:
+            if mention.external_id == payload.external_id:
+                return mention
+        elif payload.post_url:
+            if mention.post_url == str(payload.post_url):
+                return mention
+        else:
+            return mention
+    return None
+
+
+def _update_mention(mention: Mention, payload: MentionCreate, now: datetime) -> None:
+    if payload.post_url:
+        mention.post_url = str(payload.post_url)
+    if payload.embed_html is not None:
+        mention.embed_html = payload.embed_html
+    if payload.external_id:
+        mention.external_id = payload.external_id
+    if payload.note is not None:
+        mention.note = payload.note
+    if payload.like_count is not None:
+        mention.like_count = payload.like_count
+    if payload.repost_count is not None:
+        mention.repost_count = payload.repost_count
+    if payload.reply_count is not None:
+        mention.reply_count = payload.reply_count
+    mention.fetched_at = now
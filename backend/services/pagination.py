@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+# Listing sort keys: a float rank key or a timestamp
+SortKey = float | datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, key: SortKey | None, item_id: int) -> str:
+    """Opaque keyset cursor pointing just past ``(key, item_id)`` in ``sort`` order.
+
+    ``key`` is ``None`` once paging has reached the rows without a sort key.
+    Timestamps are carried as ISO 8601 strings.
+    """
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    payload = json.dumps([sort, key, item_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple[SortKey | None, int]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key, item_id = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+    if cursor_sort != sort:
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    if not isinstance(item_id, int) or (key is not None and not isinstance(key, (int, float, str))):
+        raise InvalidCursor("Malformed cursor")
+    if isinstance(key, str):
+        try:
+            return datetime.fromisoformat(key), item_id
+        except ValueError as exc:
+            raise InvalidCursor("Malformed cursor") from exc
+    return (float(key) if key is not None else None), item_id
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import math
+from datetime import UTC, datetime
+
+from sqlalchemy import Connection, bindparam, select, update
+
+from backend.models import Item
+
+# Stand-in for a zero raw score so its logarithm stays finite
+MIN_RANK_SCORE = 1e-6
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
+
+
+def buzz_rank_key(score_raw: float, last_seen_at: datetime | None, half_life_minutes: float) -> float:
+    """Time-independent sort key for buzz ordering.
+
+    ``score_buzz = raw * 0.5 ** (age / half_life)``, so ``log2(score_buzz)`` equals
+    ``log2(raw) + t / half_life - now / half_life`` where ``t`` is ``last_seen_at`` in
+    minutes. The ``now`` term is shared by every row, so ordering by the remaining part
+    ranks items exactly as their buzz score would at any query time. That holds
+    because the decay has no floor (see ``scoring.freshness_decay``).
+    """
+    minutes = 0.0
+    if last_seen_at is not None:
+        minutes = (as_utc(last_seen_at) - EPOCH).total_seconds() / 60
+    return math.log2(max(score_raw, MIN_RANK_SCORE)) + minutes / half_life_minutes
+
+
+def backfill_rank_keys(connection: Connection, half_life_minutes: float) -> int:
+    """Fill ``rank_buzz`` for rows written before the column existed."""
+    rows = connection.execute(
+        select(Item.id, Item.score_raw, Item.last_seen_at).where(Item.rank_buzz.is_(None))
+    ).all()
+    if rows:
+        stmt = update(Item).where(Item.id == bindparam("item_id")).values(rank_buzz=bindparam("rank_key"))
+        connection.execute(
+            stmt,
+            [
+                {"item_id": row.id, "rank_key": buzz_rank_key(row.score_raw or 0.0, row.last_seen_at, half_life_minutes)}
+                for row in rows
+            ],
+        )
+    return len(rows)
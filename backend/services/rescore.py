@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import UTC, datetime
+
+import numpy as np
+from sqlalchemy import Connection, String, bindparam, func, select, type_coerce, update
+
+from backend.database import engine
+from backend.models import Item, Mention, Source
+from backend.services.ranking import MIN_RANK_SCORE, as_utc
+from backend.services.scoring import FRESHNESS_HALF_LIFE_MINUTES, contribution_expression
+
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def compute_scores(
+    score_raw: np.ndarray, last_seen: np.ndarray, now: np.datetime64, half_life_minutes: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized ``scores_at`` and ``buzz_rank_key`` over whole columns.
+
+    ``last_seen`` is a naive UTC ``datetime64[us]`` array where ``NaT`` stands for a
+    missing timestamp. Returns ``(score_new, score_buzz, rank_buzz)``.
+    """
+    missing = np.isnat(last_seen)
+    age_minutes = (now - last_seen) / np.timedelta64(1, "m")
+    decay = 0.5 ** (np.where(missing, 0.0, age_minutes) / half_life_minutes)
+    freshness = np.where(missing | (age_minutes <= 0), 1.0, decay)
+    epoch_minutes = np.where(missing, 0.0, last_seen.astype("datetime64[us]").astype(np.int64) / 60_000_000)
+    rank_buzz = np.log2(np.maximum(score_raw, MIN_RANK_SCORE)) + epoch_minutes / half_life_minutes
+    return score_raw + freshness, score_raw * freshness, rank_buzz
+
+
+def rescore_all(connection: Connection, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Recompute ``score_raw``, ``score_new``, ``score_buzz`` and ``rank_buzz`` for every item.
+
+    Raw scores are re-aggregated from mentions with the current source weights in one
+    query and everything else is derived in a single NumPy pass against one ``now``.
+    The half-life is always ``FRESHNESS_HALF_LIFE_MINUTES``, the one incremental
+    scoring and ``rank_buzz`` keys written later use, so the stored keys stay comparable.
+    Run it inside one transaction so concurrent mention deltas aren't overwritten.
+    """
+    last_seen_column = Item.last_seen_at
+    if connection.dialect.name == "sqlite":
+        # SQLite keeps naive UTC ISO strings; NumPy parses them far faster than datetime objects
+        last_seen_column = type_coerce(Item.last_seen_at, String)
+    aggregate = (
+        select(Item.id, func.coalesce(func.sum(contribution_expression()), 0.0), last_seen_column)
+        .outerjoin(Mention, Mention.item_id == Item.id)
+        .outerjoin(Source, Source.id == Mention.source_id)
+        .group_by(Item.id, Item.last_seen_at)
+    )
+    rows = connection.execute(aggregate).all()
+    if not rows:
+        return 0
+    ids, raws, seen = zip(*rows)
+    if connection.dialect.name != "sqlite":
+        seen = tuple(as_utc(value).replace(tzinfo=None) if value else None for value in seen)
+
+    now = np.datetime64(datetime.now(UTC).replace(tzinfo=None), "us")
+    score_raw = np.asarray(raws, dtype=np.float64)
+    last_seen = np.asarray(seen, dtype="datetime64[us]")
+    score_new, score_buzz, rank_buzz = compute_scores(score_raw, last_seen, now, FRESHNESS_HALF_LIFE_MINUTES)
+
+    stmt = (
+        update(Item)
+        .where(Item.id == bindparam("item_id"))
+        .values(
+            score_raw=bindparam("raw"),
+            score_new=bindparam("new"),
+            score_buzz=bindparam("buzz"),
+            rank_buzz=bindparam("rank"),
+            # Rescoring isn't a content change; keep updated_at as is
+            updated_at=Item.updated_at,
+        )
+    )
+    # Compile once and hand plain tuples to the driver's executemany; building
+    # per-row parameters through SQLAlchemy would dominate the runtime.
+    compiled = stmt.compile(dialect=connection.dialect)
+    columns = {
+        "item_id": list(ids),
+        "raw": score_raw.tolist(),
+        "new": score_new.tolist(),
+        "buzz": score_buzz.tolist(),
+        "rank": rank_buzz.tolist(),
+    }
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        if compiled.positional:
+            params = list(zip(*(columns[name][start:end] for name in compiled.positiontup)))
+        else:
+            names = list(columns)
+            params = [dict(zip(names, values)) for values in zip(*(columns[name][start:end] for name in names))]
+        connection.exec_driver_sql(compiled.string, params)
+    return len(ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rescore every item in one vectorized pass")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per executemany batch")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        count = rescore_all(connection, batch_size=args.batch_size)
+    print(f"Rescored {count} item(s) in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
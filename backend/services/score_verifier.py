@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.database import session_scope
+from backend.models import Item, Mention, Source
+from backend.services.scoring import apply_scores, contribution_expression
+
+DEFAULT_TOLERANCE = 1e-6
+
+
+@dataclass
+class ScoreDrift:
+    item_id: int
+    stored: float
+    expected: float
+
+
+def verify_item_scores(session: Session, tolerance: float = DEFAULT_TOLERANCE, fix: bool = False) -> list[ScoreDrift]:
+    """Recompute every item's raw score from its mentions and report incremental drift.
+
+    ``tolerance`` is relative to the expected score. With ``fix`` the drifted items are
+    reset to the recomputed value.
+    """
+    expected = func.coalesce(func.sum(contribution_expression()), 0.0)
+    stmt = (
+        select(Item.id, Item.score_raw, expected.label("expected"))
+        .outerjoin(Mention, Mention.item_id == Item.id)
+        .outerjoin(Source, Source.id == Mention.source_id)
+        .group_by(Item.id, Item.score_raw)
+    )
+    drifts = [
+        ScoreDrift(item_id=row.id, stored=row.score_raw or 0.0, expected=row.expected)
+        for row in session.execute(stmt)
+        if abs((row.score_raw or 0.0) - row.expected) > tolerance * max(1.0, abs(row.expected))
+    ]
+    if fix and drifts:
+        by_id = {drift.item_id: drift.expected for drift in drifts}
+        for item in session.scalars(select(Item).where(Item.id.in_(by_id))):
+            apply_scores(item, by_id[item.id])
+    return drifts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify incrementally maintained item scores")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Relative drift to report")
+    parser.add_argument("--fix", action="store_true", help="Reset drifted items to the recomputed score")
+    args = parser.parse_args()
+
+    with session_scope() as session:
+        drifts = verify_item_scores(session, tolerance=args.tolerance, fix=args.fix)
+    for drift in drifts:
+        print(f"item {drift.item_id}: stored={drift.stored:.6f} expected={drift.expected:.6f}")
+    print(f"{len(drifts)} item(s) drifted{' (fixed)' if args.fix and drifts else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,123 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
+from typing import Iterable
+
+from sqlalchemy import ColumnElement, case, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from backend.models import Item, Mention, Source
+from backend.services.ranking import as_utc, buzz_rank_key
 
 FRESHNESS_HALF_LIFE_MINUTES = 120
 
 
-def freshness_decay(last_seen_at: datetime | None) -> float:
+def freshness_decay(last_seen_at: datetime | None, now: datetime | None = None) -> float:
+    """Halves every half-life with no floor, so ``score_buzz`` keeps the order of ``rank_buzz``."""
     if last_seen_at is None:
         return 1.0
-    now = datetime.now(UTC)
-    age_minutes = (now - last_seen_at).total_seconds() / 60
+    now = now or datetime.now(UTC)
+    age_minutes = (now - as_utc(last_seen_at)).total_seconds() / 60
     if age_minutes <= 0:
         return 1.0
-    half_life = FRESHNESS_HALF_LIFE_MINUTES
-    decay = 0.5 ** (age_minutes / half_life)
-    return max(decay, 0.05)
+    return 0.5 ** (age_minutes / FRESHNESS_HALF_LIFE_MINUTES)
+
+
+def mention_engagement(like_count: int | None, repost_count: int | None, reply_count: int | None) -> float:
+    return (like_count or 0) + 2 * (repost_count or 0) + 0.5 * (reply_count or 0)
+
+
+def engagement_expression() -> ColumnElement[float]:
+    """SQL counterpart of ``mention_engagement`` over the ``mentions`` columns."""
+    return (
+        func.coalesce(Mention.like_count, 0)
+        + 2 * func.coalesce(Mention.repost_count, 0)
+        + 0.5 * func.coalesce(Mention.reply_count, 0)
+    )
+
+
+def mention_contribution(
+    like_count: int | None, repost_count: int | None, reply_count: int | None, weight: float
+) -> float:
+    """What one mention adds to its item's ``score_raw``."""
+    return max(1.0, mention_engagement(like_count, repost_count, reply_count)) * weight
+
+
+def floored_engagement_expression() -> ColumnElement[float]:
+    engagement = engagement_expression()
+    return case((engagement < 1.0, 1.0), else_=engagement)
+
+
+def contribution_expression() -> ColumnElement[float]:
+    """SQL counterpart of ``mention_contribution`` over ``mentions`` joined to ``sources``."""
+    return floored_engagement_expression() * Source.weight
 
 
 def compute_mention_score(mention: Mention, source: Source) -> float:
-    engagement = (mention.like_count or 0) + 2 * (mention.repost_count or 0) + 0.5 * (mention.reply_count or 0)
-    return max(1.0, engagement) * source.weight
+    return mention_contribution(mention.like_count, mention.repost_count, mention.reply_count, source.weight)
+
+
+def scores_at(score_raw: float, last_seen_at: datetime | None, now: datetime | None = None) -> tuple[float, float]:
+    """Return ``(score_new, score_buzz)`` as of ``now`` for a stored raw score."""
+    freshness = freshness_decay(last_seen_at, now)
+    return score_raw + freshness, score_raw * freshness
+
+
+def apply_scores(item: Item, total_raw: float) -> None:
+    """Set the item's scores from an already aggregated raw score."""
+    item.score_raw = total_raw
+    _apply_derived_scores(item)
+
+
+def _apply_derived_scores(item: Item) -> None:
+    item.score_new, item.score_buzz = scores_at(item.score_raw or 0.0, item.last_seen_at)
+    item.rank_buzz = buzz_rank_key(item.score_raw or 0.0, item.last_seen_at, FRESHNESS_HALF_LIFE_MINUTES)
+
+
+def adjust_item_scores(session: Session, items: Iterable[Item], delta: float | ColumnElement[float]) -> None:
+    """Apply a change in mention contributions to ``items`` without loading mentions.
+
+    The database adds ``delta`` (a number, or an expression over the ``items`` row)
+    to ``score_raw`` itself, so writers in other processes can't lose each other's
+    increments. The updated rows stay locked until commit, which keeps the derived
+    scores computed here from the returned ``score_raw`` consistent with it.
+    """
+    by_id = {item.id: item for item in items}
+    if not by_id:
+        return
+    stmt = (
+        update(Item)
+        .where(Item.id.in_(by_id))
+        .values(score_raw=func.coalesce(Item.score_raw, 0.0) + delta)
+        .returning(Item.id, Item.score_raw)
+        .execution_options(synchronize_session=False)
+    )
+    for row in session.execute(stmt):
+        item = by_id[row.id]
+        # Already written; marking it committed keeps the flush from writing it back
+        set_committed_value(item, "score_raw", row.score_raw)
+        _apply_derived_scores(item)
+
+
+def apply_source_weight_change(session: Session, source_id: int, old_weight: float, new_weight: float) -> int:
+    """Shift ``score_raw`` of every item mentioned by a source whose weight changed.
+
+    Each mention contributes ``max(1, engagement) * weight``, so the per-item delta is
+    the unweighted sum for that source times the weight difference. Returns the number
+    of items updated.
+    """
+    if old_weight == new_weight:
+        return 0
+    item_ids = select(Mention.item_id).where(Mention.source_id == source_id).distinct()
+    items = session.scalars(select(Item).where(Item.id.in_(item_ids))).all()
+    unweighted = (
+        select(func.sum(floored_engagement_expression()))
+        .where(Mention.source_id == source_id, Mention.item_id == Item.id)
+        .scalar_subquery()
+    )
+    adjust_item_scores(session, items, unweighted * (new_weight - old_weight))
+    return len(items)
 
 
 def compute_item_scores(item: Item) -> None:
@@ -30,7 +126,4 @@ def compute_item_scores(item: Item) -> None:
         if mention.source is None:
             continue
         total_raw += compute_mention_score(mention, mention.source)
-    freshness = freshness_decay(item.last_seen_at)
-    item.score_raw = total_raw
-    item.score_new = total_raw + freshness
-    item.score_buzz = total_raw * freshness
+    apply_scores(item, total_raw)
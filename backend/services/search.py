@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from sqlalchemy import Connection, ColumnElement, Select, Subquery, column, func, literal_column, select, table, text
+
+# Trigram tokenization makes substring matching work for Japanese text without a
+# morphological analyzer; terms shorter than three characters can't use the index.
+MIN_TERM_LENGTH = 3
+# Weight of log2(buzz) (the rank_buzz key) against bm25 relevance when blending
+SEARCH_BUZZ_WEIGHT = 0.25
+# rank_buzz grows by one per half-life, so it is taken relative to the best match
+# and clamped this many halvings below it; older items don't sink any further
+SEARCH_BUZZ_SPAN = 4.0
+
+FTS_TABLE = "items_fts"
+FTS_COLUMNS = ("title", "summary", "summary_points_json")
+
+items_fts = table(FTS_TABLE, column("rowid"))
+
+_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {", ".join(FTS_COLUMNS)}, content='items', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON items BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(FTS_COLUMNS)})
+        VALUES (new.id, {", ".join(f"new.{name}" for name in FTS_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON items BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(FTS_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join(f"old.{name}" for name in FTS_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {", ".join(FTS_COLUMNS)} ON items BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(FTS_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join(f"old.{name}" for name in FTS_COLUMNS)});
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(FTS_COLUMNS)})
+        VALUES (new.id, {", ".join(f"new.{name}" for name in FTS_COLUMNS)});
+    END
+    """,
+]
+
+
+def ensure_search_index(connection: Connection) -> None:
+    """Create the FTS5 index and its sync triggers, backfilling it on first creation."""
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    ).first()
+    for statement in _FTS_DDL:
+        connection.execute(text(statement))
+    if not exists:
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def match_expression(q: str) -> str | None:
+    """Build an FTS5 query that ANDs each whitespace-separated term as a phrase.
+
+    Returns ``None`` when a term is too short for the trigram index, in which case the
+    caller falls back to a ``LIKE`` scan.
+    """
+    terms = q.split()
+    if not terms or any(len(term) < MIN_TERM_LENGTH for term in terms):
+        return None
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def match_subquery(match: str) -> Subquery:
+    """Item ids matching ``match`` with their bm25 relevance (lower is better)."""
+    return (
+        select(
+            items_fts.c.rowid.label("item_id"),
+            func.bm25(literal_column(FTS_TABLE)).label("relevance"),
+        )
+        .where(literal_column(FTS_TABLE).op("MATCH")(match))
+        .subquery("search")
+    )
+
+
+def apply_search(stmt: Select, q: str, id_column: ColumnElement, rank_column: ColumnElement | None) -> Select | None:
+    """Restrict ``stmt`` to items matching ``q`` via the FTS index.
+
+    With ``rank_column`` the results are ordered by relevance blended with buzz,
+    where buzz counts at most ``SEARCH_BUZZ_WEIGHT * SEARCH_BUZZ_SPAN`` of bm25.
+    Returns ``None`` if the index can't serve the query.
+    """
+    match = match_expression(q)
+    if match is None:
+        return None
+    search = match_subquery(match)
+    stmt = stmt.join(search, search.c.item_id == id_column)
+    if rank_column is not None:
+        behind = func.coalesce(rank_column - func.max(rank_column).over(), -SEARCH_BUZZ_SPAN)
+        blended = search.c.relevance - SEARCH_BUZZ_WEIGHT * func.max(behind, -SEARCH_BUZZ_SPAN)
+        stmt = stmt.order_by(None).order_by(blended.asc())
+    return stmt
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.orm import Session
+
+from backend.database import session_scope
+from backend.models import Item
+from backend.services.cache import data_version
+from backend.services.canonical import url_resolver
+from backend.services.clustering import (
+    KIND_TEXT,
+    KIND_TITLE,
+    assign_cluster,
+    join_clusters,
+    text_signature,
+    title_containment,
+    title_signature,
+)
+from backend.services.tags import set_item_tags
+from backend.utils import summary as summary_utils
+from backend.utils.article_cache import ArticleCache
+from backend.utils.url import find_canonical_url
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PENDING = "pending"
+SUMMARY_DONE = "done"
+SUMMARY_FAILED = "failed"
+
+# Title clusters only share summaries between items whose titles are the same story
+# verbatim (give or take a site name); looser title matches are summarized separately
+TITLE_COPY_CONTAINMENT = 0.95
+
+DEFAULT_FETCH_WORKERS = 8
+DEFAULT_MAX_PENDING = 64
+
+
+class _NotCached(Exception):
+    pass
+
+
+class SummaryPipeline:
+    """Fills in summaries for items that were committed with ``summary_status="pending"``.
+
+    Article downloads run on a thread pool while readability/BeautifulSoup parsing runs
+    on a process pool, so neither happens inside an ingestion transaction. At most
+    ``max_pending`` items are in flight; ``submit`` blocks once that bound is reached.
+    Pass ``parse_workers=0`` to parse in the fetch threads instead of a process pool.
+
+    Items of a near-duplicate cluster (see ``backend.services.clustering``) whose
+    titles are nearly identical share one summary: such an item copies a finished one
+    instead of fetching, a finished summary is copied to those pending items, and when
+    an article can't be fetched the next pending item of its cluster is tried. Copies
+    record their origin in ``summary_source_id``. A page's
+    ``rel=canonical`` URL is recorded for future links and becomes the item's
+    ``normalized_url`` (or clusters it with the item already stored under it).
+
+    With a ``cache``, articles are read from it before downloading and the fetched
+    HTML, extracted text and summary are written back. ``offline`` only summarizes
+    cached pages (expired ones included), which makes re-summarizing CPU-only.
+    """
+
+    def __init__(
+        self,
+        fetch_workers: int = DEFAULT_FETCH_WORKERS,
+        parse_workers: int | None = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        cache: ArticleCache | None = None,
+        offline: bool = False,
+    ):
+        if offline and cache is None:
+            raise ValueError("Offline summarizing needs an article cache")
+        self.cache = cache
+        self.offline = offline
+        self._fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="summary-fetch")
+        self._parse_pool: Executor | None = None
+        if parse_workers != 0:
+            self._parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures: set[Future] = set()
+        # Items queued or being summarized, so repeated sweeps don't queue them twice
+        self._queued: dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> SummaryPipeline:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def submit(self, item_id: int, url: str) -> Future:
+        """Queue ``item_id``; an item already queued gets its existing future back."""
+        with self._lock:
+            queued = self._queued.get(item_id)
+        if queued is not None:
+            return queued
+        self._slots.acquire()
+        with self._lock:
+            # Another thread may have queued it while this one waited for a slot
+            queued = self._queued.get(item_id)
+            if queued is None:
+                future = self._fetch_pool.submit(self._process, item_id, url)
+                self._futures.add(future)
+                self._queued[item_id] = future
+        if queued is not None:
+            self._slots.release()
+            return queued
+        future.add_done_callback(lambda done: self._release(item_id, done))
+        return future
+
+    def submit_pending(self, limit: int | None = None, include_summarized: bool = False) -> int:
+        """Queue items left pending by earlier runs (e.g. created via ``POST /mentions``).
+
+        Items already queued are skipped, so the ingestion daemon can call this
+        periodically. ``include_summarized`` queues every item, to redo summaries
+        after the algorithm changed. Returns how many items were queued.
+        """
+        with self._lock:
+            # Items that finish between the query and the loop below are still skipped
+            skip = set(self._queued)
+        stmt = select(Item.id, Item.url).order_by(Item.id)
+        if not include_summarized:
+            stmt = stmt.where(Item.summary_status == SUMMARY_PENDING)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        with session_scope() as session:
+            rows = session.execute(stmt).all()
+        queued = 0
+        for item_id, url in rows:
+            if item_id in skip:
+                continue
+            self.submit(item_id, url)
+            queued += 1
+        return queued
+
+    def join(self) -> None:
+        while True:
+            with self._lock:
+                futures = list(self._futures)
+            if not futures:
+                return
+            for future in futures:
+                future.exception()
+
+    def close(self) -> None:
+        self.join()
+        self._fetch_pool.shutdown()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _release(self, item_id: int, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+            if self._queued.get(item_id) is future:
+                del self._queued[item_id]
+        self._slots.release()
+
+    def _process(self, item_id: int, url: str) -> None:
+        if _reuse_cluster_summary(item_id):
+            return
+        try:
+            text, summary, canonical = self._summarize(url)
+        except _NotCached:
+            # Offline runs leave uncached items as they are
+            logger.info("Skipping %s: not in the article cache", url)
+            return
+        except Exception as exc:
+            # Summary failures shouldn't stop ingestion
+            logger.info("Summary failed for %s: %s", url, exc)
+            fallback = _store_failure(item_id)
+            if fallback is not None:
+                self._process(*fallback)
+            return
+        _store_summary(item_id, summary, text)
+        if canonical is not None:
+            _adopt_canonical_url(item_id, url, canonical)
+
+    def _summarize(self, url: str) -> tuple[str | None, summary_utils.Summary, str | None]:
+        cached = self.cache.get(url, allow_expired=self.offline) if self.cache is not None else None
+        if cached is not None and cached.summary is not None:
+            return cached.text, cached.summary, find_canonical_url(cached.html, url)
+        if cached is not None:
+            html = cached.html
+        elif self.offline:
+            raise _NotCached(url)
+        else:
+            html = summary_utils.fetch_article_html(url)
+        if self._parse_pool is not None:
+            text, summary = self._parse_pool.submit(summary_utils.extract_and_summarize, html).result()
+        else:
+            text, summary = summary_utils.extract_and_summarize(html)
+        if self.cache is not None:
+            self.cache.put(url, html, text, summary)
+        return text, summary, find_canonical_url(html, url)
+
+
+def share_cluster_summaries(session: Session, item_ids: list[int]) -> set[int]:
+    """Cluster newly ingested items by title; returns the ids that needn't be summarized.
+
+    Those have a nearly identical title to a cluster member and got its finished
+    summary copied, or will get it copied once that member's summary is done.
+    """
+    if not item_ids:
+        return set()
+    shared: set[int] = set()
+    rows = session.execute(select(Item.id, Item.title).where(Item.id.in_(item_ids)).order_by(Item.id)).all()
+    for item_id, title in rows:
+        signature = title_signature(title)
+        if signature is None:
+            continue
+        cluster_id = assign_cluster(session, item_id, KIND_TITLE, signature)
+        if cluster_id is None:
+            continue
+        twins = _title_twins(session, item_id, cluster_id)
+        if _copy_cluster_summary(session, item_id, twins) or any(t.summary_status == SUMMARY_PENDING for t in twins):
+            shared.add(item_id)
+    return shared
+
+
+def _store_summary(item_id: int, summary: summary_utils.Summary, text: str | None = None) -> None:
+    with session_scope() as session:
+        item = session.get(Item, item_id)
+        if item is None:
+            return
+        item.summary = summary.text
+        item.summary_points_json = summary_utils.serialize_points(summary.bullet_points)
+        item.tags_json = summary_utils.serialize_tags(summary.tags)
+        item.language = summary.language
+        item.summary_status = SUMMARY_DONE
+        item.summary_source_id = None
+        set_item_tags(session, item_id, summary.tags)
+        signature = text_signature(text)
+        if signature is not None:
+            # Catches duplicates whose titles differ too much to have matched at ingestion
+            item.cluster_id = assign_cluster(session, item_id, KIND_TEXT, signature)
+        if item.cluster_id is not None:
+            twins = _title_twins(session, item_id, item.cluster_id)
+            _copy_summary(session, item, [twin.id for twin in twins if twin.summary_status == SUMMARY_PENDING])
+    data_version.bump()
+
+
+def _adopt_canonical_url(item_id: int, url: str, canonical: str) -> None:
+    url_resolver.record_canonical(url, canonical)
+    with session_scope() as session:
+        item = session.get(Item, item_id)
+        if item is None or item.normalized_url == canonical:
+            return
+        owner = session.scalar(select(Item.id).where(Item.normalized_url == canonical, Item.id != item_id).limit(1))
+        if owner is None:
+            item.normalized_url = canonical
+        else:
+            join_clusters(session, item_id, owner)
+    data_version.bump()
+
+
+def _store_failure(item_id: int) -> tuple[int, str] | None:
+    """Mark the item failed; returns another pending ``(item_id, url)`` of its cluster to try instead."""
+    with session_scope() as session:
+        item = session.get(Item, item_id)
+        if item is None:
+            return None
+        item.summary_status = SUMMARY_FAILED
+        if item.cluster_id is None:
+            return None
+        row = session.execute(
+            select(Item.id, Item.url)
+            .where(Item.cluster_id == item.cluster_id, Item.summary_status == SUMMARY_PENDING)
+            .order_by(Item.id)
+            .limit(1)
+        ).first()
+        return (row.id, row.url) if row else None
+
+
+def _reuse_cluster_summary(item_id: int) -> bool:
+    with session_scope() as session:
+        item = session.get(Item, item_id)
+        if item is None or item.summary_status != SUMMARY_PENDING or item.cluster_id is None:
+            return False
+        reused = _copy_cluster_summary(session, item_id, _title_twins(session, item_id, item.cluster_id))
+    if reused:
+        data_version.bump()
+    return reused
+
+
+def _title_twins(session: Session, item_id: int, cluster_id: int) -> list[Row]:
+    """Other cluster members whose title nearly equals the item's, as ``(id, summary_status)`` rows by id."""
+    title = session.scalar(select(Item.title).where(Item.id == item_id))
+    members = session.execute(
+        select(Item.id, Item.title, Item.summary_status)
+        .where(Item.cluster_id == cluster_id, Item.id != item_id)
+        .order_by(Item.id)
+    ).all()
+    return [member for member in members if title_containment(title, member.title) >= TITLE_COPY_CONTAINMENT]
+
+
+def _copy_cluster_summary(session: Session, item_id: int, twins: list[Row]) -> bool:
+    source_id = next((twin.id for twin in twins if twin.summary_status == SUMMARY_DONE), None)
+    if source_id is None:
+        return False
+    _copy_summary(session, session.get(Item, source_id), [item_id])
+    return True
+
+
+def _copy_summary(session: Session, source: Item, item_ids: list[int]) -> None:
+    if not item_ids:
+        return
+    session.execute(
+        update(Item)
+        .where(Item.id.in_(item_ids))
+        .values(
+            summary=source.summary,
+            summary_points_json=source.summary_points_json,
+            tags_json=source.tags_json,
+            language=source.language,
+            summary_status=SUMMARY_DONE,
+            summary_source_id=source.summary_source_id or source.id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    tags = summary_utils.deserialize_list(source.tags_json)
+    for item_id in item_ids:
+        set_item_tags(session, item_id, tags)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize pending items, or redo every summary")
+    parser.add_argument("--all", action="store_true", help="Re-summarize every item, not just pending ones")
+    parser.add_argument("--offline", action="store_true", help="Only use articles already in the article cache")
+    parser.add_argument("--workers", type=int, default=DEFAULT_FETCH_WORKERS, help="Article fetch threads")
+    parser.add_argument(
+        "--parse-workers", type=int, default=None, help="Summary parsing processes (0 parses in the fetch threads)"
+    )
+    args = parser.parse_args()
+
+    cache = ArticleCache()
+    with SummaryPipeline(args.workers, args.parse_workers, cache=cache, offline=args.offline) as pipeline:
+        queued = pipeline.submit_pending(include_summarized=args.all)
+    print(f"Processed {queued} item(s)")
+
+
+if __name__ == "__main__":
+    main()
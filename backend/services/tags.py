@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy import Connection, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.database import dialect_insert
+from backend.models import Item, ItemTag, TagCount
+from backend.utils.summary import deserialize_list
+
+
+def set_item_tags(session: Session, item_id: int, tags: Iterable[str]) -> None:
+    """Replace an item's rows in ``item_tags`` and adjust ``tag_counts`` by the difference."""
+    wanted = {tag for tag in tags if tag}
+    existing = set(session.scalars(select(ItemTag.tag).where(ItemTag.item_id == item_id)))
+    removed = existing - wanted
+    added = wanted - existing
+    if removed:
+        session.execute(delete(ItemTag).where(ItemTag.item_id == item_id, ItemTag.tag.in_(removed)))
+        session.execute(update(TagCount).where(TagCount.tag.in_(removed)).values(count=TagCount.count - 1))
+    if added:
+        session.execute(insert(ItemTag), [{"item_id": item_id, "tag": tag} for tag in added])
+        upsert = dialect_insert(session, TagCount).values([{"tag": tag, "count": 1} for tag in added])
+        session.execute(upsert.on_conflict_do_update(index_elements=[TagCount.tag], set_={"count": TagCount.count + 1}))
+
+
+def backfill_item_tags(connection: Connection) -> int:
+    """Populate ``item_tags`` and ``tag_counts`` from the legacy ``tags_json`` column."""
+    rows = connection.execute(select(Item.id, Item.tags_json).where(Item.tags_json.is_not(None))).all()
+    pairs = {(row.id, tag) for row in rows for tag in deserialize_list(row.tags_json) if tag}
+    if pairs:
+        connection.execute(insert(ItemTag), [{"item_id": item_id, "tag": tag} for item_id, tag in pairs])
+    rebuild_tag_counts(connection)
+    return len(pairs)
+
+
+def rebuild_tag_counts(connection: Connection) -> None:
+    connection.execute(delete(TagCount))
+    connection.execute(
+        insert(TagCount).from_select(
+            ["tag", "count"], select(ItemTag.tag, func.count()).group_by(ItemTag.tag)
+        )
+    )
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from backend.utils.summary import EXTRACTION_VERSION, Summary
+from backend.utils.url import normalize_url
+
+ARTICLE_CACHE_PATH = os.environ.get("ARTICLE_CACHE_PATH", "./data/article_cache.db")
+ARTICLE_CACHE_TTL_SECONDS = 30 * 24 * 3600
+ARTICLE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Eviction runs every this many stores
+EVICT_EVERY_STORES = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pages_accessed_at ON pages (accessed_at);
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    html BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS derived (
+    content_hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    text BLOB NOT NULL,
+    summary_json TEXT,
+    PRIMARY KEY (content_hash, version)
+);
+"""
+
+
+@dataclass
+class CachedArticle:
+    html: str
+    fetched_at: float
+    text: str | None = None
+    summary: Summary | None = None
+
+
+def _compress(value: str) -> bytes:
+    return zlib.compress(value.encode("utf-8"), 6)
+
+
+def _decompress(value: bytes) -> str:
+    return zlib.decompress(value).decode("utf-8")
+
+
+class ArticleCache:
+    """Disk cache of fetched articles and what was derived from them.
+
+    Pages are keyed by normalized URL and point at zlib-compressed HTML stored by
+    content hash, so URLs serving the same page share one copy. Extracted text and
+    the ``Summary`` are stored per content hash and ``version``; bumping
+    ``EXTRACTION_VERSION`` makes them misses while the HTML stays usable, so
+    re-summarizing needs no network. Entries older than ``ttl`` are treated as
+    missing unless ``get`` is asked for expired ones, but they are kept for offline
+    re-summarizing: only once the stored bytes exceed ``max_bytes`` are other
+    versions' derived data and then the least recently used pages removed. Safe to
+    share between threads.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = ARTICLE_CACHE_PATH,
+        ttl: float = ARTICLE_CACHE_TTL_SECONDS,
+        max_bytes: int = ARTICLE_CACHE_MAX_BYTES,
+        version: str = EXTRACTION_VERSION,
+    ):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.version = version
+        self._local = threading.local()
+        # Every thread's connection, so ``close`` can reach them all
+        self._connections: list[sqlite3.Connection] = []
+        self._generation = 0
+        self._stores = 0
+        self._lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.generation != self._generation:
+            # Only this thread uses it; other threads merely close it
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            with self._lock:
+                self._connections.append(connection)
+                self._local.generation = self._generation
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def get(self, url: str, allow_expired: bool = False) -> CachedArticle | None:
+        """Return the cached page for ``url``; ``text``/``summary`` are set for the current version."""
+        connection = self._connection()
+        url_key = self.key(url)
+        row = connection.execute(
+            """
+            SELECT p.fetched_at, b.html, d.text, d.summary_json
+            FROM pages p
+            JOIN blobs b ON b.content_hash = p.content_hash
+            LEFT JOIN derived d ON d.content_hash = p.content_hash AND d.version = ?
+            WHERE p.url_key = ?
+            """,
+            (self.version, url_key),
+        ).fetchone()
+        if row is None:
+            return None
+        fetched_at, html, text, summary_json = row
+        now = time.time()
+        if not allow_expired and now - fetched_at > self.ttl:
+            return None
+        connection.execute("UPDATE pages SET accessed_at = ? WHERE url_key = ?", (now, url_key))
+        return CachedArticle(
+            html=_decompress(html),
+            fetched_at=fetched_at,
+            text=_decompress(text) if text is not None else None,
+            summary=Summary(**json.loads(summary_json)) if summary_json else None,
+        )
+
+    def put(self, url: str, html: str, text: str | None = None, summary: Summary | None = None) -> None:
+        """Store ``html`` for ``url`` and, when given, what the current version derived from it."""
+        content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR IGNORE INTO blobs (content_hash, html) VALUES (?, ?)", (content_hash, _compress(html))
+            )
+            connection.execute(
+                """
+                INSERT INTO pages (url_key, url, content_hash, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (url_key) DO UPDATE SET
+                    url = excluded.url,
+                    fetched_at = excluded.fetched_at,
+                    accessed_at = excluded.accessed_at,
+                    content_hash = excluded.content_hash
+                """,
+                (self.key(url), url, content_hash, now, now),
+            )
+            if text is not None:
+                connection.execute(
+                    "INSERT OR REPLACE INTO derived (content_hash, version, text, summary_json) VALUES (?, ?, ?, ?)",
+                    (
+                        content_hash,
+                        self.version,
+                        _compress(text),
+                        json.dumps(asdict(summary), ensure_ascii=False) if summary is not None else None,
+                    ),
+                )
+        with self._lock:
+            self._stores += 1
+            due = self._stores % EVICT_EVERY_STORES == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Shrink the cache to ``max_bytes``; returns pages removed.
+
+        Derived data of other extraction versions goes first, then the least recently
+        used pages along with their blobs and derived data.
+        """
+        connection = self._connection()
+        removed = 0
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            total = self._stored_bytes(connection)
+            if total > self.max_bytes:
+                connection.execute("DELETE FROM derived WHERE version != ?", (self.version,))
+                total = self._stored_bytes(connection)
+            if total > self.max_bytes:
+                # A blob and its derived data are only freed with the last page pointing at them
+                sizes = dict(
+                    connection.execute(
+                        """
+                        SELECT b.content_hash, length(b.html) + coalesce(
+                            (SELECT sum(length(d.text)) FROM derived d WHERE d.content_hash = b.content_hash), 0
+                        )
+                        FROM blobs b
+                        """
+                    )
+                )
+                references = dict(connection.execute("SELECT content_hash, count(*) FROM pages GROUP BY content_hash"))
+                victims = []
+                rows = connection.execute("SELECT url_key, content_hash FROM pages ORDER BY accessed_at")
+                for url_key, content_hash in rows:
+                    if total <= self.max_bytes:
+                        break
+                    victims.append((url_key,))
+                    references[content_hash] -= 1
+                    if not references[content_hash]:
+                        total -= sizes.get(content_hash, 0)
+                connection.executemany("DELETE FROM pages WHERE url_key = ?", victims)
+                removed += len(victims)
+            connection.execute("DELETE FROM blobs WHERE content_hash NOT IN (SELECT content_hash FROM pages)")
+            connection.execute("DELETE FROM derived WHERE content_hash NOT IN (SELECT content_hash FROM blobs)")
+        return removed
+
+    @staticmethod
+    def _stored_bytes(connection: sqlite3.Connection) -> int:
+        return (
+            connection.execute("SELECT coalesce(sum(length(html)), 0) FROM blobs").fetchone()[0]
+            + connection.execute("SELECT coalesce(sum(length(text)), 0) FROM derived").fetchone()[0]
+        )
+
+    def close(self) -> None:
+        """Close every thread's connection; threads that use the cache afterwards open new ones."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for connection in connections:
+            connection.close()
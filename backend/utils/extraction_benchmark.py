@@ -0,0 +1,128 @@
+"""Compare article extraction engines on a corpus of saved pages.
+
+    python -m backend.utils.extraction_benchmark --corpus saved_pages/
+    python -m backend.utils.extraction_benchmark --article-cache data/article_cache.db
+
+Each engine runs in a fresh process so its peak RSS (which includes libxml2's C
+allocations that ``tracemalloc`` can't see) is measured on its own.
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable
+
+from bs4 import BeautifulSoup
+from readability import Document
+
+from backend.utils.summary import extract_article_text
+
+
+def legacy_extract_article_text(html: str) -> str:
+    """The readability + BeautifulSoup ``html.parser`` path that ``extract_article_text`` replaced."""
+    document = Document(html)
+    summary_html = document.summary(html_partial=True)
+    soup = BeautifulSoup(summary_html, "html.parser")
+    text = " ".join(p.get_text(separator=" ", strip=True) for p in soup.find_all("p"))
+    if not text:
+        soup = BeautifulSoup(html, "html.parser")
+        text = soup.get_text(separator=" ", strip=True)
+    return text
+
+
+ENGINES: dict[str, Callable[[str], str]] = {
+    "legacy": legacy_extract_article_text,
+    "lxml": extract_article_text,
+}
+
+
+@dataclass
+class EngineResult:
+    engine: str
+    pages: int
+    seconds: float
+    peak_rss_kib: int
+    rss_growth_kib: int
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+
+def load_corpus(directory: Path | None, article_cache: Path | None, limit: int | None) -> list[str]:
+    pages: list[str] = []
+    if directory is not None:
+        for path in sorted(directory.rglob("*.htm*")):
+            pages.append(path.read_text(encoding="utf-8", errors="replace"))
+    if article_cache is not None:
+        with sqlite3.connect(article_cache) as connection:
+            pages.extend(zlib.decompress(html).decode("utf-8") for (html,) in connection.execute("SELECT html FROM blobs"))
+    return pages[:limit] if limit else pages
+
+
+def _max_rss_kib() -> int:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_engine(engine: str, pages: list[str], repeat: int) -> EngineResult:
+    extract = ENGINES[engine]
+    baseline = _max_rss_kib()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            extract(page)
+    elapsed = time.perf_counter() - started
+    peak = _max_rss_kib()
+    return EngineResult(engine, len(pages) * repeat, elapsed, peak, peak - baseline)
+
+
+def run_benchmark(pages: list[str], engines: list[str], repeat: int = 1) -> list[EngineResult]:
+    results = []
+    for engine in engines:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results.append(pool.submit(_run_engine, engine, pages, repeat).result())
+    return results
+
+
+def agreement(pages: list[str]) -> float:
+    """Share of pages on which both engines extract the same text."""
+    if not pages:
+        return 1.0
+    same = sum(legacy_extract_article_text(page) == extract_article_text(page) for page in pages)
+    return same / len(pages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark article extraction engines")
+    parser.add_argument("--corpus", type=Path, help="Directory of saved .html pages")
+    parser.add_argument("--article-cache", type=Path, help="Use the pages stored in an article cache database")
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many pages")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per engine")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES))
+    args = parser.parse_args()
+    if args.corpus is None and args.article_cache is None:
+        parser.error("pass --corpus and/or --article-cache")
+
+    pages = load_corpus(args.corpus, args.article_cache, args.limit)
+    total_kib = sum(len(page.encode("utf-8")) for page in pages) // 1024
+    print(f"{len(pages)} page(s), {total_kib} KiB")
+    print(f"{'engine':<8} {'pages/s':>9} {'seconds':>9} {'peak RSS KiB':>13} {'RSS growth KiB':>15}")
+    for result in run_benchmark(pages, args.engines, args.repeat):
+        print(
+            f"{result.engine:<8} {result.pages_per_second:>9.1f} {result.seconds:>9.2f} "
+            f"{result.peak_rss_kib:>13} {result.rss_growth_kib:>15}"
+        )
+    print(f"identical text on {agreement(pages):.0%} of pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - depends on the environment
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+USER_AGENT = "AI-MatomeBot/0.1"
+DEFAULT_TIMEOUT_SECONDS = 30.0
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "1") != "0"
+HOST_RATE_PER_SECOND = float(os.environ.get("HTTP_HOST_RATE", 2.0))
+HOST_BURST = int(os.environ.get("HTTP_HOST_BURST", 5))
+MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", 3))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=40, keepalive_expiry=30.0)
+
+
+class ResponseTooLarge(httpx.HTTPError):
+    """The body exceeded the caller's ``max_bytes``; raised before it is fully downloaded."""
+
+
+class UnsupportedContentType(httpx.HTTPError):
+    """The response isn't one of the caller's ``content_types``; raised before the body is read."""
+
+
+@dataclass(frozen=True)
+class _BodyPolicy:
+    max_bytes: int
+    truncate: bool = False
+    content_types: Collection[str] | None = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``reserve`` hands out tokens in advance and says how long to wait."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+@dataclass
+class HttpMetrics:
+    requests: int = 0
+    connections_opened: int = 0
+    retries: int = 0
+    throttled: int = 0
+    throttle_wait_seconds: float = 0.0
+    too_large: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **deltas: float) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connection_reuse_ratio": reused / self.requests if self.requests else 0.0,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+                "too_large": self.too_large,
+            }
+
+
+class HttpClient:
+    """Process-wide HTTP client shared by the feed and article fetchers.
+
+    Sync and async requests each go through one keep-alive pool (HTTP/2 when ``h2``
+    is installed), are throttled by a token bucket per host (every redirect hop
+    reserves from its own host's bucket), retried with jittered exponential backoff
+    on transport errors and 429/5xx, and streamed so bodies over ``max_bytes`` are
+    abandoned early (or cut there with ``truncate``). ``max_bytes`` counts decoded
+    bytes; ``Content-Length`` only rejects a body up front when it isn't compressed.
+    Successful responses outside ``content_types`` are rejected from their headers alone.
+    Counters are available from ``metrics``.
+    """
+
+    def __init__(
+        self,
+        rate_per_host: float = HOST_RATE_PER_SECOND,
+        burst: int = HOST_BURST,
+        max_retries: int = MAX_RETRIES,
+        http2: bool = HTTP2_ENABLED,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_retries = max_retries
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.metrics = HttpMetrics()
+        self._transport = transport
+        self._async_transport = async_transport
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+
+    def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    async def aget(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.arequest("GET", url, **kwargs)
+
+    async def ahead(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.arequest("HEAD", url, **kwargs)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        truncate: bool = False,
+        content_types: Collection[str] | None = None,
+    ) -> httpx.Response:
+        policy = _BodyPolicy(max_bytes, truncate, content_types)
+        attempt = 0
+        while True:
+            try:
+                with self._sync_client().stream(
+                    method, url, headers=headers, timeout=timeout, extensions={"trace": self._trace}
+                ) as response:
+                    self.metrics.add(requests=1)
+                    if not self._should_retry(response, attempt):
+                        return self._buffer(response, _read_sync(response, policy, self.metrics))
+                    delay = self._backoff(attempt, response)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, None)
+            attempt += 1
+            self.metrics.add(retries=1)
+            time.sleep(delay)
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        truncate: bool = False,
+        content_types: Collection[str] | None = None,
+    ) -> httpx.Response:
+        policy = _BodyPolicy(max_bytes, truncate, content_types)
+        attempt = 0
+        while True:
+            try:
+                async with self._get_async_client().stream(
+                    method, url, headers=headers, timeout=timeout, extensions={"trace": self._atrace}
+                ) as response:
+                    self.metrics.add(requests=1)
+                    if not self._should_retry(response, attempt):
+                        return self._buffer(response, await _read_async(response, policy, self.metrics))
+                    delay = self._backoff(attempt, response)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, None)
+            attempt += 1
+            self.metrics.add(retries=1)
+            await asyncio.sleep(delay)
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close the async pool; call before the event loop that used it goes away."""
+        client, self._async_client = self._async_client, None
+        if client is not None:
+            await client.aclose()
+
+    def _client_options(self) -> dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "limits": POOL_LIMITS,
+            "follow_redirects": True,
+            "headers": {"User-Agent": USER_AGENT},
+        }
+
+    def _sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    transport=self._transport, event_hooks={"request": [self._throttle]}, **self._client_options()
+                )
+            return self._client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                transport=self._async_transport, event_hooks={"request": [self._athrottle]}, **self._client_options()
+            )
+        return self._async_client
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+            return bucket
+
+    def _throttle(self, request: httpx.Request) -> None:
+        # A request hook, so redirect hops and retries each wait on their own host
+        delay = self._bucket(request.url.host).reserve()
+        if delay > 0:
+            self.metrics.add(throttled=1, throttle_wait_seconds=delay)
+            time.sleep(delay)
+
+    async def _athrottle(self, request: httpx.Request) -> None:
+        delay = self._bucket(request.url.host).reserve()
+        if delay > 0:
+            self.metrics.add(throttled=1, throttle_wait_seconds=delay)
+            await asyncio.sleep(delay)
+
+    def _should_retry(self, response: httpx.Response, attempt: int) -> bool:
+        return response.status_code in RETRY_STATUSES and attempt < self.max_retries
+
+    def _backoff(self, attempt: int, response: httpx.Response | None) -> float:
+        """Full-jitter exponential backoff, or the server's ``Retry-After`` when it sent seconds."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+
+    @staticmethod
+    def _buffer(response: httpx.Response, content: bytes) -> httpx.Response:
+        # The body is already decoded, so the rebuilt response must not claim an encoding
+        headers = [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            request=response.request,
+            extensions=response.extensions,
+        )
+
+    def _trace(self, event_name: str, info: dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.metrics.add(connections_opened=1)
+
+    async def _atrace(self, event_name: str, info: dict[str, Any]) -> None:
+        self._trace(event_name, info)
+
+
+def _check_headers(response: httpx.Response, policy: _BodyPolicy, metrics: HttpMetrics) -> None:
+    if policy.content_types is not None and response.is_success:
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        # A missing type is left to the caller's parser
+        if content_type and content_type not in policy.content_types:
+            raise UnsupportedContentType(f"{response.url} is {content_type}")
+    # Content-Length is the size on the wire; compressed bodies are measured after decoding
+    declared = response.headers.get("Content-Length", "")
+    encoded = response.headers.get("Content-Encoding", "identity").strip().lower() != "identity"
+    if not policy.truncate and not encoded and declared.isdigit() and int(declared) > policy.max_bytes:
+        metrics.add(too_large=1)
+        raise ResponseTooLarge(f"{response.url} declares {declared} bytes (limit {policy.max_bytes})")
+
+
+def _append_chunk(
+    chunks: list[bytes], size: int, chunk: bytes, response: httpx.Response, policy: _BodyPolicy, metrics: HttpMetrics
+) -> tuple[int, bool]:
+    """Add ``chunk`` within the size limit; returns the new size and whether reading should stop."""
+    size += len(chunk)
+    if size <= policy.max_bytes:
+        chunks.append(chunk)
+        return size, False
+    metrics.add(too_large=1)
+    if not policy.truncate:
+        raise ResponseTooLarge(f"{response.url} exceeded {policy.max_bytes} bytes")
+    chunks.append(chunk[: len(chunk) - (size - policy.max_bytes)])
+    return policy.max_bytes, True
+
+
+def _read_sync(response: httpx.Response, policy: _BodyPolicy, metrics: HttpMetrics) -> bytes:
+    _check_headers(response, policy, metrics)
+    chunks: list[bytes] = []
+    size = 0
+    for chunk in response.iter_bytes():
+        size, stop = _append_chunk(chunks, size, chunk, response, policy, metrics)
+        if stop:
+            break
+    return b"".join(chunks)
+
+
+async def _read_async(response: httpx.Response, policy: _BodyPolicy, metrics: HttpMetrics) -> bytes:
+    _check_headers(response, policy, metrics)
+    chunks: list[bytes] = []
+    size = 0
+    async for chunk in response.aiter_bytes():
+        size, stop = _append_chunk(chunks, size, chunk, response, policy, metrics)
+        if stop:
+            break
+    return b"".join(chunks)
+
+
+http_client = HttpClient()
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 from collections import Counter
 from dataclasses import dataclass
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable
 
-import httpx
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 from readability import Document
+from readability.readability import html_cleaner
 from slugify import slugify
 
+from backend.utils.http import http_client
+
+if TYPE_CHECKING:
+    from backend.utils.article_cache import ArticleCache
+
+# Bump when extraction or summarization changes so cached results are recomputed
+EXTRACTION_VERSION = "2"
+
 STOPWORDS = {
     "the",
     "and",
@@ -41,22 +51,73 @@ class SummaryError(Exception):
     pass
 
 
-def fetch_article_text(url: str) -> str:
-    headers = {"User-Agent": "AI-MatomeBot/0.1"}
-    with httpx.Client(timeout=10) as client:
-        response = client.get(url, headers=headers)
-        response.raise_for_status()
-        html = response.text
-    document = Document(html)
-    summary_html = document.summary(html_partial=True)
-    soup = BeautifulSoup(summary_html, "html.parser")
-    text = " ".join(p.get_text(separator=" ", strip=True) for p in soup.find_all("p"))
+ARTICLE_TIMEOUT_SECONDS = 10
+# Articles are cut here rather than rejected; the lead is what gets summarized
+MAX_ARTICLE_BYTES = int(os.environ.get("ARTICLE_MAX_BYTES", 2 * 1024 * 1024))
+HTML_CONTENT_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+NON_TEXT_TAGS = ("script", "style", "template")
+
+
+def fetch_article_html(url: str) -> str:
+    response = http_client.get(
+        url,
+        timeout=ARTICLE_TIMEOUT_SECONDS,
+        max_bytes=MAX_ARTICLE_BYTES,
+        truncate=True,
+        content_types=HTML_CONTENT_TYPES,
+    )
+    response.raise_for_status()
+    return response.text
+
+
+class _TreeDocument(Document):
+    """readability ``Document`` over an already parsed tree.
+
+    The public API only takes markup and re-parses it on every extraction pass, so
+    this overrides the private ``Document._parse`` hook (and reuses the module's
+    ``html_cleaner``) to start from our tree instead. Both are internals of
+    readability-lxml 0.8.1, which is pinned exactly for that reason; check this
+    class against the new ``_parse`` before bumping it. The cleaner copies the tree
+    on every pass, so the caller's tree is left intact.
+    """
+
+    def _parse(self, input: lxml.html.HtmlElement) -> lxml.html.HtmlElement:
+        doc = html_cleaner.clean_html(input)
+        doc.resolve_base_href(handle_failures=self.handle_failures)
+        return doc
+
+
+def _element_text(element: lxml.html.HtmlElement) -> str:
+    return " ".join(chunk.strip() for chunk in element.itertext() if chunk.strip())
+
+
+def extract_article_text(html: str) -> str:
+    """Article body text, parsing the page once with lxml.
+
+    readability runs on the parsed tree and the paragraphs are read from its output
+    with lxml as well; the whole page's text is the fallback when it finds none.
+    """
+    if not html.strip():
+        return ""
+    try:
+        tree = lxml.html.document_fromstring(html)
+    except ValueError:
+        # lxml rejects str input carrying an XML encoding declaration
+        tree = lxml.html.document_fromstring(html.encode("utf-8"))
+    summary_html = _TreeDocument(tree).summary(html_partial=True)
+    # summary() only returns markup; parsing the extracted article is cheap next to the page
+    article = lxml.html.fragment_fromstring(summary_html, create_parent="div")
+    text = " ".join(filter(None, (_element_text(p) for p in article.iter("p"))))
     if not text:
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(separator=" ", strip=True)
+        etree.strip_elements(tree, *NON_TEXT_TAGS, with_tail=False)
+        text = _element_text(tree)
     return text
 
 
+def fetch_article_text(url: str) -> str:
+    return extract_article_text(fetch_article_html(url))
+
+
 def truncate_text(text: str, limit: int) -> str:
     if len(text) <= limit:
         return text
@@ -107,8 +168,7 @@ def detect_language(text: str) -> str:
     return "ja"
 
 
-def summarize_url(url: str) -> Summary:
-    text = fetch_article_text(url)
+def summarize_text(text: str) -> Summary:
     sentences = extract_sentences(text)
     if not sentences:
         raise SummaryError("No sentences extracted")
@@ -119,6 +179,29 @@ def summarize_url(url: str) -> Summary:
     return Summary(text=summary_text, bullet_points=bullet_points, tags=tags, language=language)
 
 
+def summarize_html(html: str) -> Summary:
+    """CPU-only half of ``summarize_url``; safe to run in a worker process."""
+    return summarize_text(extract_article_text(html))
+
+
+def extract_and_summarize(html: str) -> tuple[str, Summary]:
+    """Like ``summarize_html`` but also returns the extracted text, for caching."""
+    text = extract_article_text(html)
+    return text, summarize_text(text)
+
+
+def summarize_url(url: str, cache: ArticleCache | None = None) -> Summary:
+    if cache is None:
+        return summarize_text(fetch_article_text(url))
+    cached = cache.get(url)
+    if cached is not None and cached.summary is not None:
+        return cached.summary
+    html = cached.html if cached is not None else fetch_article_html(url)
+    text, summary = extract_and_summarize(html)
+    cache.put(url, html, text, summary)
+    return summary
+
+
 def serialize_points(points: Iterable[str]) -> str:
     return json.dumps(list(points), ensure_ascii=False)
 
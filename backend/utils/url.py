@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+import re
+from html import unescape
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
 
 
 TRACKING_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "ref", "fbclid", "gclid"}
@@ -14,3 +16,29 @@ def normalize_url(url: str) -> str:
     if normalized.scheme == "":
         normalized = normalized._replace(scheme="https")
     return urlunparse(normalized)
+
+
+# rel=canonical lives in <head>; scanning a bounded prefix avoids parsing the page
+CANONICAL_SCAN_CHARS = 64 * 1024
+_LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r"""([a-zA-Z-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+
+def find_canonical_url(html: str, base_url: str) -> str | None:
+    """The normalized ``<link rel="canonical">`` target of a page, if it declares a usable one."""
+    head = html[:CANONICAL_SCAN_CHARS]
+    end = head.lower().find("</head>")
+    if end != -1:
+        head = head[:end]
+    for tag in _LINK_TAG.findall(head):
+        attributes = {name.lower(): "".join(values) for name, *values in _ATTRIBUTE.findall(tag)}
+        if "canonical" not in attributes.get("rel", "").lower().split() or not attributes.get("href"):
+            continue
+        canonical = urlparse(urljoin(base_url, unescape(attributes["href"].strip())))
+        if canonical.scheme not in ("http", "https") or not canonical.netloc:
+            return None
+        # Misconfigured sites point every page at their home page
+        if canonical.path in ("", "/") and urlparse(base_url).path not in ("", "/"):
+            return None
+        return normalize_url(urlunparse(canonical))
+    return None
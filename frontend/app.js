@@ -1,10 +1,16 @@
 const API_BASE = import.meta?.env?.VITE_API_BASE ?? "http://localhost:8000";
+const PAGE_SIZE = 20;
 
 const state = {
   sort: "new",
   tag: "",
   keyword: "",
   sourceType: "",
+  nextCursor: null,
+  offset: 0,
+  hasMore: true,
+  loading: false,
+  generation: 0,
 };
 
 const tabs = document.querySelectorAll(".tab");
@@ -14,13 +20,18 @@ const sourceTypeSelect = document.getElementById("sourceType");
 const refreshButton = document.getElementById("refresh");
 const cardsContainer = document.getElementById("items");
 const cardTemplate = document.getElementById("card-template");
+const sentinel = document.getElementById("sentinel");
 
 function buildQuery() {
   const params = new URLSearchParams();
   params.set("sort", state.sort);
+  params.set("limit", PAGE_SIZE);
   if (state.keyword) params.set("q", state.keyword);
   if (state.tag) params.set("tag", state.tag);
   if (state.sourceType) params.set("source_type", state.sourceType);
+  // Keyset cursors keep deep pages cheap; relevance-ranked search has none and pages by offset
+  if (state.nextCursor) params.set("cursor", state.nextCursor);
+  else if (state.offset) params.set("offset", state.offset);
   return params.toString();
 }
 
@@ -29,9 +40,9 @@ async function fetchItems() {
   const response = await fetch(`${API_BASE}/items?${query}`);
   if (!response.ok) {
     console.error("API error", response.status);
-    return [];
+    return { items: [], nextCursor: null };
   }
-  return response.json();
+  return { items: await response.json(), nextCursor: response.headers.get("X-Next-Cursor") };
 }
 
 function createMentionNode(mention) {
@@ -71,46 +82,111 @@ function createMentionNode(mention) {
   return wrapper;
 }
 
-function renderItems(items) {
-  cardsContainer.innerHTML = "";
-  items.forEach((item) => {
-    const node = cardTemplate.content.firstElementChild.cloneNode(true);
-    node.querySelector(".title").textContent = item.title ?? item.url;
-    node.querySelector(".summary").textContent = item.summary ?? "要約準備中";
-    node.querySelector(".score-value").textContent = `${item.score_buzz.toFixed(2)} / ${item.score_new.toFixed(2)}`;
-    const pointsList = node.querySelector(".points");
-    pointsList.innerHTML = "";
-    item.summary_points.forEach((point) => {
-      const li = document.createElement("li");
-      li.textContent = point;
-      pointsList.appendChild(li);
-    });
-    const tagsContainer = node.querySelector(".tags");
-    tagsContainer.innerHTML = "";
-    item.tags.forEach((tag) => {
-      const span = document.createElement("span");
-      span.textContent = tag;
-      tagsContainer.appendChild(span);
-    });
-    const mentionsContainer = node.querySelector(".mentions");
-    mentionsContainer.innerHTML = "";
-    item.mentions.forEach((mention) => {
-      mentionsContainer.appendChild(createMentionNode(mention));
-    });
-    const link = node.querySelector(".source-link");
-    link.href = item.url;
-    cardsContainer.appendChild(node);
+function fillSummary(node, item) {
+  node.querySelector(".summary").textContent = item.summary ?? "要約準備中";
+  const pointsList = node.querySelector(".points");
+  pointsList.innerHTML = "";
+  item.summary_points.forEach((point) => {
+    const li = document.createElement("li");
+    li.textContent = point;
+    pointsList.appendChild(li);
+  });
+  const tagsContainer = node.querySelector(".tags");
+  tagsContainer.innerHTML = "";
+  item.tags.forEach((tag) => {
+    const span = document.createElement("span");
+    span.textContent = tag;
+    tagsContainer.appendChild(span);
+  });
+}
+
+function fillScore(node, item) {
+  node.querySelector(".score-value").textContent = `${item.score_buzz.toFixed(2)} / ${item.score_new.toFixed(2)}`;
+}
+
+function createCard(item) {
+  const node = cardTemplate.content.firstElementChild.cloneNode(true);
+  node.dataset.itemId = item.id;
+  node.querySelector(".title").textContent = item.title ?? item.url;
+  fillSummary(node, item);
+  fillScore(node, item);
+  const mentionsContainer = node.querySelector(".mentions");
+  mentionsContainer.innerHTML = "";
+  item.mentions.forEach((mention) => {
+    mentionsContainer.appendChild(createMentionNode(mention));
   });
+  const link = node.querySelector(".source-link");
+  link.href = item.url;
+  return node;
+}
+
+function renderItems(items) {
+  items.forEach((item) => cardsContainer.appendChild(createCard(item)));
   if (window.twttr && window.twttr.widgets) {
     window.twttr.widgets.load();
   }
 }
 
+function findCard(id) {
+  return cardsContainer.querySelector(`[data-item-id="${id}"]`);
+}
+
+function listenForChanges() {
+  // Patches visible cards as items are added, re-scored and summarized
+  const events = new EventSource(`${API_BASE}/items/stream`);
+  events.addEventListener("score", (event) => {
+    const change = JSON.parse(event.data);
+    const card = findCard(change.id);
+    if (card) fillScore(card, change);
+  });
+  events.addEventListener("summary", (event) => {
+    const change = JSON.parse(event.data);
+    const card = findCard(change.id);
+    if (card) fillSummary(card, change);
+  });
+  events.addEventListener("item", (event) => {
+    const item = JSON.parse(event.data);
+    // Only the unfiltered "new" list is known to start with the newest item
+    if (state.sort !== "new" || state.keyword || state.tag || findCard(item.id)) return;
+    if (state.sourceType && item.source_type !== state.sourceType) return;
+    const card = createCard({ ...item, summary: null, summary_points: [], tags: [], mentions: [] });
+    cardsContainer.prepend(card);
+    state.offset += 1;
+  });
+  events.addEventListener("reset", () => refresh());
+}
+
+async function loadMore() {
+  if (state.loading || !state.hasMore) return;
+  const generation = state.generation;
+  state.loading = true;
+  try {
+    const { items, nextCursor } = await fetchItems();
+    // Drop pages that belong to a list the user has since refreshed
+    if (generation !== state.generation) return;
+    renderItems(items);
+    state.offset += items.length;
+    state.nextCursor = nextCursor;
+    state.hasMore = items.length === PAGE_SIZE;
+  } finally {
+    if (generation === state.generation) state.loading = false;
+  }
+}
+
 async function refresh() {
-  const items = await fetchItems();
-  renderItems(items);
+  state.generation += 1;
+  state.loading = false;
+  cardsContainer.innerHTML = "";
+  state.nextCursor = null;
+  state.offset = 0;
+  state.hasMore = true;
+  await loadMore();
 }
 
+new IntersectionObserver((entries) => {
+  if (entries.some((entry) => entry.isIntersecting)) loadMore();
+}).observe(sentinel);
+
 tabs.forEach((tab) => {
   tab.addEventListener("click", () => {
     tabs.forEach((t) => t.classList.remove("active"));
@@ -140,3 +216,4 @@ refreshButton.addEventListener("click", () => {
 });
 
 refresh();
+listenForChanges();
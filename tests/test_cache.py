@@ -0,0 +1,25 @@
+from backend.services.cache import DataVersion, RankingCache
+
+
+def test_ranking_cache_serves_slices_until_data_changes():
+    version = DataVersion(None)
+    cache = RankingCache(version, depth=5, max_keys=2)
+    cache.put(("new", None, None), list(range(5)), version.current())
+
+    assert cache.get(("new", None, None), 1, 2) == [1, 2]
+    assert not cache.covers(4, 2)
+
+    version.bump()
+    assert cache.get(("new", None, None), 0, 2) is None
+
+
+def test_ranking_cache_evicts_least_recently_used_key():
+    version = DataVersion(None)
+    cache = RankingCache(version, depth=5, max_keys=2)
+    for key in ("a", "b"):
+        cache.put(key, [key], version.current())
+    cache.get("a", 0, 1)
+    cache.put("c", ["c"], version.current())
+
+    assert cache.get("b", 0, 1) is None
+    assert cache.get("a", 0, 1) == ["a"]
@@ -0,0 +1,58 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.api.caching import CACHE_CONTROL, current_etag
+from backend.main import app
+from backend.services.cache import data_version
+from backend.utils.compression import CompressionMiddleware, choose_encoding
+
+
+def test_matching_etag_is_answered_without_the_database(monkeypatch):
+    def no_database():
+        raise AssertionError("The database was opened")
+
+    monkeypatch.setattr("backend.database.AsyncReadSessionLocal", no_database)
+    etag = current_etag()
+    response = TestClient(app).get("/items/?sort=buzz", headers={"If-None-Match": f'"other", {etag}'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == CACHE_CONTROL
+
+    data_version.bump()
+    assert current_etag() != etag
+
+
+def test_compression_skips_small_bodies_and_event_streams():
+    demo = FastAPI()
+    demo.add_middleware(CompressionMiddleware)
+
+    @demo.get("/large")
+    def large():
+        return PlainTextResponse("embed " * 1000)
+
+    @demo.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @demo.get("/events")
+    def events():
+        return StreamingResponse(iter([b"data: 1\n\n"] * 300), media_type="text/event-stream")
+
+    client = TestClient(demo)
+    headers = {"Accept-Encoding": "gzip"}
+    large_response = client.get("/large", headers=headers)
+    small_response = client.get("/small", headers=headers)
+    events_response = client.get("/events", headers=headers)
+
+    assert large_response.headers["content-encoding"] == "gzip"
+    assert large_response.headers["vary"] == "Accept-Encoding"
+    assert int(large_response.headers["content-length"]) < 1000
+    assert large_response.text == "embed " * 1000
+    assert "content-encoding" not in small_response.headers
+    assert "content-encoding" not in events_response.headers
+    assert events_response.content == b"data: 1\n\n" * 300
+    assert choose_encoding("br;q=0, gzip;q=0.5") == "gzip"
+    assert choose_encoding("identity") is None
@@ -0,0 +1,136 @@
+import asyncio
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.database import create_engines
+from backend.models import Base, UrlResolution
+from backend.services.canonical import METHOD_FAILED, UrlResolver
+from backend.utils.http import HttpClient
+
+ARTICLE = "https://example.com/launch"
+AMP = "https://example.com/amp/launch"
+
+
+def make_resolver(database, requests):
+    def handler(request):
+        requests.append((request.method, str(request.url)))
+        if request.url.host == "t.co" and request.url.path == "/dead":
+            return httpx.Response(404)
+        if request.url.host == "t.co" and request.url.path == "/amp":
+            return httpx.Response(301, headers={"Location": AMP})
+        if request.url.host in ("t.co", "bit.ly"):
+            return httpx.Response(301, headers={"Location": f"{ARTICLE}?utm_source=twitter"})
+        if str(request.url) == AMP:
+            head = f'<html><head><link rel="canonical" href="{ARTICLE}?utm_source=amp"></head></html>'
+            return httpx.Response(200, html=head)
+        return httpx.Response(200)
+
+    transport = httpx.MockTransport(handler)
+    client = HttpClient(rate_per_host=0, transport=transport, async_transport=transport)
+    writer, reader = create_engines(database)
+    async_writer, async_reader = create_engines(database, asynchronous=True)
+    resolver = UrlResolver(
+        client,
+        sessionmaker(writer).begin,
+        sessionmaker(reader),
+        async_sessionmaker(async_writer),
+        async_sessionmaker(async_reader),
+    )
+    return resolver, client
+
+
+def make_database(tmp_path):
+    database = f"sqlite:///{tmp_path / 'app.db'}"
+    Base.metadata.create_all(create_engines(database)[0])
+    return database
+
+
+def test_short_links_are_resolved_once_and_remembered(tmp_path):
+    database = make_database(tmp_path)
+    requests = []
+    resolver, _ = make_resolver(database, requests)
+
+    resolved = resolver.resolve_many(["https://t.co/abc", "https://t.co/abc", "https://blog.example/post?ref=x"])
+    assert resolved == {"https://t.co/abc": ARTICLE, "https://blog.example/post?ref=x": "https://blog.example/post"}
+    # The landing page is read once for its rel=canonical
+    assert requests == [("HEAD", "https://t.co/abc"), ("HEAD", f"{ARTICLE}?utm_source=twitter"), ("GET", ARTICLE)]
+
+    # Served from the LRU, then from the table by a fresh process
+    assert resolver.resolve("https://t.co/abc") == ARTICLE
+    fresh, _ = make_resolver(database, requests)
+    assert fresh.resolve("https://t.co/abc") == ARTICLE
+    assert len(requests) == 3
+
+    # Dead links resolve to themselves and are only retried after the failure TTL
+    assert resolver.resolve("https://t.co/dead") == "https://t.co/dead"
+    with Session(create_engines(database)[1]) as session:
+        assert session.scalar(select(UrlResolution.method).where(UrlResolution.url == "https://t.co/dead")) == (
+            METHOD_FAILED
+        )
+
+
+def test_canonical_links_and_async_batches(tmp_path):
+    database = make_database(tmp_path)
+    requests = []
+    resolver, client = make_resolver(database, requests)
+
+    resolver.record_canonical("https://mirror.example/launch?utm_medium=rss", ARTICLE)
+    fresh, _ = make_resolver(database, requests)
+    assert fresh.resolve("https://mirror.example/launch") == ARTICLE
+
+    async def scenario():
+        try:
+            resolved = await resolver.aresolve_many(f"https://bit.ly/{n}" for n in range(5))
+            # Written through the async writer, so another process finds them in the table
+            stored, _ = make_resolver(database, requests)
+            return resolved, await stored.aresolve_many(["https://bit.ly/0"])
+        finally:
+            await client.aclose()
+
+    resolved, again = asyncio.run(scenario())
+    assert set(resolved.values()) == {ARTICLE}
+    assert again == {"https://bit.ly/0": ARTICLE}
+    assert sum(method == "HEAD" and "bit.ly" in url for method, url in requests) == 5
+
+
+def test_short_links_follow_the_landing_pages_canonical(tmp_path):
+    database = make_database(tmp_path)
+    requests = []
+    resolver, _ = make_resolver(database, requests)
+
+    assert resolver.resolve("https://t.co/amp") == ARTICLE
+    # The AMP page now maps to the article too, so its own mentions join the same item
+    fresh, _ = make_resolver(database, requests)
+    assert fresh.resolve(AMP) == ARTICLE
+    assert fresh.resolve("https://t.co/amp") == ARTICLE
+    assert [url for method, url in requests if method == "GET"] == [AMP]
+
+
+def test_resolutions_reach_the_lru_only_when_the_callers_transaction_commits(tmp_path):
+    database = make_database(tmp_path)
+    requests = []
+    resolver, client = make_resolver(database, requests)
+
+    async def scenario():
+        try:
+            async with resolver.async_session_factory() as session:
+                await session.begin()
+                assert await resolver.aresolve_many(["https://t.co/abc"], session=session) == {
+                    "https://t.co/abc": ARTICLE
+                }
+                await session.rollback()
+            rolled_back = resolver._cached(["https://t.co/abc"])
+            async with resolver.async_session_factory() as session, session.begin():
+                await resolver.aresolve_many(["https://t.co/abc"], session=session)
+                pending = resolver._cached(["https://t.co/abc"])
+            return rolled_back, pending, resolver._cached(["https://t.co/abc"])
+        finally:
+            await client.aclose()
+
+    rolled_back, pending, committed = asyncio.run(scenario())
+    assert rolled_back == {}
+    assert pending == {}
+    assert committed == {"https://t.co/abc": ARTICLE}
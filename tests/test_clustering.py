@@ -0,0 +1,80 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.models import Base, Item, ItemTag
+from backend.services.clustering import KIND_TEXT, assign_cluster, similarity, text_signature, title_signature
+from backend.services.summarizer import SUMMARY_DONE, SUMMARY_PENDING, _store_summary, share_cluster_summaries
+from backend.utils.summary import Summary
+
+
+def test_signatures_estimate_similarity():
+    launch = title_signature("OpenAI releases GPT-5 with a one million token context window")
+    repost = title_signature("OpenAI releases GPT-5 with a one million token context window | TechCrunch")
+    other = title_signature("Hugging Face opens a new inference endpoint region in Tokyo")
+    sentence = "新しい言語モデルが公開されました。長い文脈を扱えるようになり、推論の速度も向上しています。"
+    japanese = text_signature(sentence * 3)
+    japanese_copy = text_signature(sentence * 2)
+
+    assert similarity(launch, repost) > 0.6
+    assert similarity(launch, other) < 0.3
+    assert similarity(japanese, japanese_copy) > 0.9
+    assert title_signature("Weekly update") is None
+
+
+def make_item(session, number, title, **values):
+    url = f"https://site{number}.example/post"
+    item = Item(url=url, normalized_url=url, title=title, **values)
+    session.add(item)
+    session.flush()
+    return item
+
+
+def test_syndicated_items_share_one_summary(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    title = "Anthropic announces a new model family for coding agents"
+    with Session(engine) as session:
+        first = make_item(session, 1, title, summary_status=SUMMARY_PENDING)
+        assert share_cluster_summaries(session, [first.id]) == set()
+        second = make_item(session, 2, f"{title} - Product Hunt", summary_status=SUMMARY_PENDING)
+        unrelated = make_item(session, 3, "A field guide to vector databases", summary_status=SUMMARY_PENDING)
+        # The second copy waits for the first one's summary instead of being fetched
+        assert share_cluster_summaries(session, [second.id, unrelated.id]) == {second.id}
+        session.commit()
+        first_id, second_id = first.id, second.id
+
+    monkeypatch.setattr("backend.services.summarizer.session_scope", sessionmaker(engine).begin)
+    _store_summary(first_id, Summary(text="summary", bullet_points=["point"], tags=["llm"], language="en"))
+
+    with Session(engine) as session:
+        second = session.get(Item, second_id)
+        assert second.cluster_id == first_id
+        assert second.summary_status == SUMMARY_DONE
+        assert second.summary == "summary"
+        assert session.scalars(select(ItemTag.tag).where(ItemTag.item_id == second_id)).all() == ["llm"]
+        third = make_item(session, 4, f"{title} (reposted)", summary_status=SUMMARY_PENDING)
+        # Later copies get the finished summary straight away
+        assert share_cluster_summaries(session, [third.id]) == {third.id}
+        copied = session.execute(select(Item.summary, Item.summary_source_id).where(Item.id == third.id)).one()
+        assert tuple(copied) == ("summary", first_id)
+        # Similar titles about a different story cluster but are summarized on their own
+        coding = make_item(session, 5, "OpenAI announces new model for coding tasks today", summary_status=SUMMARY_DONE)
+        assert share_cluster_summaries(session, [coding.id]) == set()
+        math = make_item(session, 6, "OpenAI announces new model for math tasks today", summary_status=SUMMARY_PENDING)
+        assert share_cluster_summaries(session, [math.id]) == set()
+        clustered = session.execute(select(Item.cluster_id, Item.summary_status).where(Item.id == math.id)).one()
+        assert tuple(clustered) == (coding.id, SUMMARY_PENDING)
+
+
+def test_text_match_merges_clusters():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    text = " ".join(f"sentence {n} about the release of an open weights model" for n in range(40))
+    with Session(engine) as session:
+        items = [make_item(session, n, f"Title {n}") for n in range(4)]
+        for first, second in ((items[0], items[1]), (items[2], items[3])):
+            first.cluster_id = second.cluster_id = first.id
+        assert assign_cluster(session, items[1].id, KIND_TEXT, text_signature(text)) == items[0].id
+        assert assign_cluster(session, items[3].id, KIND_TEXT, text_signature(text + " extra words")) == items[0].id
+        assert set(session.scalars(select(Item.cluster_id))) == {items[0].id}
+
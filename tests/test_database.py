@@ -0,0 +1,99 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import create_engines
+from backend.models import Base, Item, TagCount
+from backend.schemas.mention import MentionCreate
+from backend.services.mentions import MENTION_CREATED, MENTION_UPDATED, upsert_mentions
+from backend.services.tags import set_item_tags
+
+
+def test_sqlite_file_gets_wal_writer_and_read_only_reader(tmp_path):
+    writer, reader = create_engines(f"sqlite:///{tmp_path / 'app.db'}")
+    with writer.begin() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+        connection.execute(text("INSERT INTO t VALUES (1)"))
+
+    with reader.connect() as connection:
+        assert connection.execute(text("SELECT x FROM t")).scalar() == 1
+        with pytest.raises(OperationalError):
+            connection.execute(text("INSERT INTO t VALUES (2)"))
+
+    assert writer.pool.size() == 1
+    writer.dispose()
+    reader.dispose()
+
+
+def test_sqlite_writers_wait_for_each_other(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    # Two writer engines contend like the sync and async writers (or two processes) do
+    first, _ = create_engines(url)
+    second, _ = create_engines(url)
+    with first.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    def write_from_second():
+        with second.begin() as connection:
+            connection.execute(text("INSERT INTO t VALUES (2)"))
+
+    with first.begin() as connection:
+        # The transaction holds the write lock from its first read, so the other writer waits
+        connection.execute(text("SELECT count(*) FROM t")).scalar()
+        thread = threading.Thread(target=write_from_second)
+        thread.start()
+        time.sleep(0.1)
+        connection.execute(text("INSERT INTO t VALUES (1)"))
+    thread.join()
+
+    with first.connect() as connection:
+        assert connection.execute(text("SELECT x FROM t ORDER BY rowid")).scalars().all() == [1, 2]
+    first.dispose()
+    second.dispose()
+
+
+def test_in_memory_sqlite_shares_one_engine():
+    writer, reader = create_engines("sqlite://")
+    assert writer is reader
+
+
+# Point TEST_POSTGRES_URL at a scratch database (e.g. postgresql://localhost/matome_test)
+# to run the async backend tests against PostgreSQL as well
+BACKEND_URLS = ["sqlite://"] + ([os.environ["TEST_POSTGRES_URL"]] if os.environ.get("TEST_POSTGRES_URL") else [])
+
+
+@pytest.mark.parametrize("url", BACKEND_URLS)
+def test_async_session_runs_shared_upserts(url):
+    async def scenario():
+        engine, _ = create_engines(url, asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                payload = MentionCreate(item_url="https://example.com/a", source_name="curator", source_type="rss")
+                first = await session.run_sync(upsert_mentions, [payload])
+                second = await session.run_sync(upsert_mentions, [payload.model_copy(update={"like_count": 9})])
+                item_id = first[0].mention.item_id
+                await session.run_sync(set_item_tags, item_id, ["ai"])
+                await session.commit()
+                counts = (await session.execute(select(TagCount.tag, TagCount.count))).all()
+                items = await session.scalar(select(func.count()).select_from(Item))
+            return [o.status for o in first + second], counts, items
+        finally:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+            await engine.dispose()
+
+    statuses, counts, items = asyncio.run(scenario())
+
+    assert statuses == [MENTION_CREATED, MENTION_UPDATED]
+    assert counts == [("ai", 1)]
+    assert items == 1
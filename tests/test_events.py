@@ -0,0 +1,134 @@
+import asyncio
+import json
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.database import create_engines
+from backend.models import Base, Item
+from backend.services.cache import DataVersion
+from backend.services.events import ItemEventBroker
+
+
+def _decode(payload: bytes) -> tuple[int, str, dict]:
+    fields = dict(line.split(": ", 1) for line in payload.decode().strip().split("\n"))
+    return int(fields["id"]), fields["event"], json.loads(fields["data"])
+
+
+def test_broker_publishes_item_score_and_summary_deltas():
+    async def scenario():
+        engine, _ = create_engines("sqlite://", asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        broker = ItemEventBroker(DataVersion(None), sessions)
+        async with sessions() as session:
+            session.add(Item(url="https://example.com/old", normalized_url="https://example.com/old"))
+            await session.commit()
+            await broker.publish_changes()  # Sets the starting point; nothing is sent
+
+            await asyncio.sleep(0.01)
+            item = Item(url="https://example.com/new", normalized_url="https://example.com/new", score_raw=1.0)
+            session.add(item)
+            await session.commit()
+            first = await broker.publish_changes()
+
+            await asyncio.sleep(0.01)
+            item.score_raw = 3.0
+            item.summary = "要約"
+            item.summary_status = "done"
+            item.tags_json = '["ai"]'
+            await session.commit()
+            second = await broker.publish_changes()
+            # Re-reading unchanged rows at the watermark sends nothing
+            third = await broker.publish_changes()
+
+        stream = broker.stream(last_event_id=1)
+        replayed = [await anext(stream) for _ in range(3)]
+        await stream.aclose()
+        behind = broker.stream(last_event_id=99)
+        reset = [await anext(behind) for _ in range(2)]
+        await behind.aclose()
+        await engine.dispose()
+        return item.id, (first, second, third), replayed, reset
+
+    item_id, counts, replayed, reset = asyncio.run(scenario())
+
+    assert counts == (1, 2, 0)
+    assert replayed[0] == b"retry: 3000\n\n"
+    events = [_decode(payload) for payload in replayed[1:]]
+    assert [(event_id, event) for event_id, event, _ in events] == [(2, "score"), (3, "summary")]
+    assert events[0][2]["id"] == item_id and events[0][2]["score_raw"] == 3.0
+    assert events[1][2]["summary"] == "要約" and events[1][2]["tags"] == ["ai"]
+    assert _decode(reset[1])[1] == "reset"
+
+
+def test_broker_pages_through_bulk_updates_sharing_a_timestamp(monkeypatch):
+    monkeypatch.setattr("backend.services.events.CHANGES_PER_QUERY", 2)
+
+    async def scenario():
+        engine, _ = create_engines("sqlite://", asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        broker = ItemEventBroker(DataVersion(None), sessions)
+        async with sessions() as session:
+            urls = [f"https://example.com/{n}" for n in range(5)]
+            session.add_all(Item(url=url, normalized_url=url) for url in urls)
+            await session.commit()
+            await broker.publish_changes()
+            await asyncio.sleep(0.01)
+            # One statement gives every row the same updated_at
+            await session.execute(update(Item).values(score_raw=2.0))
+            await session.commit()
+            bulk = await broker.publish_changes()
+            await asyncio.sleep(0.01)
+            session.add(Item(url="https://example.com/new", normalized_url="https://example.com/new"))
+            await session.commit()
+            later = await broker.publish_changes()
+        await engine.dispose()
+        return bulk, later
+
+    assert asyncio.run(scenario()) == (5, 1)
+
+
+def test_broker_publishes_rows_committed_behind_its_position():
+    async def scenario():
+        engine, _ = create_engines("sqlite://", asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        broker = ItemEventBroker(DataVersion(None), sessions)
+        async with sessions() as session:
+            session.add(Item(url="https://example.com/old", normalized_url="https://example.com/old"))
+            await session.commit()
+            await broker.publish_changes()
+            await asyncio.sleep(0.01)
+            session.add(Item(url="https://example.com/next", normalized_url="https://example.com/next"))
+            await session.commit()
+            first = await broker.publish_changes()
+
+            # A transaction that flushed before "next" but committed after it was read
+            flushed_at = datetime.now(UTC) - timedelta(seconds=5)
+            late = Item(
+                url="https://example.com/late",
+                normalized_url="https://example.com/late",
+                created_at=flushed_at,
+                updated_at=flushed_at,
+            )
+            session.add(late)
+            await session.commit()
+            second = await broker.publish_changes()
+            third = await broker.publish_changes()
+        stream = broker.stream(last_event_id=1)
+        replayed = [await anext(stream) for _ in range(2)]
+        await stream.aclose()
+        await engine.dispose()
+        return late.id, (first, second, third), replayed
+
+    late_id, counts, replayed = asyncio.run(scenario())
+
+    assert counts == (1, 1, 0)
+    event_id, event, data = _decode(replayed[1])
+    assert (event_id, event, data["id"]) == (2, "item", late_id)
@@ -0,0 +1,96 @@
+import asyncio
+import gzip
+import random
+
+import httpx
+import pytest
+
+from backend.utils.http import HttpClient, ResponseTooLarge, TokenBucket, UnsupportedContentType
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=2, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+    now[0] = 1.0
+    assert bucket.reserve() == 0.0
+
+
+def test_client_retries_transient_errors_and_caps_body_size():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path == "/flaky" and len(calls) == 1:
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        if request.url.path == "/huge":
+            return httpx.Response(200, content=b"x" * 2048)
+        return httpx.Response(200, content=b"ok")
+
+    client = HttpClient(rate_per_host=0, transport=httpx.MockTransport(handler))
+    response = client.get("https://example.com/flaky")
+    assert response.status_code == 200
+    assert response.content == b"ok"
+    with pytest.raises(ResponseTooLarge):
+        client.get("https://example.com/huge", max_bytes=1024)
+
+    stats = client.metrics.snapshot()
+    assert stats["requests"] == 3
+    assert stats["retries"] == 1
+    assert stats["too_large"] == 1
+
+
+def test_async_client_shares_limits_and_metrics():
+    async def scenario():
+        client = HttpClient(
+            rate_per_host=0, async_transport=httpx.MockTransport(lambda request: httpx.Response(200, text="feed"))
+        )
+        try:
+            responses = await asyncio.gather(*(client.aget(f"https://example.com/{i}") for i in range(3)))
+        finally:
+            await client.aclose()
+        return [response.text for response in responses], client.metrics.snapshot()
+
+    texts, stats = asyncio.run(scenario())
+    assert texts == ["feed"] * 3
+    assert stats["requests"] == 3
+
+
+def test_client_truncates_or_rejects_by_content_type():
+    def handler(request):
+        if request.url.path == "/image":
+            return httpx.Response(200, content=b"\x89PNG" * 1000, headers={"Content-Type": "image/png"})
+        return httpx.Response(200, text="<p>" + "a" * 5000, headers={"Content-Type": "text/html; charset=utf-8"})
+
+    client = HttpClient(rate_per_host=0, transport=httpx.MockTransport(handler))
+    page = client.get("https://example.com/page", max_bytes=100, truncate=True, content_types={"text/html"})
+    assert len(page.content) == 100
+    with pytest.raises(UnsupportedContentType):
+        client.get("https://example.com/image", content_types={"text/html"})
+
+
+def test_redirect_hops_are_throttled_by_their_own_host():
+    def handler(request):
+        if request.url.host == "t.example":
+            return httpx.Response(301, headers={"Location": "https://news.example/story"})
+        return httpx.Response(200, text="story")
+
+    client = HttpClient(rate_per_host=100, burst=1, transport=httpx.MockTransport(handler))
+    assert client.get("https://t.example/abc").text == "story"
+    assert client.metrics.snapshot()["throttled"] == 0
+    # The hop already spent news.example's only token
+    client.get("https://news.example/other")
+    assert client.metrics.snapshot()["throttled"] == 1
+
+
+def test_size_limit_counts_decoded_bytes_of_compressed_bodies():
+    body = random.Random(0).randbytes(1000)
+
+    def handler(request):
+        return httpx.Response(200, content=gzip.compress(body), headers={"Content-Encoding": "gzip"})
+
+    client = HttpClient(rate_per_host=0, transport=httpx.MockTransport(handler))
+    # Incompressible, so the declared (compressed) length is over the limit while the body isn't
+    assert client.get("https://example.com/data", max_bytes=1000).content == body
+    with pytest.raises(ResponseTooLarge):
+        client.get("https://example.com/data", max_bytes=999)
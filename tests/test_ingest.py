@@ -0,0 +1,314 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.ingest.manager import IngestManager, InvalidConfig
+from backend.ingest.rss import RSSFetcher, RSSItem
+from backend.ingest.scheduler import IngestScheduler, SourceState, next_interval
+from backend.models import Base, Item, Mention, Source
+from backend.services.summarizer import SUMMARY_DONE, SummaryPipeline
+
+FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Example</title>
+    <item>
+      <title>First</title>
+      <link>https://example.com/first?utm_source=rss</link>
+      <pubDate>Mon, 01 Jan 2024 09:00:00 GMT</pubDate>
+    </item>
+    <item>
+      <title>No link</title>
+    </item>
+  </channel>
+</rss>
+"""
+
+
+def test_parse_downloaded_feed_content():
+    items = list(RSSFetcher("https://example.com/rss").parse(FEED))
+    assert len(items) == 1
+    assert items[0].url == "https://example.com/first"
+    assert items[0].published_at is not None
+    assert items[0].published_at.tzinfo is not None
+
+
+def test_fetcher_short_circuits_unchanged_feeds():
+    request = httpx.Request("GET", "https://example.com/rss")
+    fetcher = RSSFetcher("https://example.com/rss")
+    first = httpx.Response(200, content=FEED, headers={"ETag": '"v1"'}, request=request)
+    assert fetcher._accept(first) == FEED
+    assert fetcher.request_headers()["If-None-Match"] == '"v1"'
+
+    assert fetcher._accept(httpx.Response(304, request=request)) is None
+    assert fetcher.not_modified
+
+    same_body = httpx.Response(200, content=FEED, request=request)
+    assert fetcher._accept(same_body) is None
+    assert fetcher.not_modified
+
+
+def test_upsert_entries_is_set_based(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    config_path = tmp_path / "sources.yaml"
+    config_path.write_text("sources: []\n", encoding="utf-8")
+    manager = IngestManager(config_path)
+    entries = [RSSItem(title=f"Entry {i}", url=f"https://example.com/{i}", published_at=None) for i in range(3)]
+
+    with Session(engine) as session:
+        source = Source(name="feed", type="rss", weight=2.0)
+        session.add(source)
+        session.flush()
+        created = manager.upsert_entries(session, source, entries)
+        again = manager.upsert_entries(session, source, entries[:1])
+        session.commit()
+
+        assert len(created) == 3
+        assert again == []
+        assert session.scalar(select(func.count()).select_from(Mention)) == 3
+        item = session.scalars(select(Item).where(Item.url == "https://example.com/0")).one()
+        assert item.score_raw == 2.0
+
+
+def test_upsert_entries_reuses_items_stored_under_another_normalized_url(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    config_path = tmp_path / "sources.yaml"
+    config_path.write_text("sources: []\n", encoding="utf-8")
+    manager = IngestManager(config_path)
+
+    with Session(engine) as session:
+        source = Source(name="feed", type="rss", weight=2.0)
+        # Stored before the normalization rules changed
+        item = Item(url="https://example.com/0", normalized_url="https://example.com/0/")
+        session.add_all([source, item])
+        session.flush()
+        created = manager.upsert_entries(
+            session, source, [RSSItem(title="Entry", url="https://example.com/0", published_at=None)]
+        )
+        session.commit()
+
+        assert created == []
+        assert session.scalar(select(func.count()).select_from(Item)) == 1
+        assert session.scalar(select(Mention.item_id)) == item.id
+        assert item.score_raw == 2.0 and item.title == "Entry"
+
+
+def make_feed(count, start=0):
+    items = "".join(
+        f"<item><title>Post {n}</title><link>https://example.com/{n}</link><guid>id-{n}</guid>"
+        f"<pubDate>Mon, 01 Jan 2024 {n % 24:02d}:00:00 +0900</pubDate></item>"
+        for n in range(start + count - 1, start - 1, -1)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{items}</channel></rss>'.encode()
+
+
+def test_parse_stops_at_high_water_mark():
+    fetcher = RSSFetcher("https://example.com/rss")
+    assert [item.guid for item in fetcher.parse(make_feed(3))] == ["id-2", "id-1", "id-0"]
+    assert fetcher.last_guid == "id-2"
+    assert fetcher.last_published_at.utcoffset().total_seconds() == 0
+
+    # Two new posts on top of a long backlog: only they are parsed
+    new = list(fetcher.parse(make_feed(1000, start=-995)))
+    assert [item.guid for item in new] == ["id-4", "id-3"]
+    assert fetcher.last_guid == "id-4"
+
+
+def test_parse_pages_through_more_than_limit_new_entries():
+    fetcher = RSSFetcher("https://example.com/rss", content_hash="abc")
+    list(fetcher.parse(make_feed(3), limit=3))
+    feed = make_feed(10)
+
+    batches = []
+    while batch := [item.guid for item in fetcher.parse(feed, limit=3)]:
+        batches.append(batch)
+    # The entries right above the mark come first, and none past the limit are lost
+    assert batches == [["id-5", "id-4", "id-3"], ["id-8", "id-7", "id-6"], ["id-9"]]
+    assert fetcher.last_guid == "id-9"
+    # A document with entries left over must be parsed again on the next fetch
+    assert fetcher.content_hash is None
+
+
+def test_parse_keeps_backdated_entries_above_the_mark():
+    fetcher = RSSFetcher("https://example.com/rss")
+    list(fetcher.parse(make_feed(3, start=5)))
+    # Published on top of the feed, but dated before the newest known entry
+    late = (
+        b"<item><title>Late</title><link>https://example.com/late</link><guid>late</guid>"
+        b"<pubDate>Mon, 01 Jan 2024 00:00:00 +0900</pubDate></item>"
+    )
+    feed = make_feed(3, start=5).replace(b"<item>", late + b"<item>", 1)
+
+    assert [item.guid for item in fetcher.parse(feed)] == ["late"]
+    assert fetcher.last_guid == "late"
+
+
+def test_parse_reads_atom_and_falls_back_on_malformed_xml():
+    atom = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">
+      <entry><id>tag:1</id><title>Atom post</title><link rel="alternate" href="https://example.com/a?utm_source=x"/>
+      <updated>2024-01-01T00:00:00Z</updated></entry></feed>"""
+    items = list(RSSFetcher("https://example.com/atom").parse(atom))
+    assert [(item.guid, item.url) for item in items] == [("tag:1", "https://example.com/a")]
+
+    broken = FEED.replace(b"</channel>", b"<unclosed></channel>")
+    assert [item.url for item in RSSFetcher("https://example.com/rss").parse(broken)] == ["https://example.com/first"]
+
+
+def test_next_interval_adapts_to_feed_activity():
+    state = SourceState({}, interval=300, min_interval=30, max_interval=3600)
+
+    assert next_interval(state, 5) == 150
+    assert next_interval(state, 0) == 450
+    assert next_interval(state, None) == 600
+    state.interval = 40
+    assert next_interval(state, 3) == 30
+    state.interval = 3000
+    assert next_interval(state, 0) == 3600
+
+
+def test_run_once_async_stores_other_feeds_when_one_fails(tmp_path):
+    config_path = tmp_path / "sources.yaml"
+    config_path.write_text(
+        "sources:\n"
+        + "".join(f"- {{name: {name}, type: rss, feed_url: 'https://{name}.example/feed'}}\n" for name in "abc"),
+        encoding="utf-8",
+    )
+
+    class FailingStoreManager(IngestManager):
+        stored = []
+
+        async def _load_sources(self, names):
+            return {}
+
+        async def _fetch_feed(self, config, fetcher, global_limit, host_limits, per_host_limit):
+            return config, fetcher, FEED
+
+        async def _store_feed(self, config, fetcher, content):
+            if config["name"] == "b":
+                raise RuntimeError("database is locked")
+            self.stored.append(config["name"])
+            return 1
+
+    manager = FailingStoreManager(config_path)
+    asyncio.run(manager.run_once_async())
+
+    assert sorted(manager.stored) == ["a", "c"]
+
+
+class RecordingManager(IngestManager):
+    def __init__(self, config_path, results):
+        super().__init__(config_path)
+        self.results = results
+        self.polls = []
+
+    async def poll_source(self, config, global_limit, host_limits, per_host_limit=2):
+        self.polls.append(config["name"])
+        return self.results.get(config["name"], 0)
+
+
+def test_scheduler_polls_sources_and_follows_config_changes(tmp_path):
+    config_path = tmp_path / "sources.yaml"
+    source = "- {{name: {name}, type: rss, url: 'https://{name}.example/feed', interval: 0.01, min_interval: 0.01}}\n"
+    config_path.write_text("sources:\n" + source.format(name="a"), encoding="utf-8")
+    manager = RecordingManager(config_path, {"a": 1, "b": None})
+
+    async def scenario():
+        stop = asyncio.Event()
+        scheduler = IngestScheduler(manager)
+        runner = asyncio.create_task(scheduler.run(stop))
+        await asyncio.sleep(0.1)
+        assert manager.polls.count("a") > 1
+
+        config_path.write_text("sources:\n" + source.format(name="b"), encoding="utf-8")
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        await asyncio.sleep(0.1)
+        polls_of_a = manager.polls.count("a")
+        await asyncio.sleep(0.05)
+        stop.set()
+        await runner
+        return scheduler, polls_of_a
+
+    scheduler, polls_of_a = asyncio.run(scenario())
+
+    assert manager.polls.count("a") == polls_of_a
+    assert "b" in manager.polls
+    assert list(scheduler.sources) == ["b"]
+    assert scheduler.sources["b"].failures > 0
+
+
+def test_scheduler_keeps_last_good_config_on_invalid_reload(tmp_path):
+    config_path = tmp_path / "sources.yaml"
+    source = "- {name: a, type: rss, url: 'https://a.example/feed', interval: 0.01, min_interval: 0.01}\n"
+    config_path.write_text("sources:\n" + source, encoding="utf-8")
+    manager = RecordingManager(config_path, {"a": 1})
+
+    def rewrite(text):
+        config_path.write_text(text, encoding="utf-8")
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    async def scenario():
+        stop = asyncio.Event()
+        scheduler = IngestScheduler(manager)
+        runner = asyncio.create_task(scheduler.run(stop))
+        await asyncio.sleep(0.05)
+        invalid = ["sources:\n- {name: a, type: rss, interval: x}\n", "sources:\n- {type: rss}\n", "- just a list\n"]
+        for text in invalid:
+            rewrite(text)
+            await asyncio.sleep(0.05)
+        polls = len(manager.polls)
+        await asyncio.sleep(0.05)
+        stop.set()
+        await runner
+        return scheduler, polls
+
+    scheduler, polls = asyncio.run(scenario())
+
+    assert len(manager.polls) > polls
+    assert list(scheduler.sources) == ["a"]
+    assert manager.config["sources"][0]["url"] == "https://a.example/feed"
+    with pytest.raises(InvalidConfig):
+        manager.load_config()
+
+
+def test_daemon_queues_items_left_pending_after_it_started(tmp_path, monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr("backend.services.summarizer.session_scope", sessionmaker(engine).begin)
+    monkeypatch.setattr("backend.ingest.scheduler.PENDING_SWEEP_SECONDS", 0.02)
+    config_path = tmp_path / "sources.yaml"
+    config_path.write_text("sources: []\n", encoding="utf-8")
+
+    class RecordingPipeline(SummaryPipeline):
+        summarized = []
+
+        def _process(self, item_id, url):
+            self.summarized.append(item_id)
+            with Session(engine) as session, session.begin():
+                session.get(Item, item_id).summary_status = SUMMARY_DONE
+
+    async def scenario(pipeline):
+        stop = asyncio.Event()
+        runner = asyncio.create_task(IngestScheduler(IngestManager(config_path, summarizer=pipeline)).run(stop))
+        await asyncio.sleep(0.05)
+        # Created by POST /mentions while the daemon runs
+        with Session(engine, expire_on_commit=False) as session, session.begin():
+            item = Item(url="https://example.com/a", normalized_url="https://example.com/a", summary_status="pending")
+            session.add(item)
+        await asyncio.sleep(0.1)
+        stop.set()
+        await runner
+        return item.id
+
+    with RecordingPipeline(fetch_workers=1, parse_workers=0) as pipeline:
+        item_id = asyncio.run(scenario(pipeline))
+
+    assert RecordingPipeline.summarized == [item_id]
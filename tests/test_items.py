@@ -0,0 +1,182 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api.items import _load_mentions, _query_items
+from backend.database import create_engines
+from backend.models import Base, Item, ItemTag, Mention, Source
+from backend.services.pagination import decode_cursor, encode_cursor
+from backend.services.scoring import apply_scores
+
+
+def test_load_mentions_keeps_most_engaged_per_item():
+    async def scenario():
+        engine, _ = create_engines("sqlite://", asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            source = Source(name="curator", type="rss", metadata_json='{"platform": "twitter"}')
+            items = [Item(url=f"https://example.com/{i}", normalized_url=f"https://example.com/{i}") for i in range(2)]
+            session.add_all(items)
+            for likes in (5, 50, 1, 20):
+                session.add(Mention(item=items[0], source=source, like_count=likes))
+            session.add(Mention(item=items[1], source=source, repost_count=3))
+            await session.commit()
+
+            ids = [items[0].id, items[1].id]
+            return ids, await _load_mentions(session, ids, per_item=2)
+
+    (first, second), mentions = asyncio.run(scenario())
+
+    assert [m["like_count"] for m in mentions[first]] == [50, 20]
+    assert len(mentions[second]) == 1
+    assert mentions[second][0]["source_type"] == "twitter"
+
+
+def test_collapsed_listing_returns_one_entry_per_cluster():
+    async def scenario():
+        engine, _ = create_engines("sqlite://", asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            source = Source(name="curator", type="rss")
+            urls = [f"https://example.com/{i}" for i in range(3)]
+            seen = datetime(2024, 1, 1, tzinfo=UTC)
+            items = [
+                Item(url=url, normalized_url=url, score_raw=raw, last_seen_at=seen + timedelta(minutes=minutes))
+                for url, (raw, minutes) in zip(urls, [(1.0, 3), (2.0, 5), (4.0, 4)])
+            ]
+            session.add_all(items)
+            await session.flush()
+            items[0].cluster_id = items[1].cluster_id = items[0].id
+            session.add(Mention(item=items[0], source=source, like_count=7))
+            session.add(Mention(item=items[1], source=source, like_count=9))
+            session.add(ItemTag(item_id=items[0].id, tag="llm"))
+            await session.commit()
+            flat = await _query_items(session, "new", None, None, None, 10, 0)
+            collapsed = await _query_items(session, "new", None, None, None, 10, 0, collapse=True)
+            tagged = await _query_items(session, "new", "llm", None, None, 10, 0, collapse=True)
+        await engine.dispose()
+        return items, flat, collapsed, tagged
+
+    items, flat, collapsed, tagged = asyncio.run(scenario())
+
+    assert [response["id"] for response, _ in flat] == [items[1].id, items[2].id, items[0].id]
+    # The cluster is listed at its best member's position and score, with the combined mentions
+    assert [response["id"] for response, _ in collapsed] == [items[1].id, items[2].id]
+    story = collapsed[0][0]
+    assert story["cluster_size"] == 2
+    assert story["score_raw"] == 2.0
+    assert [m["like_count"] for m in story["mentions"]] == [9, 7]
+    # A filter the cluster's best item fails leaves the cluster listed by its best matching item
+    assert [response["id"] for response, _ in tagged] == [items[0].id]
+
+
+def test_collapsed_buzz_listing_is_ordered_by_the_displayed_scores():
+    async def scenario():
+        engine, _ = create_engines("sqlite://", asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            now = datetime.now(UTC)
+            urls = [f"https://example.com/{i}" for i in range(3)]
+            # The cluster's members sum past the lone item, but neither beats it alone
+            items = [Item(url=url, normalized_url=url, last_seen_at=now) for url in urls]
+            for item, raw in zip(items, [3.0, 3.0, 5.0]):
+                apply_scores(item, raw)
+            session.add_all(items)
+            await session.flush()
+            items[0].cluster_id = items[1].cluster_id = items[0].id
+            await session.commit()
+            collapsed = await _query_items(session, "buzz", None, None, None, 10, 0, collapse=True)
+        await engine.dispose()
+        return items, collapsed
+
+    items, collapsed = asyncio.run(scenario())
+
+    assert [response["id"] for response, _ in collapsed] == [items[2].id, items[1].id]
+    scores = [response["score_buzz"] for response, _ in collapsed]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_cursor_pages_reach_items_without_a_sort_key():
+    async def scenario():
+        engine, _ = create_engines("sqlite://", asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            urls = [f"https://example.com/{i}" for i in range(5)]
+            # Two items are still waiting for their rank_buzz backfill
+            keys = [3.0, None, 2.0, None, 1.0]
+            items = [Item(url=url, normalized_url=url, rank_buzz=key) for url, key in zip(urls, keys)]
+            session.add_all(items)
+            await session.commit()
+            pages, after = [], None
+            while True:
+                page = await _query_items(session, "buzz", None, None, None, 2, 0, after)
+                pages.append([response["id"] for response, _ in page])
+                if len(page) < 2:
+                    break
+                after = page[-1][1]
+        await engine.dispose()
+        return items, pages
+
+    items, pages = asyncio.run(scenario())
+
+    ids = [item.id for item in items]
+    assert pages == [[ids[0], ids[2]], [ids[4], ids[3]], [ids[1]]]
+
+
+def test_new_listing_pages_by_last_seen_with_timestamp_cursors():
+    async def scenario():
+        engine, _ = create_engines("sqlite://", asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            seen = datetime(2024, 1, 1, tzinfo=UTC)
+            urls = [f"https://example.com/{i}" for i in range(4)]
+            # A high score_new snapshot doesn't lift an item that was seen earlier
+            items = [
+                Item(url=url, normalized_url=url, score_new=new, last_seen_at=seen + timedelta(minutes=minutes))
+                for url, (new, minutes) in zip(urls, [(9.0, 1), (1.0, 3), (1.0, 3), (1.0, 2)])
+            ]
+            session.add_all(items)
+            await session.commit()
+            first = await _query_items(session, "new", None, None, None, 2, 0)
+            after = decode_cursor(encode_cursor("new", *first[-1][1]), "new")
+            second = await _query_items(session, "new", None, None, None, 2, 0, after)
+        await engine.dispose()
+        return items, first, second
+
+    items, first, second = asyncio.run(scenario())
+
+    ids = [item.id for item in items]
+    assert [response["id"] for response, _ in first + second] == [ids[2], ids[1], ids[3], ids[0]]
+
+
+def test_buzz_listing_matches_displayed_scores_for_old_items():
+    async def scenario():
+        engine, _ = create_engines("sqlite://", asynchronous=True)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            now = datetime.now(UTC)
+            # A page that went viral two days ago and a fresh one with little engagement
+            old, fresh = (
+                Item(url=url, normalized_url=url, last_seen_at=seen)
+                for url, seen in [("https://example.com/old", now - timedelta(days=2)), ("https://example.com/new", now)]
+            )
+            apply_scores(old, 1000.0)
+            apply_scores(fresh, 2.0)
+            session.add_all([old, fresh])
+            await session.commit()
+            listed = await _query_items(session, "buzz", None, None, None, 10, 0)
+        await engine.dispose()
+        return fresh.id, listed
+
+    fresh_id, listed = asyncio.run(scenario())
+
+    assert listed[0][0]["id"] == fresh_id
+    scores = [response["score_buzz"] for response, _ in listed]
+    assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,58 @@
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from backend.models import Base, Item, Mention
+from backend.schemas.mention import MentionCreate
+from backend.services.mentions import MENTION_CREATED, MENTION_UPDATED, upsert_mentions
+
+
+def make_payload(**overrides):
+    payload = {
+        "item_url": "https://example.com/article?utm_source=x",
+        "source_name": "curator",
+        "source_type": "twitter",
+        "external_id": "1",
+        "like_count": 10,
+    }
+    payload.update(overrides)
+    return MentionCreate(**payload)
+
+
+def test_upsert_mentions_resolves_batch_in_one_pass():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        outcomes = upsert_mentions(
+            session,
+            [
+                make_payload(),
+                make_payload(external_id="2", like_count=4),
+                make_payload(like_count=30),
+            ],
+        )
+        session.commit()
+
+        assert [outcome.status for outcome in outcomes] == [MENTION_CREATED, MENTION_CREATED, MENTION_UPDATED]
+        assert outcomes[0].mention is outcomes[2].mention
+        assert session.scalar(select(func.count()).select_from(Item)) == 1
+        assert session.scalar(select(func.count()).select_from(Mention)) == 2
+        item = session.scalars(select(Item)).one()
+        assert item.normalized_url == "https://example.com/article"
+        assert item.score_raw == 34.0
+
+
+def test_upsert_mentions_reuses_items_stored_under_another_normalized_url():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # Stored before the normalization rules changed
+        session.add(Item(url="https://example.com/article", normalized_url="https://example.com/article/"))
+        session.commit()
+
+        outcomes = upsert_mentions(session, [make_payload(item_url="https://example.com/article")])
+        session.commit()
+
+        assert [outcome.status for outcome in outcomes] == [MENTION_CREATED]
+        item = session.scalars(select(Item)).one()
+        assert outcomes[0].mention.item_id == item.id
+        assert item.score_raw == 10.0
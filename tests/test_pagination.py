@@ -0,0 +1,23 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from backend.services.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("buzz", 123456.75, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "buzz") == (123456.75, 42)
+    # Past the last keyed row, cursors carry no key
+    assert decode_cursor(encode_cursor("buzz", None, 7), "buzz") == (None, 7)
+    seen = datetime(2024, 1, 1, 9, 30, tzinfo=UTC)
+    assert decode_cursor(encode_cursor("new", seen, 7), "new") == (seen, 7)
+
+
+def test_cursor_rejects_other_sort_and_garbage():
+    cursor = encode_cursor("new", 1.5, 7)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, "buzz")
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", "new")
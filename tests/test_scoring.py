@@ -1,7 +1,22 @@
 from datetime import UTC, datetime, timedelta
 
-from backend.models import Item, Mention, Source
-from backend.services.scoring import compute_item_scores
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from backend.models import Base, Item, Mention, Source
+from backend.services.ranking import buzz_rank_key
+from backend.services.rescore import compute_scores
+from backend.services.score_verifier import verify_item_scores
+from backend.services.scoring import (
+    FRESHNESS_HALF_LIFE_MINUTES,
+    adjust_item_scores,
+    apply_source_weight_change,
+    compute_item_scores,
+    mention_contribution,
+    scores_at,
+)
 
 
 def make_item_with_mention(like_count=1, repost_count=0, reply_count=0, minutes_ago=10, weight=1.0):
@@ -30,3 +45,78 @@ def test_score_decay_over_time():
     compute_item_scores(item_fresh)
     compute_item_scores(item_old)
     assert item_fresh.score_buzz > item_old.score_buzz
+
+
+def test_rank_key_orders_like_buzz_at_any_time():
+    now = datetime.now(UTC)
+    samples = [(5.0, 30), (40.0, 200), (1.0, 1), (12.0, 120), (100.0, 240)]
+    keys = {
+        (raw, minutes): buzz_rank_key(raw, now - timedelta(minutes=minutes), FRESHNESS_HALF_LIFE_MINUTES)
+        for raw, minutes in samples
+    }
+    for later in (0, 30, 90):
+        query_time = now + timedelta(minutes=later)
+        by_buzz = sorted(samples, key=lambda s: scores_at(s[0], now - timedelta(minutes=s[1]), query_time)[1])
+        assert sorted(samples, key=keys.get) == by_buzz
+
+
+def test_incremental_updates_match_full_recompute():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        source = Source(name="curator", type="twitter", weight=1.5)
+        item = Item(url="https://example.com", normalized_url="https://example.com", last_seen_at=datetime.now(UTC))
+        session.add_all([source, item])
+        session.flush()
+        mention = Mention(item=item, source=source, like_count=10)
+        session.add(mention)
+        adjust_item_scores(session, [item], mention_contribution(10, None, None, source.weight))
+        session.flush()
+
+        apply_source_weight_change(session, source.id, 1.5, 3.0)
+        source.weight = 3.0
+        assert item.score_raw == 30.0
+        assert verify_item_scores(session) == []
+
+        item.score_raw = 1.0
+        drifts = verify_item_scores(session, fix=True)
+        assert [(d.item_id, d.expected) for d in drifts] == [(item.id, 30.0)]
+        assert item.score_raw == 30.0
+
+
+def test_score_increments_from_stale_sessions_are_not_lost(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'scores.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Item(url="https://example.com", normalized_url="https://example.com", score_raw=1.0))
+        session.commit()
+    with Session(engine, expire_on_commit=False) as stale, Session(engine) as other:
+        item = stale.scalars(select(Item)).one()
+        stale.commit()
+        adjust_item_scores(other, other.scalars(select(Item)).all(), 2.0)
+        other.commit()
+
+        # The first session still holds score_raw=1.0 but adds to the stored value
+        adjust_item_scores(stale, [item], 3.0)
+        stale.commit()
+        assert item.score_raw == 6.0
+        assert item.score_new == scores_at(6.0, None)[0]
+    with Session(engine) as session:
+        assert session.scalar(select(Item.score_raw)) == 6.0
+
+
+def test_vectorized_rescore_matches_scalar_scoring():
+    now = datetime.now(UTC)
+    samples = [(0.0, None), (3.0, now - timedelta(minutes=30)), (50.0, now - timedelta(hours=20)), (2.0, now)]
+    raw = np.array([value for value, _ in samples])
+    last_seen = np.array(
+        [seen.replace(tzinfo=None) if seen else None for _, seen in samples], dtype="datetime64[us]"
+    )
+    score_new, score_buzz, rank_buzz = compute_scores(
+        raw, last_seen, np.datetime64(now.replace(tzinfo=None), "us"), FRESHNESS_HALF_LIFE_MINUTES
+    )
+    for i, (value, seen) in enumerate(samples):
+        expected_new, expected_buzz = scores_at(value, seen, now)
+        assert score_new[i] == pytest.approx(expected_new)
+        assert score_buzz[i] == pytest.approx(expected_buzz)
+        assert rank_buzz[i] == pytest.approx(buzz_rank_key(value, seen, FRESHNESS_HALF_LIFE_MINUTES))
@@ -0,0 +1,55 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from backend.models import Base, Item
+from backend.services.scoring import FRESHNESS_HALF_LIFE_MINUTES, apply_scores
+from backend.services.search import apply_search, ensure_search_index, match_expression
+
+
+def test_match_expression_quotes_terms_and_rejects_short_ones():
+    assert match_expression('生成AI "model"') == '"生成AI" """model"""'
+    assert match_expression("AI") is None
+
+
+def test_search_index_follows_item_writes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        ensure_search_index(connection)
+    with Session(engine) as session:
+        item = Item(url="https://example.com/a", normalized_url="https://example.com/a", title="OpenAIの新モデル")
+        session.add(item)
+        session.commit()
+
+        stmt = apply_search(select(Item.id), "新モデル", Item.id, Item.rank_buzz)
+        assert session.scalars(stmt).all() == [item.id]
+
+        item.title = "別の話題です"
+        session.commit()
+        assert session.scalars(apply_search(select(Item.id), "新モデル", Item.id, None)).all() == []
+
+
+def test_buzz_reorders_close_matches_without_burying_old_ones():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        ensure_search_index(connection)
+    now = datetime.now(UTC)
+    passing = "新モデルについて触れた長い記事の見出しですがほとんど関係ない話題が続きます"
+    # (title, half-lives since last seen)
+    matches = {"old": ("新モデル 新モデル 新モデルの詳細", 100), "fresh": (passing, 0), "quiet": (passing, 1)}
+    with Session(engine) as session:
+        items = {}
+        for name, (title, age) in matches.items():
+            seen = now - timedelta(minutes=age * FRESHNESS_HALF_LIFE_MINUTES)
+            items[name] = Item(url=name, normalized_url=name, title=title, last_seen_at=seen)
+            apply_scores(items[name], 10.0)
+        session.add_all(items.values())
+        session.add_all(Item(url=str(n), normalized_url=str(n), title=f"別の話題{n}") for n in range(20))
+        session.commit()
+
+        ranked = session.scalars(apply_search(select(Item.id), "新モデル", Item.id, Item.rank_buzz)).all()
+        # A hundred half-lives only costs the clamped span, while equal matches still follow buzz
+        assert ranked == [items["old"].id, items["fresh"].id, items["quiet"].id]
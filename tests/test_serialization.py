@@ -0,0 +1,91 @@
+from datetime import UTC, datetime, timedelta, timezone
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from backend.api.serialization import item_json_response
+from backend.schemas.item import ItemResponse
+
+
+def _item(item_id: int, **overrides):
+    item = {
+        "id": item_id,
+        "url": "https://Example.com",
+        "normalized_url": "https://example.com/記事?a=1&b=%E3%81%82",
+        "title": "新モデル \"発表\"",
+        "summary": None,
+        "summary_points": ["一つ目", "two"],
+        "tags": ["ai"],
+        "language": "ja",
+        "summary_status": "done",
+        "score_new": 1e-05,
+        "score_buzz": 12345678.901,
+        "score_raw": 3,
+        "published_at": None,
+        "last_seen_at": datetime(2024, 5, 1, 12, 0, 0, 123, tzinfo=UTC),
+        "source_type": "rss",
+        "cluster_id": None,
+        "cluster_size": 1,
+        "mentions": [
+            {
+                "id": 7,
+                "source_name": "curator",
+                "source_handle": None,
+                "source_type": "twitter",
+                "post_url": "https://x.com/a/status/1",
+                "embed_html": "<blockquote> </blockquote>",
+                "like_count": 5,
+                "repost_count": None,
+                "reply_count": 0,
+            },
+            {
+                "id": 8,
+                "source_name": "",
+                "source_handle": "@b",
+                "source_type": "unknown",
+                "post_url": None,
+                "embed_html": None,
+                "like_count": None,
+                "repost_count": 1,
+                "reply_count": None,
+            },
+        ],
+        "created_at": datetime(2024, 5, 1, 9, 30),
+        "updated_at": datetime(2024, 5, 1, 18, 30, tzinfo=timezone(timedelta(hours=9))),
+    }
+    item.update(overrides)
+    return item
+
+
+def test_fast_item_json_matches_validated_response_bytes():
+    items = [
+        _item(1),
+        _item(2, published_at=datetime(2024, 4, 30, tzinfo=UTC), score_new=2.5e16, cluster_id=1, cluster_size=3),
+        _item(3, mentions=[], summary="要約", url="http://example.com/path/", score_buzz=0.0),
+    ]
+    demo = FastAPI()
+
+    @demo.get("/validated", response_model=list[ItemResponse])
+    def validated():
+        return items
+
+    @demo.get("/fast", response_model=list[ItemResponse])
+    def fast(response: Response):
+        response.headers["X-Next-Cursor"] = "abc"
+        return item_json_response(items, response)
+
+    @demo.get("/validated/one", response_model=ItemResponse)
+    def validated_one():
+        return items[0]
+
+    @demo.get("/fast/one", response_model=ItemResponse)
+    def fast_one(response: Response):
+        return item_json_response(items[0], response)
+
+    client = TestClient(demo)
+    fast_response = client.get("/fast")
+
+    assert fast_response.content == client.get("/validated").content
+    assert fast_response.headers["content-type"] == "application/json"
+    assert fast_response.headers["x-next-cursor"] == "abc"
+    assert client.get("/fast/one").content == client.get("/validated/one").content
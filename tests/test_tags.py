@@ -0,0 +1,35 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from backend.models import Base, Item, ItemTag, TagCount
+from backend.services.tags import backfill_item_tags, set_item_tags
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine, Session(engine)
+
+
+def test_set_item_tags_maintains_counts():
+    _, session = make_session()
+    items = [Item(url=f"https://example.com/{i}", normalized_url=f"https://example.com/{i}") for i in range(2)]
+    session.add_all(items)
+    session.flush()
+
+    set_item_tags(session, items[0].id, ["llm", "openai"])
+    set_item_tags(session, items[1].id, ["llm"])
+    set_item_tags(session, items[0].id, ["llm", "agents"])
+
+    counts = dict(session.execute(select(TagCount.tag, TagCount.count)).all())
+    assert counts == {"llm": 2, "openai": 0, "agents": 1}
+
+
+def test_backfill_reads_legacy_tags_json():
+    engine, session = make_session()
+    session.add(Item(url="https://example.com/a", normalized_url="https://example.com/a", tags_json='["llm", "rag"]'))
+    session.commit()
+
+    with engine.begin() as connection:
+        assert backfill_item_tags(connection) == 2
+    assert set(session.scalars(select(ItemTag.tag))) == {"llm", "rag"}
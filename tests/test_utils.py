@@ -1,6 +1,14 @@
+import sqlite3
+import threading
+
+import lxml.html
+import pytest
+from readability import Document
+
 from backend.models import Source
-from backend.utils.summary import extract_sentences
-from backend.utils.url import normalize_url
+from backend.utils.article_cache import ArticleCache
+from backend.utils.summary import extract_and_summarize, extract_article_text, extract_sentences, summarize_html, summarize_url
+from backend.utils.url import find_canonical_url, normalize_url
 
 
 def test_normalize_url_removes_tracking_params():
@@ -10,6 +18,15 @@ def test_normalize_url_removes_tracking_params():
     assert normalized.endswith("id=123")
 
 
+def test_find_canonical_url_reads_link_tag_in_head():
+    page = '<head><link rel="stylesheet" href="/a.css"><link href="/post/1?utm_source=x&amp;id=2" rel="Canonical"></head>'
+    assert find_canonical_url(page, "https://example.com/p?ref=feed") == "https://example.com/post/1?id=2"
+    assert find_canonical_url("<link rel=canonical href=https://example.com/>", "https://example.com/post") is None
+    assert find_canonical_url('<body><link rel="canonical" href="/x"></body>', "https://example.com/") == (
+        "https://example.com/x"
+    )
+
+
 def test_extract_sentences_handles_japanese_text():
     text = "最新情報をお届けします。次の文も続きます。さらに別の話題です。"
     sentences = extract_sentences(text)
@@ -20,3 +37,96 @@ def test_extract_sentences_handles_japanese_text():
 def test_source_display_type_prefers_metadata():
     source = Source(name="tester", type="rss", metadata_json='{"platform": "twitter"}')
     assert source.display_type == "twitter"
+
+
+def test_summarize_html_extracts_paragraphs():
+    html = "<html><body><p>The model was released today. It ships with new tools.</p></body></html>"
+    summary = summarize_html(html)
+    assert summary.text.startswith("The model was released today.")
+    assert summary.language == "en"
+
+
+def test_tree_extraction_matches_readability_public_api():
+    # Guards the private Document._parse hook against readability upgrades
+    paragraph = "<p>Paragraph {} of the article, long enough to count as body text here.</p>"
+    paragraphs = "".join(paragraph.format(n) for n in range(4))
+    html = (
+        "<html><body><nav><a href='/'>Home</a> <a href='/about'>About</a></nav>"
+        f"<article>{paragraphs}</article><footer>Copyright</footer></body></html>"
+    )
+    article = lxml.html.fragment_fromstring(Document(html).summary(html_partial=True), create_parent="div")
+    expected = " ".join(" ".join(p.text_content().split()) for p in article.iter("p"))
+    assert extract_article_text(html) == expected
+    assert "Home" not in expected
+
+
+def test_extract_article_text_falls_back_to_page_text_without_scripts():
+    html = "<html><head><script>var x = 1;</script></head><body><div>Short <b>note</b></div></body></html>"
+    assert extract_article_text(html) == "Short note"
+
+
+def test_article_cache_serves_summary_until_version_changes(tmp_path):
+    html = "<html><body><p>The model was released today. It ships with new tools.</p></body></html>"
+    cache = ArticleCache(tmp_path / "articles.db")
+    text, summary = extract_and_summarize(html)
+    cache.put("https://example.com/a?utm_source=x", html, text, summary)
+
+    cached = cache.get("https://example.com/a")
+    assert cached.html == html
+    assert cached.summary == summary
+    assert summarize_url("https://example.com/a", cache=cache) == summary
+
+    bumped = ArticleCache(tmp_path / "articles.db", version="next")
+    stale = bumped.get("https://example.com/a")
+    assert stale.html == html
+    assert stale.summary is None
+    # Opening another version leaves this version's results in place
+    assert cache.get("https://example.com/a").summary == summary
+
+
+def test_article_cache_keeps_expired_pages_until_full(tmp_path):
+    cache = ArticleCache(tmp_path / "articles.db", max_bytes=10**6)
+    for index in range(3):
+        cache.put(f"https://example.com/{index}", f"<p>{index} " + "x" * 2000 + "</p>")
+    cache.get("https://example.com/0")
+
+    # Expired pages are misses for fetching but stay available to offline runs
+    cache.ttl = -1
+    assert ArticleCache(tmp_path / "articles.db", ttl=-1).get("https://example.com/0") is None
+    assert cache.evict() == 0
+    assert cache.get("https://example.com/1", allow_expired=True) is not None
+
+    cache.max_bytes = 50
+    assert cache.evict() == 2
+    assert cache.get("https://example.com/1", allow_expired=True) is not None
+
+
+def test_article_cache_evicts_until_shared_blobs_are_freed(tmp_path):
+    cache = ArticleCache(tmp_path / "articles.db")
+    shared = "<p>" + "shared " * 500 + "</p>"
+    cache.put("https://example.com/a", shared)
+    cache.put("https://mirror.example/a", shared)
+    cache.put("https://example.com/b", "<p>b</p>")
+
+    # Dropping only the oldest page would free nothing while the mirror still points at its blob
+    cache.max_bytes = cache._stored_bytes(cache._connection()) - 1
+    assert cache.evict() == 2
+    assert cache._stored_bytes(cache._connection()) <= cache.max_bytes
+    assert cache.get("https://example.com/b") is not None
+
+
+def test_article_cache_close_reaches_every_threads_connection(tmp_path):
+    cache = ArticleCache(tmp_path / "articles.db")
+    cache.put("https://example.com/a", "<p>a</p>")
+    worker = threading.Thread(target=cache.get, args=("https://example.com/a",))
+    worker.start()
+    worker.join()
+    connections = list(cache._connections)
+    assert len(connections) == 2
+
+    cache.close()
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+    # The cache stays usable and reopens on demand
+    assert cache.get("https://example.com/a").html == "<p>a</p>"